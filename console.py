@@ -12,6 +12,7 @@ from models.place import Place
 from models.review import Review
 from models.user import User
 from datetime import datetime
+from itertools import islice
 from shlex import shlex
 """entry point for hbnb console"""
 
@@ -53,8 +54,7 @@ class HBNBCommand(cmd.Cmd):
         elif not self.clslist.get(clsname):
             print("** class doesn't exist **")
         else:
-            k = clsname + "." + objid
-            obj = models.storage.all().get(k)
+            obj = models.storage.get(clsname, objid)
             if not obj:
                 print('** no instance found **')
             else:
@@ -76,25 +76,53 @@ class HBNBCommand(cmd.Cmd):
         elif not self.clslist.get(clsname):
             print("** class doesn't exist **")
         else:
-            k = clsname + "." + objid
-            obj = models.storage.all().get(k)
+            obj = models.storage.get(clsname, objid)
             if not obj:
                 print('** no instance found **')
             else:
-                del models.storage.all()[k]
+                models.storage.delete(obj)
                 models.storage.save()
 
     def do_all(self, arg):
         """Prints all instances based or not on the class name
+        Usage: all [<class name>] [stream | <page size> [<cursor>]]
+        A page ends with the cursor of the next one, if there is one.
         """
-        if not arg:
-            print([str(v) for k, v in models.storage.all().items()])
-        else:
-            if not self.clslist.get(arg):
+        args = [word.strip(',"\'') for word in arg.split()]
+        clsname = None
+        if args and not args[0].isdigit() and args[0] != "stream":
+            clsname = args.pop(0)
+            if not self.clslist.get(clsname):
                 print("** class doesn't exist **")
                 return False
-            print([str(v) for k, v in models.storage.all().items()
-                   if type(v) is self.clslist.get(arg)])
+        if args == ["stream"]:
+            for obj in self.iter_objects(clsname):
+                print(obj)
+        elif args:
+            try:
+                size = int(args[0])
+                if size < 1 or len(args) > 2:
+                    raise ValueError
+            except ValueError:
+                print('** invalid page size **')
+                return False
+            try:
+                page = list(islice(self.iter_objects(
+                    clsname, args[1] if len(args) > 1 else None, True),
+                    size + 1))
+            except ValueError:
+                print('** invalid cursor **')
+                return False
+            print([str(v) for v in page[:size]])
+            if len(page) > size:
+                print(self.cursor(page[size - 1]))
+        else:
+            # written as they are made, in the format of a printed list
+            sep = "["
+            for obj in self.iter_objects(clsname):
+                print(sep + repr(str(obj)), end="")
+                sep = ", "
+            print("[]" if sep == "[" else "]")
 
     def do_update(self, arg):
         """Updates an instance based on the class name and id
@@ -121,10 +149,13 @@ class HBNBCommand(cmd.Cmd):
         elif not self.clslist.get(clsname):
             print("** class doesn't exist **")
         else:
-            k = clsname + "." + objid
-            obj = models.storage.all().get(k)
+            obj = models.storage.get(clsname, objid)
             if not obj:
                 print('** no instance found **')
+            elif attrname not in obj._fields and \
+                    hasattr(type(obj), attrname):
+                # class settings, properties and methods
+                print("** attribute can't be updated **")
             else:
                 if hasattr(obj, attrname):
                     attrval = type(getattr(obj, attrname))(attrval)
@@ -134,6 +165,131 @@ class HBNBCommand(cmd.Cmd):
                 obj.updated_at = updatetime
                 models.storage.save()
 
+    def do_import(self, arg):
+        """Imports the objects of a CSV or JSON Lines file
+        Usage: import <class name> <file> or import <file>
+        """
+        from models.engine.bulk import import_file
+        clsname, path = None, None
+        args = arg.split(' ', 1)
+        if len(args) > 1:
+            clsname, path = args
+        else:
+            path = args[0]
+        if not path:
+            print('** file name missing **')
+        elif clsname and not self.clslist.get(clsname):
+            print("** class doesn't exist **")
+        else:
+            try:
+                print(import_file(path, clsname))
+            except (OSError, ValueError) as e:
+                print('** {} **'.format(e))
+
+    def do_export(self, arg):
+        """Exports objects to a CSV or JSON Lines file, or prints them
+        Usage: export <class name|all> [<file>] [<attribute>=<value> ...]
+        [fields=<attribute>,...] [format=csv|jsonl] [since=<ISO date>]
+        """
+        from models.engine.bulk import export_file
+        from shlex import split
+        args = split(arg)
+        clsname = args[0] if args else None
+        path, options, where = None, {}, {}
+        for word in args[1:]:
+            if "=" not in word:
+                path = word
+                continue
+            name, value = word.split("=", 1)
+            if name in ("fields", "format", "since"):
+                options[name] = value
+            else:
+                where[name] = value
+        if not clsname:
+            print('** class name missing **')
+        elif clsname != "all" and not self.clslist.get(clsname):
+            print("** class doesn't exist **")
+        else:
+            fields = options.get("fields")
+            since = options.get("since")
+            try:
+                count = export_file(
+                    path, None if clsname == "all" else clsname,
+                    options.get("format"), where,
+                    fields.split(",") if fields else None,
+                    datetime.fromisoformat(since) if since else None)
+            except (OSError, ValueError) as e:
+                print('** {} **'.format(e))
+                return
+            if path:
+                print(count)
+
+    def do_near(self, arg):
+        """Prints the ids and distances in km of the nearest objects
+        Usage: near <class name> <latitude> <longitude> [<radius km>]
+        [<limit>]
+        """
+        args = arg.split()
+        if not args:
+            print('** class name missing **')
+        elif not self.clslist.get(args[0]):
+            print("** class doesn't exist **")
+        elif len(args) < 3:
+            print('** coordinates missing **')
+        else:
+            try:
+                numbers = [float(a) for a in args[1:4]]
+                limit = int(args[4]) if len(args) > 4 else None
+                found = models.storage.near(args[0], *numbers, limit=limit)
+            except (KeyError, ValueError) as e:
+                print('** {} **'.format(e.args[0]))
+                return
+            for obj_id, km in found:
+                print("{} {:.3f}".format(obj_id, km))
+
+    def do_within(self, arg):
+        """Prints the ids of the objects in a box
+        Usage: within <class name> <south> <west> <north> <east>
+        """
+        args = arg.split()
+        if not args:
+            print('** class name missing **')
+        elif not self.clslist.get(args[0]):
+            print("** class doesn't exist **")
+        elif len(args) < 5:
+            print('** coordinates missing **')
+        else:
+            try:
+                found = models.storage.within(
+                    args[0], *(float(a) for a in args[1:5]))
+            except (KeyError, ValueError) as e:
+                print('** {} **'.format(e.args[0]))
+                return
+            for obj_id in found:
+                print(obj_id)
+
+    def do_search(self, arg):
+        """Prints the ids and scores of the objects matching words
+        Usage: search <class name> "<words>" [<limit>]
+        """
+        from shlex import split
+        args = [word.strip(',') for word in split(arg)]
+        if not args:
+            print('** class name missing **')
+        elif not self.clslist.get(args[0]):
+            print("** class doesn't exist **")
+        elif len(args) < 2:
+            print('** words missing **')
+        else:
+            try:
+                limit = int(args[2]) if len(args) > 2 else None
+                found = models.storage.search(args[0], args[1], limit)
+            except (KeyError, ValueError) as e:
+                print('** {} **'.format(e.args[0]))
+                return
+            for obj_id, score in found:
+                print("{} {:.3f}".format(obj_id, score))
+
     def do_quit(self, arg):
         """Quit command to exit the program
         """
@@ -159,17 +315,20 @@ class HBNBCommand(cmd.Cmd):
             print('*** Unknown syntax: {}.{}'.format(clsname, ln[0]))
             return False
         mthname, args = ln[0], ln[1].rstrip(')')
-        if mthname not in ['all', 'count', 'show', 'destroy', 'update']:
+        if mthname not in ['all', 'count', 'show', 'destroy', 'update',
+                           'search']:
             print('*** Unknown syntax: {}.{}'.format(clsname, line))
             return False
         if mthname == 'all':
-            self.do_all(clsname)
+            self.do_all(clsname + " " + args.replace(',', ' '))
         elif mthname == 'count':
             print(self.count_class(clsname))
         elif mthname == 'show':
             self.do_show(clsname + " " + args.strip('"'))
         elif mthname == 'destroy':
             self.do_destroy(clsname + " " + args.strip('"'))
+        elif mthname == 'search':
+            self.do_search(clsname + " " + args)
         elif mthname == 'update':
             lb, rb = args.find('{'), args.find('}')
             d = None
@@ -187,22 +346,51 @@ class HBNBCommand(cmd.Cmd):
                 self.do_update(" ".join([clsname, objid, ln[0], ln[1]]))
 
     def handle_dict(self, clsname, objid, d):
-        """handle dictionary update"""
-        for k, v in d.items():
-            self.do_update(" ".join([clsname, objid, str(k), str(v)]))
+        """handle dictionary update, saved once for all the keys"""
+        with models.storage.batch():
+            for k, v in d.items():
+                self.do_update(" ".join([clsname, objid, str(k), str(v)]))
 
     def postloop(self):
         """print new line after each loop"""
         print()
 
+    @classmethod
+    def iter_objects(cls, clsname=None, cursor=None, ordered=False):
+        """yields the objects of one class or of every class, in storage
+        order, or class by class by creation date when ordered, starting
+        after the cursor if there is one
+        """
+        if not ordered:
+            yield from models.storage.all(clsname).values()
+            return
+        names = [clsname] if clsname else list(cls.clslist)
+        after = None
+        if cursor is not None:
+            key, sep, created_at = cursor.rpartition("@")
+            name, dot, objid = key.partition(".")
+            if not sep or not dot or name not in names:
+                raise ValueError(cursor)
+            after = (datetime.fromisoformat(created_at), objid)
+            names = names[names.index(name):]
+        for name in names:
+            for objid in models.storage.between(name, "created_at",
+                                                after=after):
+                obj = models.storage.get(name, objid)
+                if obj is not None:
+                    yield obj
+            after = None
+
+    @staticmethod
+    def cursor(obj):
+        """return the cursor of the page starting after obj"""
+        return "{}.{}@{}".format(type(obj).__name__, obj.id,
+                                 obj.created_at.isoformat())
+
     @staticmethod
     def count_class(clsname):
         """count number of objects of type clsname"""
-        c = 0
-        for k, v in models.storage.all().items():
-            if type(v).__name__ == clsname:
-                c += 1
-        return (c)
+        return (models.storage.count(clsname))
 
     @staticmethod
     def getType(attrval):
@@ -1,7 +1,24 @@
 #!/usr/bin/python3
 """ init modelss """
 
-from models.engine.file_storage import FileStorage
+from os import getenv
+from models.engine import ids
 
-storage = FileStorage()
-storage.reload()
+ids.version = int(getenv("HBNB_ID_VERSION", 4))
+
+if getenv("HBNB_TYPE_STORAGE") == "db":
+    from models.engine.db_storage import DBStorage
+    storage = DBStorage(path=getenv("HBNB_DB_PATH"))
+else:
+    from models.engine.file_storage import FileStorage
+    storage = FileStorage(
+        journal=getenv("HBNB_STORAGE_JOURNAL") == "1",
+        compact_size=int(getenv("HBNB_STORAGE_COMPACT_SIZE",
+                                4 * 1024 * 1024)),
+        compact_replay=float(getenv("HBNB_STORAGE_COMPACT_REPLAY", 1.0)),
+        workers=int(getenv("HBNB_STORAGE_WORKERS", 1)),
+        layout=getenv("HBNB_STORAGE_LAYOUT", "single"),
+        buckets=int(getenv("HBNB_STORAGE_BUCKETS", 16)),
+        fsync=getenv("HBNB_STORAGE_FSYNC", "1") == "1",
+        commit_window=float(getenv("HBNB_STORAGE_COMMIT_WINDOW", 0)),
+        background=getenv("HBNB_STORAGE_BACKGROUND") == "1")
@@ -10,3 +10,4 @@ class Amenity(BaseModel):
     has one attribute - name(empty string)
     """
     name = ""
+    text_fields = ("name",)
@@ -2,33 +2,261 @@
 """Defines the BaseModel"""
 
 
-from uuid import uuid4
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 import models
+from models.engine.batch import MISSING
+from models.engine.ids import new_id
 
+# types of the class attributes kept in the slots of the instances
+FIELD_TYPES = (str, int, float, list)
+# naive dates are kept as microseconds since EPOCH
+EPOCH = datetime.min
+MICROSECOND = timedelta(microseconds=1)
 
-class BaseModel:
+
+class Field:
+    """
+    A declared attribute of a model, kept in a slot of the instances.
+    Reading it where it is unset gives its default, as reading the
+    class attribute it replaces did; without a default the attribute
+    is missing until it is set.
+    """
+
+    def __init__(self, default=MISSING):
+        """
+        Initializes the field.
+
+        Args:
+            default: The value of the field where it is unset.
+        """
+        self.default = default
+        # member descriptor of the slot, set by ModelType
+        self.slot = None
+
+    def __get__(self, obj, cls=None):
+        """returns the value of the field"""
+        if obj is not None:
+            try:
+                value = self.slot.__get__(obj)
+            except AttributeError:
+                value = MISSING
+            if value is not MISSING:
+                return value
+        if self.default is MISSING:
+            raise AttributeError(self.slot.__name__)
+        return self.default
+
+    def __set__(self, obj, value):
+        """sets the value of the field"""
+        self.slot.__set__(obj, value)
+
+    def __delete__(self, obj):
+        """unsets the field"""
+        if self.peek(obj) is MISSING:
+            raise AttributeError(self.slot.__name__)
+        self.slot.__set__(obj, MISSING)
+
+    def peek(self, obj):
+        """returns the value set on obj, MISSING if it is unset"""
+        try:
+            return self.slot.__get__(obj)
+        except AttributeError:
+            # only for instances made without __init__
+            return MISSING
+
+
+class Stamp(Field):
+    """A date field, kept as an int when it is a naive datetime"""
+
+    def __get__(self, obj, cls=None):
+        """returns the date"""
+        if obj is not None:
+            value = self.peek(obj)
+            if value is not MISSING:
+                return value
+        return super().__get__(None, cls)
+
+    def peek(self, obj):
+        """returns the date set on obj, MISSING if it is unset"""
+        value = super().peek(obj)
+        if type(value) is int:
+            return EPOCH + timedelta(microseconds=value)
+        return value
+
+    def micros(self, obj):
+        """
+        returns the naive date set on obj in microseconds since EPOCH,
+        as it is kept, None if there is none
+        """
+        value = super().peek(obj)
+        return value if type(value) is int else None
+
+    def __set__(self, obj, value):
+        """sets the date"""
+        if type(value) is datetime and value.tzinfo is None:
+            value = (value - EPOCH) // MICROSECOND
+        super().__set__(obj, value)
+
+
+class ModelType(type):
+    """
+    Metaclass of the models. The attributes declared in the body of a
+    model class, as a Field or as a default str, int, float or list
+    value, are stored in slots of the instances instead of a __dict__.
+    The other attributes of an instance go to its overflow dictionary.
+    _fields maps the name of every declared attribute, inherited ones
+    first, to its Field. _setters and _getters map it to the functions
+    setting and peeking at its slot as the Field does, without the call
+    to the Field when it adds nothing.
+    """
+
+    def __new__(mcs, name, bases, namespace):
+        """creates the model class and its slots"""
+        fields = {}
+        for base in reversed(bases):
+            fields.update(getattr(base, "_fields", {}))
+        declared = {}
+        for key, value in list(namespace.items()):
+            if isinstance(value, Field):
+                declared[key] = value
+            elif not key.startswith("_") and \
+                    isinstance(value, FIELD_TYPES):
+                declared[key] = Field(value)
+            else:
+                continue
+            del namespace[key]
+        new = tuple(key for key in declared if key not in fields)
+        namespace["__slots__"] = tuple(namespace.get("__slots__", ())) + new
+        cls = super().__new__(mcs, name, bases, namespace)
+        for key, field in declared.items():
+            field.slot = vars(cls)[key] if key in new else fields[key].slot
+            setattr(cls, key, field)
+            fields[key] = field
+        cls._fields = fields
+        cls._setters = {key: field.slot.__set__
+                        if type(field).__set__ is Field.__set__
+                        else field.__set__ for key, field in fields.items()}
+        cls._getters = {key: field.slot.__get__
+                        if type(field).peek is Field.peek
+                        else field.peek for key, field in fields.items()}
+        return cls
+
+
+class BaseModel(metaclass=ModelType):
     """The super class"""
+    __slots__ = ("_extra", "__weakref__")
+    id = Field()
+    created_at = Stamp()
+    updated_at = Stamp()
+    # attribute name -> name of the class it refers to, indexed by storage
+    foreign_keys = {}
+    # numeric attributes storage keeps in columns for select()
+    numeric_fields = ()
+    # latitude and longitude attributes storage indexes for near()
+    geo_fields = ()
+    # text attributes storage indexes the words of for search()
+    text_fields = ()
+    # list attributes storage indexes the values of for having()
+    list_fields = ()
+    # date and numeric attributes storage keeps sorted for between()
+    range_fields = ("created_at", "updated_at")
+
     def __init__(self, *args, **kwargs):
         """Initializing the base model"""
+        # attributes not declared by the class, None while there are none
+        object.__setattr__(self, "_extra", None)
         if len(kwargs) != 0:
-            for key, value in kwargs.items():
-                if key == "__class__":
-                    continue
-                elif key == "created_at" or key == "updated_at":
-                    setattr(self, key, datetime.fromisoformat(value))
-                else:
-                    setattr(self, key, value)
+            # not in storage yet, so attributes bypass __setattr__, and
+            # every slot is set once, to its value or to MISSING
+            setters = self._setters
+            found = 0
+            for key, set_slot in setters.items():
+                value = kwargs.get(key, MISSING)
+                if value is not MISSING:
+                    found += 1
+                    if (key == "created_at" or key == "updated_at") and \
+                            type(value) is not datetime:
+                        value = datetime.fromisoformat(value)
+                set_slot(self, value)
+            if found < len(kwargs):
+                for key, value in kwargs.items():
+                    if key not in setters and key != "__class__":
+                        self.__put(key, value)
         else:
-            self.id = str(uuid4())
+            # unset slots hold MISSING, reading them then raises nothing
+            for field in self._fields.values():
+                field.slot.__set__(self, MISSING)
+            self.id = new_id()
             self.created_at = datetime.now()
             self.updated_at = self.created_at
             models.storage.new(self)
 
+    def __put(self, name, value):
+        """sets an attribute without marking the instance as changed,
+        returns its previous value"""
+        field = self._fields.get(name)
+        if field is not None:
+            old = field.peek(self)
+            field.__set__(self, value)
+        elif hasattr(type(self), name):
+            old = MISSING
+            object.__setattr__(self, name, value)
+        else:
+            if self._extra is None:
+                object.__setattr__(self, "_extra", {})
+            old = self._extra.get(name, MISSING)
+            self._extra[name] = value
+        return old
+
+    def __setattr__(self, name, value):
+        """sets an attribute and marks the instance as changed"""
+        old = self.__put(name, value)
+        models.storage.touch(self, name, old)
+
+    def __getattr__(self, name):
+        """returns an attribute the class does not declare"""
+        extra = BaseModel._extra.__get__(self)
+        if extra is None or name not in extra:
+            raise AttributeError("'{}' object has no attribute '{}'"
+                                 .format(type(self).__name__, name))
+        return extra[name]
+
+    def __delattr__(self, name):
+        """unsets an attribute and marks the instance as changed"""
+        if name in self._fields:
+            old = self._fields[name].peek(self)
+            self._fields[name].__delete__(self)
+        elif self._extra is not None and name in self._extra:
+            old = self._extra.pop(name)
+            if not self._extra:
+                object.__setattr__(self, "_extra", None)
+        else:
+            old = MISSING
+            object.__delattr__(self, name)
+        models.storage.touch(self, name, old)
+
+    def __values(self):
+        """returns the attributes set on the instance"""
+        values = {}
+        try:
+            for name, peek in self._getters.items():
+                value = peek(self)
+                if value is not MISSING:
+                    values[name] = value
+        except AttributeError:
+            # only for instances made without __init__
+            for name, field in self._fields.items():
+                value = field.peek(self)
+                if value is not MISSING:
+                    values[name] = value
+        if self._extra is not None:
+            values.update(self._extra)
+        return values
+
     def __str__(self):
         """sets the print behaviour of the base model"""
         class_name = self.__class__.__name__
-        return "[{}] ({}) {}".format(class_name, self.id, self.__dict__)
+        return "[{}] ({}) {}".format(class_name, self.id, self.__values())
 
     def save(self):
         """updates up_dated with current datetime"""
@@ -36,9 +264,11 @@ class BaseModel:
         models.storage.save()
 
     def to_dict(self):
-        """returns a dictionary containing all key/values of __dict__"""
-        new_dict = self.__dict__.copy()
-        new_dict["created_at"] = self.created_at.isoformat()
-        new_dict["updated_at"] = self.updated_at.isoformat()
+        """returns a dictionary containing all key/values of the instance"""
+        new_dict = self.__values()
+        for name in ("created_at", "updated_at"):
+            date = new_dict[name] if name in new_dict else \
+                getattr(self, name)
+            new_dict[name] = date.isoformat()
         new_dict["__class__"] = self.__class__.__name__
         return new_dict
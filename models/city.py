@@ -2,7 +2,9 @@
 """Defines the city class"""
 
 
+import models
 from models.base_model import BaseModel
+from models.place import Place
 
 
 class City(BaseModel):
@@ -12,3 +14,10 @@ class City(BaseModel):
     """
     state_id = ""
     name = ""
+    foreign_keys = {"state_id": "State"}
+    text_fields = ("name",)
+
+    @property
+    def places(self):
+        """returns the list of Place instances in this city"""
+        return models.storage.related(Place, "city_id", self.id)
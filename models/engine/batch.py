@@ -0,0 +1,104 @@
+#!/usr/bin/python3
+"""Batches of storage changes saved once or rolled back together"""
+
+
+import threading
+from contextlib import contextmanager
+
+# old value of an attribute that was not set before
+MISSING = object()
+
+
+class Batch(threading.local):
+    """
+    This class defers the saves of a storage while a batch is open and
+    keeps an undo log of the changes made in memory meanwhile.
+
+    A batch belongs to the thread that opened it: its depth, undo log
+    and deferred save are kept per thread, so that the saves and
+    changes of other threads go on as usual.
+
+    The storage records every attribute set, new object and deleted
+    object while the batch is active. Leaving the outermost batch saves
+    once if anything changed, and an exception undoes the changes made
+    inside the batch it leaves. Changes made in place to a mutable
+    attribute are not in the undo log.
+    """
+
+    def __init__(self, storage):
+        """
+        Initializes the batch, again in every thread using it.
+
+        Args:
+            storage: The storage whose save() is deferred, and whose
+                new(), delete() and touch() undo the changes.
+        """
+        self.storage = storage
+        self.depth = 0
+        self.undo = []
+        self.save_requested = False
+        self.__rolling_back = False
+
+    @property
+    def active(self):
+        """True while changes are recorded and saves deferred"""
+        return self.depth > 0 and not self.__rolling_back
+
+    def record(self, *entry):
+        """
+        Adds an entry to the undo log, one of
+        ("set", obj, name, old value or MISSING), ("new", obj, replaced
+        obj or None) and ("delete", obj).
+        """
+        self.undo.append(entry)
+
+    @contextmanager
+    def __call__(self):
+        """
+        Opens a batch, which can be nested in another one.
+
+        Yields:
+            The storage.
+        """
+        mark = len(self.undo)
+        self.depth += 1
+        try:
+            yield self.storage
+        except BaseException:
+            self.rollback(mark)
+            raise
+        finally:
+            self.depth -= 1
+            if self.depth == 0:
+                changed = bool(self.undo) or self.save_requested
+                self.undo.clear()
+                self.save_requested = False
+        if self.depth == 0 and changed:
+            self.storage.save()
+
+    def rollback(self, mark=0):
+        """Undoes the changes recorded after the first mark entries"""
+        self.__rolling_back = True
+        try:
+            for entry in reversed(self.undo[mark:]):
+                if entry[0] == "set":
+                    obj, name, old = entry[1:]
+                    if old is MISSING:
+                        try:
+                            delattr(obj, name)
+                        except AttributeError:
+                            pass
+                        self.storage.touch(obj)
+                    else:
+                        setattr(obj, name, old)
+                elif entry[0] == "new":
+                    obj, replaced = entry[1:]
+                    if replaced is None:
+                        self.storage.delete(obj)
+                    else:
+                        self.storage.new(replaced)
+                else:
+                    self.storage.new(entry[1])
+            del self.undo[mark:]
+        finally:
+            self.__rolling_back = False
@@ -0,0 +1,180 @@
+#!/usr/bin/python3
+"""Bitset indexes of the list attributes of the objects"""
+
+
+import re
+
+NONZERO = re.compile(b"[^\x00]")
+
+
+class BitsetIndex:
+    """
+    This class maps every value found in the list attributes of the
+    objects, such as the ids in Place.amenity_ids, to the set of
+    objects holding it. The objects are numbered by dense ordinals and
+    a set is a bitset of ordinals, so that the objects holding several
+    values are found with bitwise ANDs.
+
+    A bitset is a bytearray, in which a bit is set or cleared in place
+    when an object changes. Its int form, which the queries AND, is
+    cached until then. The ordinals of removed objects are reused.
+    """
+
+    def __init__(self, attrs):
+        """
+        Initializes the index.
+
+        Args:
+            attrs (iterable): The names of the list attributes.
+        """
+        self.attrs = tuple(attrs)
+        self.__ordinals = {}
+        self.__keys = []
+        self.__free = []
+        self.__values = {}
+        self.__bits = {attr: {} for attr in self.attrs}
+        self.__ints = {attr: {} for attr in self.attrs}
+
+    def __len__(self):
+        """returns the number of indexed objects"""
+        return len(self.__ordinals)
+
+    def __members(self, obj):
+        """Returns the attribute -> values of an object, as frozensets"""
+        members = {}
+        for attr in self.attrs:
+            values = getattr(obj, attr, None)
+            if isinstance(values, (list, tuple, set, frozenset)):
+                try:
+                    members[attr] = frozenset(values)
+                except TypeError:
+                    members[attr] = frozenset()
+            else:
+                members[attr] = frozenset()
+        return members
+
+    def __set(self, attr, value, ordinal, on):
+        """Sets or clears the bit of an ordinal in the bitset of a value"""
+        bits = self.__bits[attr].get(value)
+        if bits is None:
+            if not on:
+                return
+            bits = self.__bits[attr][value] = bytearray()
+        byte = ordinal >> 3
+        if byte >= len(bits):
+            bits.extend(bytes(byte + 1 - len(bits)))
+        if on:
+            bits[byte] |= 1 << (ordinal & 7)
+        else:
+            bits[byte] &= ~(1 << (ordinal & 7))
+        ints = self.__ints[attr]
+        if value in ints:
+            del ints[value]
+
+    def add(self, key, obj):
+        """
+        Indexes an object under the current values of its list
+        attributes, keeping its ordinal if it is already indexed.
+
+        Args:
+            key (str): The storage key of the object.
+            obj: The object to index.
+        """
+        members = self.__members(obj)
+        ordinal = self.__ordinals.get(key)
+        if ordinal is None:
+            ordinal = self.__free.pop() if self.__free else len(self.__keys)
+            if ordinal == len(self.__keys):
+                self.__keys.append(key)
+            else:
+                self.__keys[ordinal] = key
+            self.__ordinals[key] = ordinal
+            for attr, values in members.items():
+                for value in values:
+                    self.__set(attr, value, ordinal, True)
+        else:
+            old = self.__values[key]
+            for attr, values in members.items():
+                for value in old[attr] - values:
+                    self.__set(attr, value, ordinal, False)
+                for value in values - old[attr]:
+                    self.__set(attr, value, ordinal, True)
+        self.__values[key] = members
+
+    update = add
+
+    def remove(self, key):
+        """
+        Removes an object from the index and frees its ordinal.
+
+        Args:
+            key (str): The storage key of the object.
+        """
+        ordinal = self.__ordinals.pop(key, None)
+        if ordinal is None:
+            return
+        for attr, values in self.__values.pop(key).items():
+            for value in values:
+                self.__set(attr, value, ordinal, False)
+        self.__keys[ordinal] = None
+        self.__free.append(ordinal)
+
+    def __int(self, attr, value):
+        """Returns the bitset of a value as an int"""
+        ints = self.__ints[attr]
+        bits = ints.get(value)
+        if bits is None:
+            bits = int.from_bytes(self.__bits[attr].get(value, b""),
+                                  "little")
+            ints[value] = bits
+        return bits
+
+    def estimate(self, conditions):
+        """
+        Returns the number of objects holding the rarest of the values,
+        an upper bound of the objects having() finds, counted from the
+        bitsets without intersecting them.
+
+        Args:
+            conditions (dict): The attribute -> values to look for.
+
+        Returns:
+            int: The number of objects.
+        """
+        count = len(self.__ordinals)
+        for attr, values in conditions.items():
+            if attr not in self.__bits:
+                raise KeyError(f"{attr} is not indexed")
+            for value in values:
+                count = min(count, bin(self.__int(attr, value)).count("1"))
+        return count
+
+    def having(self, conditions):
+        """
+        Returns the objects whose list attributes hold all the values.
+
+        Args:
+            conditions (dict): The attribute -> values to look for.
+
+        Returns:
+            list: The storage keys of the matching objects, by ordinal.
+        """
+        result = None
+        for attr, values in conditions.items():
+            if attr not in self.__bits:
+                raise KeyError(f"{attr} is not indexed")
+            for value in values:
+                bits = self.__int(attr, value)
+                result = bits if result is None else result & bits
+        if result is None:
+            return [key for key in self.__keys if key is not None]
+        data = result.to_bytes((result.bit_length() + 7) // 8, "little")
+        keys = []
+        for match in NONZERO.finditer(data):
+            byte = match.start()
+            bits = data[byte]
+            while bits:
+                low = bits & -bits
+                keys.append(self.__keys[byte * 8 + low.bit_length() - 1])
+                bits ^= low
+        return keys
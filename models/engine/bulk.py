@@ -0,0 +1,363 @@
+#!/usr/bin/python3
+"""Bulk import and export of CSV and JSON Lines files"""
+
+
+import csv
+import json
+import sys
+from datetime import datetime
+from functools import lru_cache
+import models
+from models.engine.batch import MISSING
+from models.engine.ids import new_id
+from models.engine.file_storage import clslist
+
+
+def read_rows(file, fmt):
+    """
+    Yields the rows of a CSV or JSON Lines file as dictionaries.
+
+    Args:
+        file: A file opened in text mode.
+        fmt (str): "csv", whose first line holds the attribute names,
+            or "jsonl", with one JSON object per line.
+
+    Yields:
+        tuple: The (line number, row) of every row.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(file)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == "jsonl":
+        for number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"line {number}: {e}") from None
+            if not isinstance(row, dict):
+                raise ValueError(f"line {number}: not an object")
+            yield number, row
+    else:
+        raise ValueError(f"unknown format {fmt}")
+
+
+@lru_cache(maxsize=None)
+def value_type(cls, name):
+    """
+    Returns the type of a class attribute, looked up once per class and
+    name rather than for every value of an import.
+
+    Args:
+        cls: The model class.
+        name (str): The attribute name.
+
+    Returns:
+        The type, str or list for their subclasses, None if the class
+        does not define the attribute.
+    """
+    default = getattr(cls, name, None)
+    if default is None:
+        return None
+    if isinstance(default, str):
+        return str
+    if isinstance(default, list):
+        return list
+    return type(default)
+
+
+def convert(cls, name, value):
+    """
+    Converts a text value to the type of the class attribute of the
+    same name, lists being read as JSON. An empty text stands for the
+    class attribute itself. Other values are returned as they are.
+
+    Args:
+        cls: The model class.
+        name (str): The attribute name.
+        value: The value to convert.
+
+    Returns:
+        The converted value, MISSING for an empty text value of an
+        attribute the class defines.
+    """
+    kind = value_type(cls, name)
+    if kind is None or not isinstance(value, str):
+        return value
+    if value == "":
+        return MISSING
+    if kind is str:
+        return value
+    if kind is list:
+        return json.loads(value)
+    return kind(value)
+
+
+def parse_value(text):
+    """
+    Returns a text value as an int or a float when it reads as one,
+    as the console update command stores the attributes a class does
+    not declare, the text itself otherwise.
+
+    Args:
+        text (str): The value to convert.
+
+    Returns:
+        The int, float or str value.
+    """
+    for kind in (int, float):
+        try:
+            return kind(text)
+        except ValueError:
+            pass
+    return text
+
+
+def build(cls, row):
+    """
+    Builds an instance of cls from a row, converting the text values of
+    CSV files to the type of the class attribute of the same name. The
+    id and dates are generated when missing.
+
+    Args:
+        cls: The model class.
+        row (dict): The attribute name -> value mapping.
+
+    Returns:
+        The instance, not added to the storage.
+    """
+    attrs = {}
+    for name, value in row.items():
+        if name == "__class__" or name is None:
+            continue
+        value = convert(cls, name, value)
+        if value is not MISSING:
+            attrs[name] = value
+    if not attrs.get("created_at"):
+        attrs["created_at"] = datetime.now()
+    if not attrs.get("id"):
+        created_at = attrs["created_at"]
+        if isinstance(created_at, str):
+            created_at = datetime.fromisoformat(created_at)
+        # time-ordered ids of imported objects follow their creation
+        attrs["id"] = new_id(created_at)
+    if not attrs.get("updated_at"):
+        attrs["updated_at"] = attrs["created_at"]
+    return cls(**attrs)
+
+
+def import_rows(rows, cls=None, batch_size=10000, check_foreign_keys=True):
+    """
+    Adds the objects built from rows to the storage, saving once per
+    batch. The first two batches hold batch_size objects, each later
+    one as many objects as the batches before it, so that the saves of
+    a single JSON file, which rewrite every object, add up to about
+    twice the import rather than growing with its square. A row that
+    cannot be imported raises ValueError and undoes the objects of its
+    batch, the previous batches stay saved. The query indexes of the
+    imported classes are built once when next used rather than updated
+    row by row.
+
+    Args:
+        rows: An iterable of (line number, row) as yielded by read_rows.
+        cls: The model class or class name, taken from the __class__
+            of every row when None.
+        batch_size (int): The number of objects of the first batches.
+        check_foreign_keys (bool): Whether the attributes listed in the
+            foreign_keys of the class must refer to existing objects.
+
+    Returns:
+        int: The number of imported objects.
+    """
+    storage = models.storage
+    if isinstance(cls, str):
+        cls = clslist[cls]
+    deferred = set()
+    rows = iter(rows)
+    count = 0
+    done = False
+    while not done:
+        limit = count + max(batch_size, count)
+        with storage.batch():
+            for number, row in rows:
+                try:
+                    row_cls = cls or clslist[row.get("__class__")]
+                    if cls and row.get("__class__", cls.__name__) != \
+                            cls.__name__:
+                        raise ValueError(
+                            f"{row['__class__']} is not a {cls.__name__}")
+                    obj = build(row_cls, row)
+                    if check_foreign_keys:
+                        for attr, target in row_cls.foreign_keys.items():
+                            value = getattr(obj, attr, "")
+                            if value and storage.get(target, value) is None:
+                                raise ValueError(
+                                    f"no {target} with id {value}")
+                except (KeyError, TypeError, ValueError) as e:
+                    if isinstance(e, KeyError):
+                        e = f"unknown class {row.get('__class__')}"
+                    raise ValueError(f"line {number}: {e}") from None
+                if row_cls not in deferred:
+                    # the query indexes are built at once when next used
+                    storage.defer_indexes(row_cls)
+                    deferred.add(row_cls)
+                storage.new(obj)
+                count += 1
+                if count == limit:
+                    break
+            else:
+                done = True
+    return count
+
+
+def import_file(path, cls=None, fmt=None, **kwargs):
+    """
+    Imports the objects of a CSV or JSON Lines file.
+
+    Args:
+        path (str): The file to read.
+        cls: The model class or class name, required for CSV files.
+        fmt (str): "csv" or "jsonl", guessed from the file extension
+            by default.
+        kwargs: The options of import_rows.
+
+    Returns:
+        int: The number of imported objects.
+    """
+    if fmt is None:
+        fmt = "csv" if path.lower().endswith(".csv") else "jsonl"
+    if fmt == "csv" and cls is None:
+        raise ValueError("a class is needed to import a CSV file")
+    with open(path, "r", newline="") as file:
+        return import_rows(read_rows(file, fmt), cls, **kwargs)
+
+
+def columns(cls):
+    """
+    Returns the attributes of a class in definition order, starting
+    with id and the dates, used as CSV header.
+
+    Args:
+        cls: The model class.
+
+    Returns:
+        list: The attribute names.
+    """
+    return list(cls._fields)
+
+
+def export_rows(cls=None, where=None, fields=None, since=None):
+    """
+    Yields the to_dict() of the stored objects one at a time, class by
+    class.
+
+    Args:
+        cls: The model class or class name, every class by default.
+        where (dict): The attribute name -> value pairs an object must
+            match, text values being converted to the attribute type,
+            or to a number for attributes the class does not declare.
+        fields (list): The attributes to keep, all by default.
+        since (datetime): Only export the objects updated at or after
+            it, in order of update, read from the sorted index of
+            updated_at instead of every object.
+
+    Yields:
+        dict: The attributes of every matching object.
+    """
+    if cls is None:
+        classes = list(clslist.values())
+    else:
+        classes = [clslist[cls] if isinstance(cls, str) else cls]
+    for klass in classes:
+        filters = {}
+        for name, value in (where or {}).items():
+            if isinstance(value, str) and not hasattr(klass, name):
+                # undeclared attributes are typed by the update command,
+                # or kept as text by imports
+                filters[name] = (parse_value(value), value)
+                continue
+            value = convert(klass, name, value)
+            filters[name] = (getattr(klass, name) if value is MISSING
+                             else value,)
+        if since is None:
+            objs = models.storage.all(klass).values()
+        else:
+            objs = (models.storage.get(klass, obj_id) for obj_id in
+                    models.storage.between(klass, "updated_at", since))
+        for obj in objs:
+            if obj is None or any(getattr(obj, name, MISSING) not in values
+                                  for name, values in filters.items()):
+                continue
+            row = obj.to_dict()
+            if fields is not None:
+                row = {name: row[name] for name in fields if name in row}
+            yield row
+
+
+def write_rows(rows, file, fmt, header=None):
+    """
+    Writes rows to a file as they come.
+
+    Args:
+        rows: An iterable of dictionaries.
+        file: A file opened in text mode.
+        fmt (str): "csv" or "jsonl".
+        header (list): The CSV columns, values of other attributes are
+            left out.
+
+    Returns:
+        int: The number of rows written.
+    """
+    count = 0
+    if fmt == "csv":
+        writer = csv.DictWriter(file, header, extrasaction="ignore")
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({name: json.dumps(value)
+                             if isinstance(value, (list, dict)) else value
+                             for name, value in row.items()})
+            count += 1
+    elif fmt == "jsonl":
+        for row in rows:
+            file.write(json.dumps(row) + "\n")
+            count += 1
+    else:
+        raise ValueError(f"unknown format {fmt}")
+    return count
+
+
+def export_file(path=None, cls=None, fmt=None, where=None, fields=None,
+                since=None):
+    """
+    Exports the stored objects to a CSV or JSON Lines file, writing
+    every object as soon as it is encoded.
+
+    Args:
+        path (str): The file to write, the standard output if None.
+        cls: The model class or class name, required for CSV files
+            unless fields are given.
+        fmt (str): "csv" or "jsonl", guessed from the file extension
+            by default.
+        where (dict): The attribute name -> value pairs an object must
+            match.
+        fields (list): The attributes to export, all by default.
+        since (datetime): Only export the objects updated at or after
+            it.
+
+    Returns:
+        int: The number of exported objects.
+    """
+    if fmt is None:
+        fmt = "csv" if path and path.lower().endswith(".csv") else "jsonl"
+    header = fields
+    if fmt == "csv" and header is None:
+        if cls is None:
+            raise ValueError("a class or fields are needed to export CSV")
+        header = columns(clslist[cls] if isinstance(cls, str) else cls)
+    rows = export_rows(cls, where, fields, since)
+    if path is None:
+        return write_rows(rows, sys.stdout, fmt, header)
+    with open(path, "w", newline="") as file:
+        return write_rows(rows, file, fmt, header)
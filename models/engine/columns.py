@@ -0,0 +1,233 @@
+#!/usr/bin/python3
+"""Columnar copies of the numeric attributes of the objects"""
+
+
+import heapq
+import math
+from array import array
+from itertools import compress
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# suffix of a condition -> method of the searched number x testing a
+# column value v, called as x.<method>(v)
+OPERATORS = {
+    "eq": "__eq__",
+    "ne": "__ne__",
+    "lt": "__gt__",
+    "lte": "__ge__",
+    "gt": "__lt__",
+    "gte": "__le__",
+}
+# suffix of a condition -> NumPy function comparing a column to x
+NUMPY_OPERATORS = {
+    "eq": "equal",
+    "ne": "not_equal",
+    "lt": "less",
+    "lte": "less_equal",
+    "gt": "greater",
+    "gte": "greater_equal",
+}
+
+
+def parse_condition(name):
+    """
+    Splits the name of a condition into the attribute and the
+    comparison, "price_by_night__lt" giving ("price_by_night", "lt").
+    A name without a known suffix compares for equality.
+
+    Args:
+        name (str): The condition name.
+
+    Returns:
+        tuple: The (attribute, comparison) pair.
+    """
+    attr, sep, op = name.rpartition("__")
+    if not sep or op not in OPERATORS:
+        return name, "eq"
+    return attr, op
+
+
+def parse_order(order_by):
+    """
+    Splits an order into the attribute and the direction,
+    "-price_by_night" giving ("price_by_night", True).
+
+    Args:
+        order_by (str): The attribute, prefixed with "-" to sort in
+            descending order.
+
+    Returns:
+        tuple: The (attribute, descending) pair.
+    """
+    if order_by.startswith("-"):
+        return order_by[1:], True
+    return order_by, False
+
+
+class ColumnStore:
+    """
+    This class keeps the numeric attributes of the objects of one class
+    in typed arrays of doubles, one array per attribute and one row per
+    object, so that they can be filtered and sorted without going
+    through the objects.
+
+    Rows stay dense: removing an object moves the last row into its
+    place. Values that are not numbers are stored as NaN, which matches
+    no comparison but "ne". With NumPy installed the arrays are compared
+    as NumPy views, otherwise with C-level map() over the arrays.
+    """
+
+    def __init__(self, attrs):
+        """
+        Initializes the store.
+
+        Args:
+            attrs (iterable): The names of the stored attributes.
+        """
+        self.attrs = tuple(attrs)
+        self.vectorize = numpy is not None
+        self.__keys = []
+        self.__rows = {}
+        self.__columns = {attr: array("d") for attr in self.attrs}
+
+    def __len__(self):
+        """returns the number of rows"""
+        return len(self.__keys)
+
+    @staticmethod
+    def __number(value):
+        """returns value as a float, NaN if it is not a number"""
+        if isinstance(value, (int, float)):
+            try:
+                return float(value)
+            except OverflowError:
+                pass
+        return math.nan
+
+    def add(self, key, obj):
+        """
+        Stores the attributes of an object, in a new row unless the
+        object already has one.
+
+        Args:
+            key (str): The storage key of the object.
+            obj: The object to store.
+        """
+        if key in self.__rows:
+            self.update(key, obj)
+            return
+        self.__rows[key] = len(self.__keys)
+        self.__keys.append(key)
+        for attr, column in self.__columns.items():
+            column.append(self.__number(getattr(obj, attr, None)))
+
+    def update(self, key, obj):
+        """
+        Copies the current attributes of an object to its row.
+
+        Args:
+            key (str): The storage key of the object.
+            obj: The object to store.
+        """
+        row = self.__rows.get(key)
+        if row is None:
+            self.add(key, obj)
+            return
+        for attr, column in self.__columns.items():
+            column[row] = self.__number(getattr(obj, attr, None))
+
+    def remove(self, key):
+        """
+        Removes the row of an object.
+
+        Args:
+            key (str): The storage key of the object.
+        """
+        row = self.__rows.pop(key, None)
+        if row is None:
+            return
+        last = self.__keys.pop()
+        if last != key:
+            self.__keys[row] = last
+            self.__rows[last] = row
+        for column in self.__columns.values():
+            value = column.pop()
+            if last != key:
+                column[row] = value
+
+    def select(self, conditions=(), order_by=None, limit=None):
+        """
+        Returns the keys of the objects matching every condition.
+
+        Args:
+            conditions (iterable): The (attribute, comparison, number)
+                triples to match, comparison being a key of OPERATORS.
+            order_by (str): The attribute to sort by, prefixed with "-"
+                for a descending order, the row order by default.
+            limit (int): The maximum number of keys to return.
+
+        Returns:
+            list: The matching storage keys.
+        """
+        conditions = [(self.__column(attr), op, float(value))
+                      for attr, op, value in conditions]
+        if order_by is not None:
+            attr, descending = parse_order(order_by)
+            order = (self.__column(attr), descending)
+        else:
+            order = None
+        if not self.__keys:
+            return []
+        if self.vectorize:
+            rows = self.__select_numpy(conditions, order, limit)
+        else:
+            rows = self.__select_python(conditions, order, limit)
+        return [self.__keys[row] for row in rows]
+
+    def __column(self, attr):
+        """Returns the array of attr"""
+        if attr not in self.__columns:
+            raise KeyError(f"{attr} is not indexed")
+        return self.__columns[attr]
+
+    def __select_python(self, conditions, order, limit):
+        """Returns the matching rows, filtered with map()"""
+        rows = range(len(self.__keys))
+        for column, op, value in conditions:
+            test = getattr(value, OPERATORS[op])
+            if type(rows) is range:
+                rows = list(compress(rows, map(test, column)))
+            else:
+                rows = list(compress(rows, map(test, map(column.__getitem__,
+                                                         rows))))
+        if order is not None:
+            column, descending = order
+            if limit is not None and limit < len(rows):
+                pick = heapq.nlargest if descending else heapq.nsmallest
+                return pick(limit, rows, key=column.__getitem__)
+            rows = sorted(rows, key=column.__getitem__, reverse=descending)
+        return rows[:limit] if limit is not None else rows
+
+    def __select_numpy(self, conditions, order, limit):
+        """Returns the matching rows, filtered on NumPy views"""
+        mask = None
+        for column, op, value in conditions:
+            values = numpy.frombuffer(column, dtype=numpy.float64)
+            test = getattr(numpy, NUMPY_OPERATORS[op])(values, value)
+            mask = test if mask is None else mask & test
+        if mask is None:
+            rows = numpy.arange(len(self.__keys))
+        else:
+            rows = numpy.flatnonzero(mask)
+        if order is not None:
+            column, descending = order
+            values = numpy.frombuffer(column, dtype=numpy.float64)[rows]
+            rows = rows[numpy.argsort(-values if descending else values,
+                                      kind="stable")]
+        if limit is not None:
+            rows = rows[:limit]
+        return rows.tolist()
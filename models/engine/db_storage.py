@@ -0,0 +1,621 @@
+#!/usr/bin/python3
+"""SQLite Storage Class"""
+
+
+import json
+import sqlite3
+import weakref
+from models.engine.batch import MISSING, Batch
+from models.engine.columns import parse_condition, parse_order
+from models.engine.geo import MAX_DISTANCE, bounding_box, distance
+from models.engine.geo import longitude_ranges, point
+from models.engine.text import document, tokenize
+from models.engine.query import Query
+from models.engine.ranges import sort_value
+from models.base_model import BaseModel, Stamp
+from models.state import State
+from models.city import City
+from models.amenity import Amenity
+from models.place import Place
+from models.review import Review
+from models.user import User
+
+
+clslist = {
+    'BaseModel': BaseModel,
+    'State': State,
+    'City': City,
+    'Amenity': Amenity,
+    'Place': Place,
+    'Review': Review,
+    'User': User
+}
+# comparison suffix of a select() condition -> SQL operator
+SQL_OPERATORS = {
+    "eq": "=",
+    "ne": "!=",
+    "lt": "<",
+    "lte": "<=",
+    "gt": ">",
+    "gte": ">=",
+}
+
+
+class DBStorage:
+    """
+    This class stores instances in a SQLite database with one table per
+    class. Each row holds the JSON of to_dict() and a column for every
+    foreign key of the class, which is indexed. The text_fields of a
+    class are indexed in an FTS5 table sharing the rowids of its table,
+    and its range_fields by expression indexes of their JSON values.
+
+    Objects are only loaded when they are asked for and are then kept
+    in an identity map, so that a point lookup does not read the whole
+    database. The map holds them weakly: an object no longer used
+    elsewhere and without pending changes is dropped, and read again
+    when asked for. Changes are written as single rows on save.
+    """
+
+    __db_path = "file.db"
+
+    def __init__(self, *, path=None):
+        """
+        Opens the database and creates the missing tables.
+
+        Args:
+            path (str): The database file to use instead of __db_path.
+        """
+        if path is not None:
+            self.__db_path = path
+        self.__batch = Batch(self)
+        self.__db = sqlite3.connect(self.__db_path)
+        self.__db.execute("PRAGMA journal_mode=WAL")
+        self.__db.execute("PRAGMA synchronous=NORMAL")
+        for name, cls in clslist.items():
+            columns = "".join(f", {attr} TEXT" for attr in cls.foreign_keys)
+            self.__db.execute(
+                f'CREATE TABLE IF NOT EXISTS "{name}" '
+                f'(id TEXT PRIMARY KEY{columns}, data TEXT NOT NULL)')
+            for attr in cls.foreign_keys:
+                self.__db.execute(
+                    f'CREATE INDEX IF NOT EXISTS "{name}_{attr}" '
+                    f'ON "{name}" ({attr})')
+            for attr in cls.range_fields:
+                self.__db.execute(
+                    f'CREATE INDEX IF NOT EXISTS "{name}_{attr}" '
+                    f'ON "{name}" ({self.__range_field(cls, attr)}, id)')
+            if cls.text_fields:
+                self.__create_text_table(cls)
+        self.__db.commit()
+        # the loaded objects stay in the identity map while they are
+        # used, those with pending changes being held by __pending
+        self.__objects = weakref.WeakValueDictionary()
+        self.__pending = {}
+
+    def __create_text_table(self, cls):
+        """Creates the FTS5 table of cls, indexing the existing rows"""
+        name = cls.__name__
+        if self.__db.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = ?",
+                (f"{name}_text",)).fetchone():
+            return
+        self.__db.execute(
+            f'CREATE VIRTUAL TABLE "{name}_text" USING fts5(body)')
+        rows = self.__db.execute(f'SELECT rowid, data FROM "{name}"')
+        self.__db.executemany(
+            f'INSERT INTO "{name}_text" (rowid, body) VALUES (?, ?)',
+            ((rowid, document(json.loads(data).get(attr)
+                              for attr in cls.text_fields))
+             for rowid, data in rows.fetchall()))
+
+    @staticmethod
+    def __class_name(cls):
+        """Returns the name of cls, which is a class or a class name"""
+        return cls if isinstance(cls, str) else cls.__name__
+
+    def __load(self, class_name, obj_id, data):
+        """Returns the object of a row, from the identity map if loaded"""
+        key = f"{class_name}.{obj_id}"
+        obj = self.__objects.get(key)
+        if obj is None:
+            obj = clslist[class_name](**json.loads(data))
+            self.__objects[key] = obj
+        return obj
+
+    def __select(self, class_name, where="", params=()):
+        """Returns the key -> object dictionary of the selected rows"""
+        self.__sync()
+        rows = self.__db.execute(
+            f'SELECT id, data FROM "{class_name}" {where} ORDER BY rowid',
+            params)
+        return {f"{class_name}.{obj_id}": self.__load(class_name, obj_id,
+                                                      data)
+                for obj_id, data in rows}
+
+    def __sync(self):
+        """Writes the pending changes in the current transaction"""
+        for key, obj in self.__pending.items():
+            class_name, obj_id = key.split(".", 1)
+            text = clslist[class_name].text_fields
+            if text:
+                self.__db.execute(
+                    f'DELETE FROM "{class_name}_text" WHERE rowid = '
+                    f'(SELECT rowid FROM "{class_name}" WHERE id = ?)',
+                    (obj_id,))
+            if obj is None:
+                self.__db.execute(
+                    f'DELETE FROM "{class_name}" WHERE id = ?', (obj_id,))
+                continue
+            attrs = list(obj.foreign_keys)
+            columns = "".join(f", {attr}" for attr in attrs)
+            updates = "".join(f", {attr} = excluded.{attr}"
+                              for attr in attrs)
+            self.__db.execute(
+                f'INSERT INTO "{class_name}" (id{columns}, data) '
+                f'VALUES (?{", ?" * len(attrs)}, ?) '
+                f'ON CONFLICT(id) DO UPDATE SET data = excluded.data'
+                f'{updates}',
+                (obj_id, *(getattr(obj, attr) for attr in attrs),
+                 json.dumps(obj.to_dict())))
+            if text:
+                self.__db.execute(
+                    f'INSERT INTO "{class_name}_text" (rowid, body) '
+                    f'SELECT rowid, ? FROM "{class_name}" WHERE id = ?',
+                    (document(getattr(obj, attr, None) for attr in text),
+                     obj_id))
+        self.__pending.clear()
+
+    def all(self, cls=None):
+        """
+        Returns the dictionary of all objects, or of the objects of
+        one class only.
+
+        Args:
+            cls: A class or class name to restrict the result to.
+
+        Returns:
+            dict: A dictionary containing the objects.
+        """
+        if cls is not None:
+            return self.__select(self.__class_name(cls))
+        objs = {}
+        for class_name in clslist:
+            objs.update(self.__select(class_name))
+        return objs
+
+    def count(self, cls=None):
+        """
+        Returns the number of objects, or of the objects of one class.
+
+        Args:
+            cls: A class or class name to count the objects of.
+
+        Returns:
+            int: The number of objects.
+        """
+        self.__sync()
+        names = clslist if cls is None else [self.__class_name(cls)]
+        return sum(self.__db.execute(
+            f'SELECT COUNT(*) FROM "{name}"').fetchone()[0]
+            for name in names)
+
+    def get(self, cls, obj_id):
+        """
+        Returns one object by class and id.
+
+        Args:
+            cls: A class or class name.
+            obj_id (str): The id of the object.
+
+        Returns:
+            The object, or None if there is none.
+        """
+        class_name = self.__class_name(cls)
+        key = f"{class_name}.{obj_id}"
+        obj = self.__objects.get(key)
+        if obj is not None:
+            return obj
+        if key in self.__pending:
+            return None
+        row = self.__db.execute(
+            f'SELECT data FROM "{class_name}" WHERE id = ?',
+            (obj_id,)).fetchone()
+        return None if row is None else self.__load(class_name, obj_id,
+                                                    row[0])
+
+    def lookup(self, cls, attr, value):
+        """
+        Returns the objects of a class whose indexed attribute holds
+        a value, such as the cities of a state.
+
+        Args:
+            cls: A class or class name.
+            attr (str): An attribute listed in the class foreign_keys.
+            value: The value to look for.
+
+        Returns:
+            dict: A dictionary of the matching objects.
+        """
+        class_name = self.__class_name(cls)
+        if attr not in clslist[class_name].foreign_keys:
+            raise KeyError(f"{attr} is not indexed")
+        return self.__select(class_name, f"WHERE {attr} = ?", (value,))
+
+    def related(self, cls, attr, value):
+        """
+        Returns the objects of a class whose indexed attribute holds
+        a value as a list.
+
+        Args:
+            cls: A class or class name.
+            attr (str): An attribute listed in the class foreign_keys.
+            value: The value to look for.
+
+        Returns:
+            list: The matching objects.
+        """
+        return list(self.lookup(cls, attr, value).values())
+
+    def select(self, cls, order_by=None, limit=None, **conditions):
+        """
+        Returns the ids of the objects of a class whose numeric fields
+        match every condition, compared in SQL.
+
+        Args:
+            cls: A class or class name.
+            order_by (str): The field to sort by, prefixed with "-" for
+                a descending order.
+            limit (int): The maximum number of ids to return.
+            **conditions: The numbers to compare the fields to, named
+                after the field with an optional __ne, __lt, __lte,
+                __gt or __gte suffix.
+
+        Returns:
+            list: The ids of the matching objects.
+        """
+        class_name = self.__class_name(cls)
+        cls = clslist[class_name]
+
+        def column(attr):
+            """Returns the SQL value of a numeric field"""
+            if attr not in cls.numeric_fields:
+                raise KeyError(f"{attr} is not indexed")
+            return self.__field(cls, attr)
+
+        where, params = [], []
+        for name, value in conditions.items():
+            attr, op = parse_condition(name)
+            where.append(f"{column(attr)} {SQL_OPERATORS[op]} ?")
+            params.append(float(value))
+        sql = f'SELECT id FROM "{class_name}"'
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        order = "rowid"
+        if order_by is not None:
+            attr, descending = parse_order(order_by)
+            order = column(attr) + (" DESC" if descending else "") + \
+                ", rowid"
+        sql += " ORDER BY " + order
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        self.__sync()
+        return [row[0] for row in self.__db.execute(sql, params)]
+
+    def search(self, cls, query, limit=None):
+        """
+        Returns the objects of a class whose text fields hold words of
+        a query, ranked by the bm25() of FTS5.
+
+        Args:
+            cls: A class or class name with text_fields.
+            query (str): The words to look for.
+            limit (int): The maximum number of objects.
+
+        Returns:
+            list: The (id, score) pairs, best first.
+        """
+        class_name = self.__class_name(cls)
+        if not clslist[class_name].text_fields:
+            raise KeyError(f"{class_name} has no text index")
+        words = sorted(set(tokenize(query)))
+        if not words:
+            return []
+        text = f'"{class_name}_text"'
+        self.__sync()
+        rows = self.__db.execute(
+            f'SELECT t.id, -bm25({text}) FROM {text} '
+            f'JOIN "{class_name}" AS t ON t.rowid = {text}.rowid '
+            f'WHERE {text} MATCH ? ORDER BY bm25({text}), t.id LIMIT ?',
+            (" OR ".join(f'"{word}"' for word in words),
+             -1 if limit is None else limit))
+        return rows.fetchall()
+
+    def having(self, cls, **values):
+        """
+        Returns the ids of the objects of a class whose list fields
+        hold all the values, looked up in SQL with json_each().
+
+        Args:
+            cls: A class or class name with list_fields.
+            **values: The values to look for in each list field, as a
+                list or as a single string.
+
+        Returns:
+            list: The ids of the matching objects.
+        """
+        class_name = self.__class_name(cls)
+        where, params = [], []
+        for attr, value in values.items():
+            if attr not in clslist[class_name].list_fields:
+                raise KeyError(f"{attr} is not indexed")
+            for item in [value] if isinstance(value, str) else value:
+                where.append(f"EXISTS (SELECT 1 FROM json_each(data, "
+                             f"'$.{attr}') WHERE value = ?)")
+                params.append(item)
+        sql = f'SELECT id FROM "{class_name}"'
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        self.__sync()
+        return [row[0] for row in
+                self.__db.execute(sql + " ORDER BY rowid", params)]
+
+    def defer_indexes(self, cls):
+        """Returns at once, SQLite keeps its indexes up to date itself"""
+
+    def estimate(self, cls, attr, op, value):
+        """
+        Returns the number of objects of a class an index finds for a
+        query condition, counted in SQL on the indexed foreign keys.
+        The geo and list fields have no SQL index to count on.
+
+        Args:
+            cls: A class or class name.
+            attr (str): The attribute of the condition, or "geo".
+            op (str): The comparison of the condition.
+            value: The value of the condition.
+
+        Returns:
+            int: The number of objects, None if no index serves the
+            condition.
+        """
+        class_name = self.__class_name(cls)
+        if op != "eq" or attr not in clslist[class_name].foreign_keys:
+            return None
+        self.__sync()
+        return self.__db.execute(
+            f'SELECT COUNT(*) FROM "{class_name}" WHERE {attr} = ?',
+            (value,)).fetchone()[0]
+
+    def query(self, cls):
+        """
+        Returns a query over the objects of a class, which finds them
+        through the index giving the fewest candidates.
+
+            storage.query(Place).where(city_id=city.id,
+                                       price_by_night__lt=100) \
+                                .order_by("price_by_night").limit(20)
+
+        Args:
+            cls: A class or class name.
+
+        Returns:
+            Query: The query matching every object of the class.
+        """
+        return Query(self, clslist[self.__class_name(cls)])
+
+    @staticmethod
+    def __field(cls, attr):
+        """Returns the SQL value of an attribute of the rows of cls"""
+        return (f"COALESCE(json_extract(data, '$.{attr}'), "
+                f"{float(getattr(cls, attr))})")
+
+    @classmethod
+    def __range_field(cls, model, attr):
+        """
+        Returns the SQL value of a range field of the rows of model,
+        the ISO format of a date sorting like the date.
+        """
+        if isinstance(model._fields.get(attr), Stamp):
+            return f"json_extract(data, '$.{attr}')"
+        return cls.__field(model, attr)
+
+    def between(self, cls, attr, low=None, high=None, reverse=False,
+                after=None):
+        """
+        Returns an iterator over the ids of the objects of a class whose
+        attribute is within [low, high], sorted by it, then by id, read
+        from an expression index of the attribute.
+
+        Args:
+            cls: A class or class name.
+            attr (str): An attribute listed in the class range_fields.
+            low: The lowest number or date, none by default.
+            high: The highest number or date, none by default.
+            reverse (bool): Whether to start from the highest value.
+            after (tuple): The (value, id) of the object to resume
+                after, in the order of the scan.
+
+        Returns:
+            iterator: The ids of the matching objects.
+        """
+        class_name = self.__class_name(cls)
+        model = clslist[class_name]
+        if attr not in model.range_fields:
+            raise KeyError(f"{attr} is not indexed")
+        field = self.__range_field(model, attr)
+
+        def param(value):
+            """Returns the SQL value of a bound"""
+            if sort_value(value) is None:
+                raise ValueError(f"{value!r} is not a number or a date")
+            return value.isoformat() if hasattr(value, "isoformat") \
+                else float(value)
+
+        where, params = [f"{field} IS NOT NULL"], []
+        if low is not None:
+            where.append(f"{field} >= ?")
+            params.append(param(low))
+        if high is not None:
+            where.append(f"{field} <= ?")
+            params.append(param(high))
+        if after is not None:
+            op = "<" if reverse else ">"
+            where.append(f"({field} {op} ? OR ({field} = ? AND id {op} ?))")
+            params.extend((param(after[0]), param(after[0]), after[1]))
+        order = " DESC" if reverse else ""
+        self.__sync()
+        rows = self.__db.execute(
+            f'SELECT id FROM "{class_name}" WHERE {" AND ".join(where)} '
+            f'ORDER BY {field}{order}, id{order}', params)
+        return (row[0] for row in rows)
+
+    def __points(self, cls, south=-90.0, north=90.0,
+                 lon_ranges=((-180.0, 180.0),)):
+        """
+        Returns the (id, (latitude, longitude)) pairs of the objects of
+        cls in a box, selected in SQL and checked with coordinates().
+        """
+        if not cls.geo_fields:
+            raise KeyError(f"{cls.__name__} has no geo index")
+        lat, lon = (self.__field(cls, attr) for attr in cls.geo_fields)
+        lons = " OR ".join(f"{lon} BETWEEN ? AND ?" for _ in lon_ranges)
+        self.__sync()
+        rows = self.__db.execute(
+            f'SELECT id, {lat}, {lon} FROM "{cls.__name__}" '
+            f'WHERE {lat} BETWEEN ? AND ? AND ({lons}) ORDER BY id',
+            (south, north, *(edge for pair in lon_ranges for edge in pair)))
+        return [(obj_id, coords) for obj_id, coords
+                in ((obj_id, point(lat, lon)) for obj_id, lat, lon in rows)
+                if coords is not None]
+
+    def near(self, cls, latitude, longitude, radius=None, limit=None):
+        """
+        Returns the objects of a class nearest to a point, the rows of
+        the bounding box of the radius being selected in SQL.
+
+        Args:
+            cls: A class or class name with geo_fields.
+            latitude (float): The latitude of the point in degrees.
+            longitude (float): The longitude of the point in degrees.
+            radius (float): The maximum distance in km.
+            limit (int): The maximum number of objects.
+
+        Returns:
+            list: The (id, distance in km) pairs, nearest first.
+        """
+        cls = clslist[self.__class_name(cls)]
+        lat, lon = float(latitude), float(longitude)
+        if radius is None:
+            radius = MAX_DISTANCE
+        rows = (self.__points(cls) if radius >= MAX_DISTANCE
+                else self.__points(cls, *bounding_box(lat, lon, radius)))
+        found = sorted((km, obj_id) for km, obj_id
+                       in ((distance(lat, lon, *coords), obj_id)
+                           for obj_id, coords in rows)
+                       if km <= radius)
+        return [(obj_id, km) for km, obj_id in found][:limit]
+
+    def within(self, cls, south, west, north, east):
+        """
+        Returns the ids of the objects of a class in a box, which
+        crosses the antimeridian when west is greater than east.
+
+        Args:
+            cls: A class or class name with geo_fields.
+            south (float): The southern edge in degrees.
+            west (float): The western edge in degrees.
+            north (float): The northern edge in degrees.
+            east (float): The eastern edge in degrees.
+
+        Returns:
+            list: The ids of the objects, sorted.
+        """
+        cls = clslist[self.__class_name(cls)]
+        lon_ranges = longitude_ranges(float(west), float(east))
+        return [obj_id for obj_id, (lat, lon)
+                in self.__points(cls, float(south), float(north),
+                                 lon_ranges)
+                if any(w <= lon <= e for w, e in lon_ranges)]
+
+    def new(self, obj):
+        """
+        Adds a new object to the database.
+
+        Args:
+            obj: The object to be added.
+        """
+        key = f"{obj.__class__.__name__}.{obj.id}"
+        old = self.__objects.get(key)
+        if self.__batch.active and old is not obj:
+            self.__batch.record("new", obj, old)
+        self.__objects[key] = obj
+        self.__pending[key] = obj
+
+    def touch(self, obj, name=None, old=MISSING):
+        """
+        Records that an object changed since the last save.
+
+        Args:
+            obj: The modified object.
+            name (str): The attribute that was set, if known.
+            old: The previous value of the attribute, used to undo the
+                change when a batch is rolled back.
+        """
+        key = f"{obj.__class__.__name__}.{getattr(obj, 'id', None)}"
+        if self.__objects.get(key) is obj:
+            if name is not None and self.__batch.active:
+                self.__batch.record("set", obj, name, old)
+            self.__pending[key] = obj
+
+    def delete(self, obj):
+        """
+        Removes an object from the database.
+
+        Args:
+            obj: The object to be removed.
+        """
+        key = f"{obj.__class__.__name__}.{obj.id}"
+        old = self.__objects.pop(key, None)
+        if self.__batch.active:
+            self.__batch.record("delete", old or obj)
+        self.__pending[key] = None
+
+    def save(self):
+        """
+        Writes the pending changes and commits them, at the end of the
+        batch when called inside one.
+        """
+        if self.__batch.active:
+            self.__batch.save_requested = True
+            return
+        self.__sync()
+        self.__db.commit()
+
+    def batch(self):
+        """
+        Returns a context manager deferring the saves made inside it to
+        a single commit when it exits. If an exception leaves it, the
+        changes made inside it are undone in memory and not committed.
+        """
+        return self.__batch()
+
+    def flush(self):
+        """Commits the pending changes, saves are never deferred here"""
+        self.save()
+
+    def wait(self):
+        """Returns at once, saves are never deferred here"""
+
+    def reload(self):
+        """
+        Drops the unsaved changes and the loaded objects, which are read
+        again from the database when they are asked for.
+        """
+        self.__db.rollback()
+        self.__objects.clear()
+        self.__pending.clear()
+
+    def close(self):
+        """Closes the database connection"""
+        self.__db.close()
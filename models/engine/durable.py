@@ -0,0 +1,246 @@
+#!/usr/bin/python3
+"""Crash-safe file writes, group commit and background writes"""
+
+
+import atexit
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+
+
+def write_atomic(path, text, sync=True):
+    """
+    Replaces the content of a file without ever leaving it truncated.
+
+    Args:
+        path (str): The file to write.
+        text (str): The new content.
+        sync (bool): Whether to fsync the file and its directory, so
+            that the new content survives a power loss once this
+            returns.
+    """
+    with atomic_file(path, sync) as file:
+        file.write(text)
+
+
+@contextmanager
+def atomic_file(path, sync=True):
+    """
+    Opens a temporary file in the directory of a file to write its new
+    content as a stream. When the block ends the temporary file is
+    renamed over the file with the permissions of the file it replaces;
+    if an exception leaves the block it is removed instead.
+
+    Args:
+        path (str): The file to write.
+        sync (bool): Whether to fsync the file and its directory.
+
+    Yields:
+        The temporary file, opened in text mode.
+    """
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = create_temporary(path)
+    try:
+        with os.fdopen(fd, "w") as file:
+            try:
+                os.fchmod(file.fileno(), os.stat(path).st_mode & 0o7777)
+            except FileNotFoundError:
+                # a new file keeps the permissions open() gives it
+                pass
+            yield file
+            if sync:
+                file.flush()
+                os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    if sync:
+        sync_directory(directory)
+
+
+def create_temporary(path):
+    """
+    Creates a temporary file next to a file, with a random name and the
+    permissions of the new files of open(), 0o666 less the umask.
+
+    Args:
+        path (str): The file the temporary file will replace.
+
+    Returns:
+        tuple: The file descriptor opened for writing, and the path.
+    """
+    while True:
+        tmp_path = f"{path}.{secrets.token_hex(4)}.tmp"
+        try:
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL,
+                         0o666)
+        except FileExistsError:
+            continue
+        return fd, tmp_path
+
+
+def sync_directory(directory):
+    """Flushes the entries of a directory to disk, where supported"""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class GroupCommit:
+    """
+    This class merges the commits requested by several threads within
+    a short window into a single one.
+
+    The first caller becomes the leader: it waits for the window, then
+    runs the commit on behalf of every request made until then. The
+    other callers block until a commit that started after their
+    request has finished, so every caller still returns only once its
+    changes are durable.
+    """
+
+    def __init__(self, commit, window=0.002):
+        """
+        Initializes the group commit.
+
+        Args:
+            commit: The callable writing every pending change.
+            window (float): The time in seconds the leader waits for
+                other requests before committing.
+        """
+        self.commit = commit
+        self.window = window
+        self.commits = 0
+        self.__cond = threading.Condition()
+        self.__requested = 0
+        self.__done = 0
+        self.__leader = False
+
+    def request(self):
+        """
+        Returns once the changes made before the call are committed.
+        An exception raised by the commit is raised in the leader, the
+        waiting callers then retry with a new leader.
+        """
+        with self.__cond:
+            self.__requested += 1
+            ticket = self.__requested
+            while self.__leader:
+                self.__cond.wait()
+                if self.__done >= ticket:
+                    return
+            self.__leader = True
+        done = 0
+        try:
+            if self.window > 0:
+                time.sleep(self.window)
+            with self.__cond:
+                target = self.__requested
+            self.commit()
+            done = target
+            self.commits += 1
+        finally:
+            with self.__cond:
+                self.__done = max(self.__done, done)
+                self.__leader = False
+                self.__cond.notify_all()
+
+
+class BackgroundWriter:
+    """
+    This class runs writes in a daemon thread, so that the callers
+    never wait for the disk.
+
+    Work items submitted while a write is running are merged into a
+    single item, which the thread writes next. A failed item is kept,
+    its error is raised by the next wait() and it is written again with
+    the next submitted item or wait().
+    """
+
+    def __init__(self, write, merge):
+        """
+        Initializes the writer and starts its thread.
+
+        Args:
+            write: The callable writing one work item.
+            merge: The callable merging two work items, the older one
+                first, into one.
+        """
+        self.write = write
+        self.merge = merge
+        self.writes = 0
+        self.__cond = threading.Condition()
+        self.__work = None
+        self.__failed = None
+        self.__busy = False
+        self.__error = None
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+        self.__thread.start()
+        atexit.register(self.wait)
+
+    def submit(self, work):
+        """Queues a work item and returns at once"""
+        with self.__cond:
+            self.__queue(work)
+
+    def wait(self):
+        """
+        Blocks until every submitted item is written. Raises the error
+        of a failed write instead, once.
+        """
+        with self.__cond:
+            if self.__error is None and self.__failed is not None:
+                self.__queue(None)
+            while (self.__work is not None or self.__busy) and \
+                    self.__error is None:
+                self.__cond.wait()
+            error, self.__error = self.__error, None
+        if error is not None:
+            raise error
+
+    def __queue(self, work):
+        """Merges a failed item, the queued one and work, in order"""
+        merged = None
+        for item in (self.__failed, self.__work, work):
+            if item is not None:
+                merged = item if merged is None else self.merge(merged, item)
+        self.__work = merged
+        self.__failed = None
+        self.__cond.notify_all()
+
+    def __run(self):
+        """Writes the submitted items until the process exits"""
+        while True:
+            with self.__cond:
+                while self.__work is None:
+                    self.__cond.wait()
+                work, self.__work = self.__work, None
+                self.__busy = True
+            try:
+                self.write(work)
+                error = None
+                self.writes += 1
+            except Exception as e:
+                error = e
+            with self.__cond:
+                self.__busy = False
+                if error is not None:
+                    self.__error = error
+                    self.__queue_failed(work)
+                self.__cond.notify_all()
+
+    def __queue_failed(self, work):
+        """Keeps a failed item, before the items queued since"""
+        if self.__work is not None:
+            work = self.merge(work, self.__work)
+            self.__work = None
+        self.__failed = work
@@ -3,6 +3,8 @@
 
 
 import json
+import os
+import threading
 from models.base_model import BaseModel
 from models.state import State
 from models.city import City
@@ -10,25 +12,485 @@ from models.amenity import Amenity
 from models.place import Place
 from models.review import Review
 from models.user import User
+from models.engine.journal import Journal
+from models.engine.indexes import AttributeIndex
+from models.engine.columns import ColumnStore, parse_condition
+from models.engine.geo import GeoIndex
+from models.engine.text import TextIndex
+from models.engine.bitsets import BitsetIndex
+from models.engine.ranges import RangeIndex
+from models.engine.query import Query
+from models.engine.json_stream import JSONStream
+from models.engine import parallel_load
+from models.engine.shards import ShardLayout
+from models.engine.batch import MISSING, Batch
+from models.engine.durable import BackgroundWriter, GroupCommit
+from models.engine.durable import write_atomic
+
+clslist = {
+    'BaseModel': BaseModel,
+    'State': State,
+    'City': City,
+    'Amenity': Amenity,
+    'Place': Place,
+    'Review': Review,
+    'User': User
+}
 
 
 class FileStorage:
     """
     This class provides a file storage module for serializing instances
     to a JSON file and deserializing JSON files to instances.
+
+    In journal mode a save only appends the objects created, changed or
+    deleted since the previous save to a log next to the JSON file, and
+    reload replays that log on top of the JSON snapshot. Once the log
+    grows past its size or replay-time threshold it is compacted into
+    the JSON file in the background.
+
+    Objects are also indexed by class and by the attributes listed in
+    the foreign_keys of their class. Their numeric_fields are copied to
+    a ColumnStore that select() filters and sorts, their geo_fields to
+    a GeoIndex searched by near() and within(), the words of their
+    text_fields to a TextIndex ranked by search(), and the values of
+    their list_fields to a BitsetIndex intersected by having(). Their
+    range_fields are kept sorted in a RangeIndex scanned by between(),
+    built the first time it is used. The
+    queries of query() are planned on whichever of these indexes gives
+    the fewest candidates.
+
+    The files are only read when objects are first asked for, and then
+    only the objects of the requested classes are built.
+
+    With a sharded layout the objects are spread over one file per
+    class, or per class and hash bucket of the id. A save then only
+    rewrites the files holding changed objects, and loading a class
+    only reads its own files.
+
+    Files are never rewritten in place: a save writes a temporary file,
+    flushes it to disk and renames it over the previous one. With a
+    commit window, saves requested by several threads at about the
+    same time are merged into one write. With a background writer,
+    saves only encode the changed objects and a thread writes the
+    files, flush() waiting for them when durability is needed.
     """
 
     __file_path = "file.json"
     __objects = {}
+    progress_every = 10000
+    parallel_min_size = 16 * 1024 * 1024
 
-    def all(self):
+    def __init__(self, *, path=None, journal=False,
+                 compact_size=4 * 1024 * 1024, compact_replay=1.0,
+                 workers=1, layout="single", buckets=16, fsync=True,
+                 commit_window=0.0, background=False):
         """
-        Returns the dictionary of all objects.
+        Initializes the storage.
+
+        Args:
+            path (str): The JSON file to use instead of __file_path.
+            journal (bool): Whether saves append to the journal.
+            compact_size (int): The log size in bytes that triggers
+                a compaction.
+            compact_replay (float): The replay time in seconds that
+                triggers a compaction.
+            workers (int): The number of processes decoding the JSON
+                file on reload, when it is at least parallel_min_size
+                bytes.
+            layout (str): "single", "class", "bucket" or "month", see
+                ShardLayout.
+            buckets (int): The number of files per class in the
+                "bucket" layout.
+            fsync (bool): Whether saves wait for the data to be on disk.
+            commit_window (float): The time in seconds a save waits for
+                saves of other threads to write them together, 0 to
+                write every save on its own.
+            background (bool): Whether saves return at once and leave
+                the writing to a background thread, see flush().
+        """
+        if path is not None:
+            self.__file_path = path
+        self.layout = ShardLayout(self.__file_path, layout, buckets)
+        if journal and self.layout.sharded:
+            raise ValueError("journal mode needs the single layout")
+        self.journal_mode = journal
+        self.workers = workers
+        self.fsync = fsync
+        self.journal = Journal(self.__file_path + ".log",
+                               compact_size, compact_replay, fsync)
+        self.group_commit = (GroupCommit(self.__save, commit_window)
+                             if commit_window > 0 else None)
+        self.writer = (BackgroundWriter(self.__write, self.__merge)
+                       if background else None)
+        self.__pending = {}
+        self.__batch = Batch(self)
+        self.__failed = None
+        self.__lock = threading.Lock()
+        self.__fragments = {}
+        self.__classes = {}
+        # shard name -> {key: object} of the sharded layouts
+        self.__shards = {}
+        self.__attr_indexes = {}
+        self.__field_indexes = {}
+        self.__deferred = set()
+        self.__indexed = None
+        self.__indexed_len = 0
+        self.__loaded = set()
+        self.__complete = False
+
+    def all(self, cls=None):
+        """
+        Returns the dictionary of all objects, or of the objects of
+        one class only.
+
+        Args:
+            cls: A class or class name to restrict the result to.
 
         Returns:
             dict: A dictionary containing all objects.
         """
-        return self.__objects
+        self.__load(cls)
+        if cls is None:
+            return self.__objects
+        return dict(self.__indexes().get(self.__class_name(cls), {}))
+
+    def count(self, cls=None):
+        """
+        Returns the number of objects, or of the objects of one class.
+
+        Args:
+            cls: A class or class name to count the objects of.
+
+        Returns:
+            int: The number of objects.
+        """
+        self.__load(cls)
+        if cls is None:
+            return len(self.__objects)
+        return len(self.__indexes().get(self.__class_name(cls), ()))
+
+    def get(self, cls, obj_id):
+        """
+        Returns one object by class and id.
+
+        Args:
+            cls: A class or class name.
+            obj_id (str): The id of the object.
+
+        Returns:
+            The object, or None if there is none.
+        """
+        self.__load(cls)
+        return self.__objects.get(f"{self.__class_name(cls)}.{obj_id}")
+
+    def lookup(self, cls, attr, value):
+        """
+        Returns the objects of a class whose indexed attribute holds
+        a value, such as the cities of a state.
+
+        Args:
+            cls: A class or class name.
+            attr (str): An attribute listed in the class foreign_keys.
+            value: The value to look for.
+
+        Returns:
+            dict: A dictionary of the matching objects.
+        """
+        return dict(self.__attr_index(cls, attr).get(value))
+
+    def related(self, cls, attr, value):
+        """
+        Returns the objects of a class whose indexed attribute holds
+        a value as a list, cached until one of them changes.
+        It backs the relationship properties of the models.
+
+        Args:
+            cls: A class or class name.
+            attr (str): An attribute listed in the class foreign_keys.
+            value: The value to look for.
+
+        Returns:
+            list: The matching objects, which must not be modified.
+        """
+        return self.__attr_index(cls, attr).get_list(value)
+
+    def select(self, cls, order_by=None, limit=None, **conditions):
+        """
+        Returns the ids of the objects of a class whose numeric fields
+        match every condition, filtering and sorting the columns of the
+        fields instead of the objects.
+
+            storage.select(Place, "-price_by_night", 20,
+                           price_by_night__lt=100, number_rooms__gte=3)
+
+        Args:
+            cls: A class or class name.
+            order_by (str): The field to sort by, prefixed with "-" for
+                a descending order.
+            limit (int): The maximum number of ids to return.
+            **conditions: The numbers to compare the fields to, named
+                after the field with an optional __ne, __lt, __lte,
+                __gt or __gte suffix.
+
+        Returns:
+            list: The ids of the matching objects.
+        """
+        conditions = [parse_condition(name) + (value,)
+                      for name, value in conditions.items()]
+        keys = self.__field_index(cls, "columns").select(
+            conditions, order_by, limit)
+        return [key.partition(".")[2] for key in keys]
+
+    def near(self, cls, latitude, longitude, radius=None, limit=None):
+        """
+        Returns the objects of a class nearest to a point, found in the
+        cells of a grid around it instead of measuring every object.
+
+        Args:
+            cls: A class or class name with geo_fields.
+            latitude (float): The latitude of the point in degrees.
+            longitude (float): The longitude of the point in degrees.
+            radius (float): The maximum distance in km.
+            limit (int): The maximum number of objects.
+
+        Returns:
+            list: The (id, distance in km) pairs, nearest first.
+        """
+        found = self.__field_index(cls, "geo").near(
+            float(latitude), float(longitude), radius, limit)
+        return [(key.partition(".")[2], km) for key, km in found]
+
+    def within(self, cls, south, west, north, east):
+        """
+        Returns the ids of the objects of a class in a box, which
+        crosses the antimeridian when west is greater than east.
+
+        Args:
+            cls: A class or class name with geo_fields.
+            south (float): The southern edge in degrees.
+            west (float): The western edge in degrees.
+            north (float): The northern edge in degrees.
+            east (float): The eastern edge in degrees.
+
+        Returns:
+            list: The ids of the objects, sorted.
+        """
+        keys = self.__field_index(cls, "geo").within(
+            float(south), float(west), float(north), float(east))
+        return [key.partition(".")[2] for key in keys]
+
+    def search(self, cls, query, limit=None):
+        """
+        Returns the objects of a class whose text fields hold words of
+        a query, ranked with BM25 from an inverted index of the words.
+
+        Args:
+            cls: A class or class name with text_fields.
+            query (str): The words to look for.
+            limit (int): The maximum number of objects.
+
+        Returns:
+            list: The (id, score) pairs, best first.
+        """
+        found = self.__field_index(cls, "text").search(query, limit)
+        return [(key.partition(".")[2], score) for key, score in found]
+
+    def having(self, cls, **values):
+        """
+        Returns the ids of the objects of a class whose list fields
+        hold all the values, intersecting the bitsets of the values.
+
+            storage.having(Place, amenity_ids=[wifi.id, tv.id])
+
+        Args:
+            cls: A class or class name with list_fields.
+            **values: The values to look for in each list field, as a
+                list or as a single string.
+
+        Returns:
+            list: The ids of the matching objects.
+        """
+        conditions = {attr: [value] if isinstance(value, str) else value
+                      for attr, value in values.items()}
+        keys = self.__field_index(cls, "bitsets").having(conditions)
+        return [key.partition(".")[2] for key in keys]
+
+    def estimate(self, cls, attr, op, value):
+        """
+        Returns the number of objects of a class an index finds for a
+        query condition, or an upper bound of it, read from the index
+        without visiting the objects. It lets queries cost the indexes
+        they will not use.
+
+        Args:
+            cls: A class or class name.
+            attr (str): A foreign key, a list field, or "geo".
+            op (str): "eq" for foreign keys, "contains" for list
+                fields, "near" or "within" for "geo".
+            value: The value of the condition, the (latitude,
+                longitude, radius) or the (south, west, north, east)
+                of the geo ones.
+
+        Returns:
+            int: The number of objects, None if no index serves the
+            condition.
+        """
+        if isinstance(cls, str):
+            cls = clslist[cls]
+        if op == "eq" and attr in cls.foreign_keys:
+            return len(self.__attr_index(cls, attr).get(value))
+        if attr == "geo" and op in ("near", "within") and cls.geo_fields:
+            geo = self.__field_index(cls, "geo")
+            if op == "near":
+                return geo.estimate_near(*value)
+            return geo.estimate_within(*value)
+        if op == "contains" and attr in cls.list_fields:
+            return self.__field_index(cls, "bitsets").estimate(
+                {attr: [value] if isinstance(value, str) else value})
+        return None
+
+    def between(self, cls, attr, low=None, high=None, reverse=False,
+                after=None):
+        """
+        Returns an iterator over the ids of the objects of a class whose
+        attribute is within [low, high], sorted by it, then by id. The
+        range is found by bisection in a sorted index of the attribute
+        instead of sorting the objects, which serves time windows and
+        pages:
+
+            storage.between(Place, "updated_at", datetime.now() - hour)
+            storage.between(Place, "price_by_night", 50, 120,
+                            after=(last.price_by_night, last.id))
+
+        Args:
+            cls: A class or class name.
+            attr (str): An attribute listed in the class range_fields.
+            low: The lowest number or date, none by default.
+            high: The highest number or date, none by default.
+            reverse (bool): Whether to start from the highest value.
+            after (tuple): The (value, id) of the object to resume
+                after, in the order of the scan.
+
+        Returns:
+            iterator: The ids of the matching objects.
+        """
+        if after is not None:
+            after = (after[0], f"{self.__class_name(cls)}.{after[1]}")
+        keys = self.__field_index(cls, "ranges").scan(
+            attr, low, high, reverse, after)
+        return (key.partition(".")[2] for key in keys)
+
+    def query(self, cls):
+        """
+        Returns a query over the objects of a class, which finds them
+        through the index giving the fewest candidates.
+
+            storage.query(Place).where(city_id=city.id,
+                                       price_by_night__lt=100) \
+                                .order_by("price_by_night").limit(20)
+
+        Args:
+            cls: A class or class name.
+
+        Returns:
+            Query: The query matching every object of the class.
+        """
+        return Query(self, clslist[self.__class_name(cls)])
+
+    def __attr_index(self, cls, attr):
+        """Returns the AttributeIndex of attr in cls"""
+        self.__load(cls)
+        self.__indexes()
+        if isinstance(cls, str):
+            cls = clslist[cls]
+        indexes = self.__class_indexes(cls)
+        if attr not in indexes:
+            raise KeyError(f"{attr} is not indexed")
+        return indexes[attr]
+
+    def __class_indexes(self, cls):
+        """Returns the attribute -> AttributeIndex mapping of cls"""
+        indexes = self.__attr_indexes.get(cls.__name__)
+        if indexes is None:
+            indexes = {attr: AttributeIndex(attr)
+                       for attr in cls.foreign_keys}
+            self.__attr_indexes[cls.__name__] = indexes
+        return indexes
+
+    def __field_index(self, cls, kind):
+        """
+        Returns the "columns", "geo", "text", "bitsets" or "ranges"
+        index of cls.
+        """
+        self.__load(cls)
+        classes = self.__indexes()
+        if isinstance(cls, str):
+            cls = clslist[cls]
+        indexes = self.__class_field_indexes(cls)
+        if kind == "ranges" and kind not in indexes and cls.range_fields:
+            # sorted once here, then kept up to date like the others
+            indexes[kind] = RangeIndex(cls.range_fields,
+                                       classes.get(cls.__name__))
+        elif kind not in indexes and cls.__name__ in self.__deferred:
+            index = self.__new_field_index(cls, kind)
+            if index is not None:
+                # only the index used is built after an import
+                for key, obj in classes.get(cls.__name__, {}).items():
+                    index.add(key, obj)
+                indexes[kind] = index
+        if kind not in indexes:
+            raise KeyError(f"{cls.__name__} has no {kind} index")
+        return indexes[kind]
+
+    def __class_field_indexes(self, cls):
+        """
+        Returns the kind -> index mapping of the numeric_fields,
+        geo_fields, text_fields and list_fields of cls, and of its
+        range_fields once they were scanned. Every index has attrs,
+        add(), update() and remove(). The indexes of a class whose
+        indexes are deferred are only there once they were used.
+        """
+        indexes = self.__field_indexes.get(cls.__name__)
+        if indexes is None:
+            indexes = {}
+            if cls.__name__ not in self.__deferred:
+                for kind in ("columns", "geo", "text", "bitsets"):
+                    index = self.__new_field_index(cls, kind)
+                    if index is not None:
+                        indexes[kind] = index
+            self.__field_indexes[cls.__name__] = indexes
+        return indexes
+
+    @staticmethod
+    def __new_field_index(cls, kind):
+        """
+        Returns an empty "columns", "geo", "text" or "bitsets" index of
+        cls, None if the class has no fields of that kind.
+        """
+        if kind == "columns" and cls.numeric_fields:
+            return ColumnStore(cls.numeric_fields)
+        if kind == "geo" and cls.geo_fields:
+            return GeoIndex(cls.geo_fields)
+        if kind == "text" and cls.text_fields:
+            return TextIndex(cls.text_fields)
+        if kind == "bitsets" and cls.list_fields:
+            return BitsetIndex(cls.list_fields)
+        return None
+
+    def defer_indexes(self, cls):
+        """
+        Stops updating the numeric, geo, text, bitset and range indexes
+        of a class, each of which is built from its objects when it is
+        next used instead, so that an import only keeps the class
+        buckets and foreign keys up to date for every new object.
+
+        Args:
+            cls: A class or class name.
+        """
+        class_name = self.__class_name(cls)
+        self.__field_indexes.pop(class_name, None)
+        self.__deferred.add(class_name)
 
     def new(self, obj):
         """
@@ -38,41 +500,429 @@ class FileStorage:
             obj: The object to be added.
         """
         class_name = obj.__class__.__name__
-        self.__objects[f"{class_name}.{obj.id}"] = obj
+        key = f"{class_name}.{obj.id}"
+        self.__indexes()
+        old = self.__objects.get(key)
+        if old is None:
+            self.__indexed_len += 1
+        elif old is not obj:
+            self.__remove_index(key, old)
+        if self.__batch.active and old is not obj:
+            self.__batch.record("new", obj, old)
+        self.__objects[key] = obj
+        self.__add_index(key, obj)
+        self.__pending[key] = obj
+
+    def touch(self, obj, name=None, old=MISSING):
+        """
+        Records that an object changed since the last save.
+        BaseModel calls it whenever an attribute is set; call it directly
+        after changing a mutable attribute in place.
+
+        Args:
+            obj: The modified object.
+            name (str): The attribute that was set, if known.
+            old: The previous value of the attribute, used to undo the
+                change when a batch is rolled back.
+        """
+        key = f"{obj.__class__.__name__}.{getattr(obj, 'id', None)}"
+        if self.__objects.get(key) is obj:
+            if name is not None and self.__batch.active:
+                self.__batch.record("set", obj, name, old)
+            self.__pending[key] = obj
+            self.__indexes()
+            for index in self.__attr_indexes.get(
+                    obj.__class__.__name__, {}).values():
+                index.update(key, obj)
+            for index in self.__field_indexes.get(
+                    obj.__class__.__name__, {}).values():
+                if name is None or name in index.attrs:
+                    index.update(key, obj)
+
+    def delete(self, obj):
+        """
+        Removes an object from the dictionary of objects.
+        The object does not need to be loaded yet.
+
+        Args:
+            obj: The object to be removed.
+        """
+        class_name = obj.__class__.__name__
+        key = f"{class_name}.{obj.id}"
+        self.__indexes()
+        old = self.__objects.pop(key, None)
+        if old is not None:
+            self.__indexed_len -= 1
+            self.__remove_index(key, old)
+        if self.__batch.active:
+            self.__batch.record("delete", old or obj)
+        self.__pending[key] = None
+
+    @staticmethod
+    def __class_name(cls):
+        """Returns the name of cls, which is a class or a class name"""
+        return cls if isinstance(cls, str) else cls.__name__
+
+    def __indexes(self):
+        """
+        Returns the class name -> {key: object} buckets.
+        The buckets and attribute indexes are rebuilt when the objects
+        dictionary was replaced or had entries removed without going
+        through the storage.
+        """
+        objects = self.__objects
+        if (objects is not self.__indexed or
+                len(objects) != self.__indexed_len):
+            self.__classes = {}
+            self.__shards = {}
+            self.__attr_indexes = {}
+            self.__field_indexes = {}
+            for key, obj in objects.items():
+                self.__add_index(key, obj)
+            self.__indexed = objects
+            self.__indexed_len = len(objects)
+        return self.__classes
+
+    def __add_index(self, key, obj):
+        """Adds an object to the class bucket and attribute indexes"""
+        cls = obj.__class__
+        self.__classes.setdefault(cls.__name__, {})[key] = obj
+        if self.layout.sharded:
+            self.__shards.setdefault(self.layout.shard(key), {})[key] = obj
+        for index in self.__class_indexes(cls).values():
+            index.add(key, obj)
+        for index in self.__class_field_indexes(cls).values():
+            index.add(key, obj)
+
+    def __remove_index(self, key, obj):
+        """Removes an object from the class bucket and attribute indexes"""
+        class_name = obj.__class__.__name__
+        self.__classes.get(class_name, {}).pop(key, None)
+        if self.layout.sharded:
+            self.__shards.get(self.layout.shard(key), {}).pop(key, None)
+        for index in self.__attr_indexes.get(class_name, {}).values():
+            index.remove(key)
+        for index in self.__field_indexes.get(class_name, {}).values():
+            index.remove(key)
 
     def save(self):
         """
         Serializes the objects dictionary to a JSON file.
         The JSON file path is specified by __file_path.
+        Only the objects changed since the last save are encoded again,
+        the others reuse their cached JSON fragment.
+        In journal mode only the pending changes are appended to the log.
+        With a commit window, the saves of other threads made within
+        the window are written together.
+        With a background writer, the changed objects are encoded and
+        the files are written later by the writer thread.
+        Inside a batch of the calling thread the save is deferred to the
+        end of the batch.
         """
-        obj_dict = {}
-        for key, obj in self.__objects.items():
-            obj_dict[key] = obj.to_dict()
-        with open(self.__file_path, "w") as file:
-            json.dump(obj_dict, file)
+        if self.__batch.active:
+            self.__batch.save_requested = True
+            return
+        if self.writer is not None:
+            self.writer.submit(self.__prepare())
+        elif self.group_commit is not None:
+            self.group_commit.request()
+        else:
+            self.__save()
 
-    def reload(self):
+    def batch(self):
+        """
+        Returns a context manager deferring the saves made inside it to
+        a single save when it exits. If an exception leaves it, the
+        attributes set and the objects created or deleted inside it are
+        restored in memory and nothing is saved.
+        Batches can be nested, only the outermost one saves.
+
+            with storage.batch():
+                for key, value in attributes.items():
+                    setattr(obj, key, value)
+                    obj.save()
+        """
+        return self.__batch()
+
+    def flush(self):
+        """
+        Saves the pending changes, then blocks until every save is on
+        disk. Raises the error of a failed background write.
+        """
+        if self.writer is not None:
+            if self.__pending:
+                self.writer.submit(self.__prepare())
+            self.writer.wait()
+        elif self.__pending or self.__failed is not None:
+            self.save()
+
+    def wait(self):
+        """
+        Blocks until the saves made so far are on disk. Raises the
+        error of a failed background write.
+        """
+        if self.writer is not None:
+            self.writer.wait()
+
+    def __save(self):
+        """Writes the pending changes, keeping them if the write fails"""
+        work = self.__prepare()
+        if self.__failed is not None:
+            work = self.__merge(self.__failed, work)
+            self.__failed = None
+        try:
+            self.__write(work)
+        except BaseException:
+            self.__failed = work
+            raise
+
+    def __prepare(self):
+        """
+        Takes the pending changes and encodes the changed objects, so
+        that changes made in the meantime stay pending for the next
+        save and the files can be written by another thread.
+
+        Returns:
+            tuple: The journal records to append and the set of
+            (class name, shard) to rewrite.
+        """
+        if self.journal_mode:
+            pending = self.__take_pending()
+            records = [("del", key, None) if obj is None
+                       else ("put", key, obj.to_dict())
+                       for key, obj in pending.items()
+                       if obj is None or self.__objects.get(key) is obj]
+            return records, set()
+        if self.layout.sharded:
+            for class_name in {key.split(".")[0] for key in self.__pending}:
+                self.__load(class_name)
+        else:
+            self.__load()
+        with self.__lock:
+            pending = self.__take_pending()
+            shards = set()
+            for key, obj in pending.items():
+                if obj is None or self.__objects.get(key) is not obj:
+                    self.__fragments.pop(key, None)
+                else:
+                    self.__record(key, obj)
+                shards.add((key.split(".")[0], self.layout.shard(key)))
+        return [], shards
+
+    @staticmethod
+    def __merge(old, new):
+        """Merges two prepared saves into one"""
+        return old[0] + new[0], old[1] | new[1]
+
+    def __write(self, work):
+        """Writes a prepared save to the files"""
+        records, shards = work
+        if self.journal_mode:
+            self.journal.append(records)
+            if self.journal.needs_compaction():
+                self.compact()
+        elif self.layout.sharded:
+            self.__write_shards(shards)
+        else:
+            with self.__lock:
+                cached = self.__fragments.get
+                parts = [cached(key) or self.__record(key, obj)
+                         for key, obj in list(self.__objects.items())]
+                fragments = self.__fragments
+                if len(fragments) > len(self.__objects):
+                    for key in [k for k in fragments
+                                if k not in self.__objects]:
+                        del fragments[key]
+            self.journal.wait()
+            self.__write_file(self.__file_path,
+                              "{" + ",\n".join(parts) + "}")
+            self.journal.clear()
+
+    def __write_shards(self, shards):
+        """
+        Rewrites the given (class name, shard) files, encoding only the
+        objects of these shards.
+        """
+        contents = {}
+        with self.__lock:
+            self.__indexes()
+            cached = self.__fragments.get
+            for class_name, shard in shards:
+                records = [cached(key) or self.__record(key, obj)
+                           for key, obj in list(self.__shards.get(
+                               shard, {}).items())]
+                contents[shard] = ("{" + ",\n".join(records) + "}"
+                                   if records else None)
+        if contents:
+            self.layout.write(contents, self.__write_file)
+
+    def __take_pending(self):
+        """Returns the pending changes and starts a new set of them"""
+        pending, self.__pending = self.__pending, {}
+        return pending
+
+    def __record(self, key, obj):
+        """Encodes the JSON member of a key and object, and caches it"""
+        fragment = json.dumps(key) + ": " + json.dumps(obj.to_dict())
+        self.__fragments[key] = fragment
+        return fragment
+
+    def __write_file(self, path, text):
+        """Atomically replaces the content of a file"""
+        write_atomic(path, text, self.fsync)
+
+    def migrate(self, layout, buckets=None):
+        """
+        Rewrites every object with another file layout, then removes
+        the files of the previous one.
+
+        Args:
+            layout (str): "single", "class", "bucket" or "month".
+            buckets (int): The number of files per class in the
+                "bucket" layout, unchanged by default.
+        """
+        if self.journal_mode and layout != "single":
+            raise ValueError("journal mode needs the single layout")
+        self.__load()
+        names = set(clslist)
+        old_paths = set(self.layout.paths(names))
+        self.layout = ShardLayout(self.__file_path, layout,
+                                  buckets or self.layout.buckets)
+        self.__shards = {}
+        if self.layout.sharded:
+            for key, obj in self.__objects.items():
+                self.__shards.setdefault(self.layout.shard(key),
+                                         {})[key] = obj
+        self.__pending.update(self.__objects)
+        self.save()
+        self.wait()
+        written = {self.layout.path(shard) for shard in self.__shards}
+        if not self.layout.sharded:
+            written.add(self.__file_path)
+        for path in old_paths - written:
+            if os.path.exists(path):
+                os.remove(path)
+        if not self.layout.sharded and os.path.isdir(self.__file_path +
+                                                     ".d"):
+            if not os.listdir(self.__file_path + ".d"):
+                os.rmdir(self.__file_path + ".d")
+
+    def reload(self, *, classes=None, progress=None):
         """
         Deserializes the JSON file and updates the objects dictionary.
         If the JSON file (__file_path) exists it reads the file
-        and loads objects.
-        If the file doesn't exist, it does nothing.
-        """
-        clslist = {
-            'BaseModel': BaseModel,
-            'State': State,
-            'City': City,
-            'Amenity': Amenity,
-            'Place': Place,
-            'Review': Review,
-            'User': User
-        }
+        and loads objects, then replays the journal on top of it.
+        If neither file exists, it does nothing.
+        The file is parsed one object at a time, so that only the built
+        objects are kept in memory.
 
-        try:
-            with open(self.__file_path, "r") as file:
-                obj_dict = json.load(file)
-                for key, value in obj_dict.items():
-                    class_name, obj_id = key.split(".")
-                    self.__objects[key] = globals()[class_name](**value)
-        except FileNotFoundError:
-            pass
+        Args:
+            classes: The classes or class names to load, all by default.
+            progress: A callable taking the number of records read, the
+                bytes read and the file size, called every
+                progress_every records and at the end.
+        """
+        self.wait()
+        self.__failed = None
+        if classes is None:
+            names = set(clslist)
+        else:
+            names = {self.__class_name(cls) for cls in classes}
+        self.__read(names, True, progress)
+        if self.journal_mode and self.journal.needs_compaction():
+            self.compact()
+
+    def __load(self, cls=None):
+        """
+        Loads the objects of cls, or of every class, the first time
+        they are needed. Objects created, changed or deleted in memory
+        in the meantime are kept as they are.
+        """
+        if self.__complete:
+            return
+        if cls is None:
+            names = set(clslist) - self.__loaded
+        else:
+            names = {self.__class_name(cls)} - self.__loaded
+        if names:
+            self.__read(names, False)
+
+    def __read(self, names, overwrite, progress=None):
+        """Loads the objects of the classes in names from the files"""
+        objects = self.__objects
+        # indexes already built are extended, not rebuilt from scratch
+        indexed = (objects is self.__indexed and
+                   len(objects) == self.__indexed_len)
+        for key, value in self.__records(names, progress):
+            class_name, obj_id = key.split(".")
+            if class_name not in names:
+                continue
+            if overwrite:
+                self.__pending.pop(key, None)
+            elif key in objects or key in self.__pending:
+                continue
+            obj = clslist[class_name](**value)
+            if indexed:
+                old = objects.get(key)
+                if old is None:
+                    self.__indexed_len += 1
+                else:
+                    self.__remove_index(key, old)
+            objects[key] = obj
+            if indexed:
+                self.__add_index(key, obj)
+        if overwrite:
+            self.__fragments.clear()
+        self.__loaded |= names
+        self.__complete = self.__loaded >= set(clslist)
+
+    def __records(self, names, progress=None):
+        """
+        Yields the (key, to_dict()) records of the files holding the
+        classes in names patched with the journal, reading the files one
+        record at a time or in parallel chunks.
+        """
+        changes = self.journal.changes()
+        paths = self.layout.paths(names)
+        count = done = 0
+        total = sum(os.path.getsize(path) for path in paths)
+        if self.workers > 1 and total >= self.parallel_min_size:
+            chunks = parallel_load.load(paths, self.workers, names)
+        else:
+            chunks = (chunk for path in paths
+                      for chunk in self.__stream(path))
+        for records, size in chunks:
+            done += size
+            for key, value in records:
+                count += 1
+                if progress and count % self.progress_every == 0:
+                    progress(count, done, total)
+                if key not in changes:
+                    yield key, value
+        for key, value in changes.items():
+            if value is not None:
+                yield key, value
+        if progress:
+            progress(count, total, total)
+
+    @staticmethod
+    def __stream(path):
+        """
+        Yields the records of a JSON file one at a time, with the number
+        of bytes read since the previous one.
+        """
+        with open(path, "r") as file:
+            stream = JSONStream(file)
+            position = 0
+            for record in stream:
+                yield (record,), stream.position - position
+                position = stream.position
+
+    def compact(self, wait=False):
+        """
+        Folds the journal into the JSON file in a background thread.
+
+        Args:
+            wait (bool): Whether to block until the compaction ends.
+        """
+        self.journal.compact(self.__file_path, wait)
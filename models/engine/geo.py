@@ -0,0 +1,271 @@
+#!/usr/bin/python3
+"""Spatial index of the coordinates of the objects"""
+
+
+import math
+
+# mean radius of the Earth in km
+EARTH_RADIUS = 6371.0088
+# largest possible distance between two points in km
+MAX_DISTANCE = math.pi * EARTH_RADIUS
+
+
+def distance(lat1, lon1, lat2, lon2):
+    """
+    Returns the great-circle distance between two points.
+
+    Args:
+        lat1 (float): The latitude of the first point in degrees.
+        lon1 (float): The longitude of the first point in degrees.
+        lat2 (float): The latitude of the second point in degrees.
+        lon2 (float): The longitude of the second point in degrees.
+
+    Returns:
+        float: The distance in km.
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (math.sin((phi2 - phi1) / 2) ** 2 +
+         math.cos(phi1) * math.cos(phi2) *
+         math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(a)))
+
+
+def normalize(lon):
+    """Returns a longitude in degrees within [-180, 180)"""
+    if -180.0 <= lon < 180.0:
+        return lon
+    return (lon + 180.0) % 360.0 - 180.0
+
+
+def longitude_ranges(west, east):
+    """
+    Returns the longitude ranges of a box, split in two when it crosses
+    the antimeridian.
+
+    Args:
+        west (float): The western edge in degrees.
+        east (float): The eastern edge in degrees.
+
+    Returns:
+        list: The (west, east) pairs within [-180, 180].
+    """
+    if east - west >= 360.0:
+        return [(-180.0, 180.0)]
+    west, east = normalize(west), normalize(east)
+    if west <= east:
+        return [(west, east)]
+    return [(west, 180.0), (-180.0, east)]
+
+
+def bounding_box(lat, lon, radius):
+    """
+    Returns the smallest box holding the points within a distance of a
+    point.
+
+    Args:
+        lat (float): The latitude of the point in degrees.
+        lon (float): The longitude of the point in degrees.
+        radius (float): The distance in km.
+
+    Returns:
+        tuple: The south and north edges and the longitude_ranges().
+    """
+    delta = radius / EARTH_RADIUS
+    south = lat - math.degrees(delta)
+    north = lat + math.degrees(delta)
+    if south <= -90.0 or north >= 90.0 or delta >= math.pi / 2:
+        # the circle holds a pole, so every longitude
+        return max(south, -90.0), min(north, 90.0), [(-180.0, 180.0)]
+    dlon = math.degrees(math.asin(min(1.0, math.sin(delta) /
+                                      math.cos(math.radians(lat)))))
+    return south, north, longitude_ranges(lon - dlon, lon + dlon)
+
+
+def point(lat, lon):
+    """
+    Returns the coordinates of a point as floats.
+
+    Args:
+        lat: The latitude in degrees.
+        lon: The longitude in degrees.
+
+    Returns:
+        tuple: The (latitude, longitude) with the longitude normalized,
+        None if they are not numbers or the latitude is out of range.
+    """
+    if not isinstance(lat, (int, float)) or \
+            not isinstance(lon, (int, float)):
+        return None
+    lat, lon = float(lat), float(lon)
+    if not -90.0 <= lat <= 90.0 or not math.isfinite(lon):
+        return None
+    return lat, normalize(lon)
+
+
+class GeoIndex:
+    """
+    This class indexes objects by their coordinates in a grid of cells
+    of cell_size degrees, so that the points in a box or near a point
+    are found by looking at the cells around it only.
+
+    Radius queries look at the cells of the bounding box of the circle,
+    or at the occupied cells when there are fewer. Nearest-k queries
+    double their radius until k points are found.
+    """
+
+    def __init__(self, attrs=("latitude", "longitude"), cell_size=0.1):
+        """
+        Initializes the index.
+
+        Args:
+            attrs (tuple): The names of the latitude and longitude.
+            cell_size (float): The size of a cell in degrees.
+        """
+        self.attrs = tuple(attrs)
+        self.cell_size = cell_size
+        self.__cells = {}
+        self.__points = {}
+
+    def __len__(self):
+        """returns the number of indexed objects"""
+        return len(self.__points)
+
+    def __cell(self, lat, lon):
+        """Returns the (row, column) of the cell of a point"""
+        return (math.floor(lat / self.cell_size),
+                math.floor(lon / self.cell_size))
+
+    def add(self, key, obj):
+        """
+        Indexes an object under its current coordinates. Objects
+        without valid coordinates are left out.
+
+        Args:
+            key (str): The storage key of the object.
+            obj: The object to index.
+        """
+        self.remove(key)
+        coords = point(*(getattr(obj, attr, None) for attr in self.attrs))
+        if coords is None:
+            return
+        cell = self.__cell(*coords)
+        self.__cells.setdefault(cell, {})[key] = coords
+        self.__points[key] = cell
+
+    update = add
+
+    def remove(self, key):
+        """
+        Removes an object from the index.
+
+        Args:
+            key (str): The storage key of the object.
+        """
+        cell = self.__points.pop(key, None)
+        if cell is not None:
+            points = self.__cells[cell]
+            del points[key]
+            if not points:
+                del self.__cells[cell]
+
+    def __box_cells(self, south, north, lon_ranges):
+        """Yields the {key: point} dictionaries of the cells of a box"""
+        rows = range(math.floor(south / self.cell_size),
+                     math.floor(north / self.cell_size) + 1)
+        cols = [range(math.floor(west / self.cell_size),
+                      math.floor(east / self.cell_size) + 1)
+                for west, east in lon_ranges]
+        if len(rows) * sum(map(len, cols)) <= len(self.__cells):
+            for row in rows:
+                for columns in cols:
+                    for col in columns:
+                        points = self.__cells.get((row, col))
+                        if points:
+                            yield points
+        else:
+            for (row, col), points in self.__cells.items():
+                if row in rows and any(col in columns for columns in cols):
+                    yield points
+
+    def __candidates(self, south, north, lon_ranges):
+        """Yields the (key, point) pairs of the cells of a box"""
+        for points in self.__box_cells(south, north, lon_ranges):
+            yield from points.items()
+
+    def estimate_within(self, south, west, north, east):
+        """
+        Returns the number of objects in the cells of a box, an upper
+        bound of the objects within() finds, counted without looking
+        at their points.
+        """
+        return sum(map(len, self.__box_cells(
+            south, north, longitude_ranges(west, east))))
+
+    def estimate_near(self, lat, lon, radius=None):
+        """
+        Returns the number of objects in the cells of the bounding box
+        of a radius, an upper bound of the objects near() finds.
+        """
+        if radius is None or radius >= MAX_DISTANCE:
+            return len(self.__points)
+        return sum(map(len, self.__box_cells(
+            *bounding_box(lat, lon, radius))))
+
+    def within(self, south, west, north, east):
+        """
+        Returns the objects in a box, which crosses the antimeridian
+        when west is greater than east.
+
+        Args:
+            south (float): The southern edge in degrees.
+            west (float): The western edge in degrees.
+            north (float): The northern edge in degrees.
+            east (float): The eastern edge in degrees.
+
+        Returns:
+            list: The storage keys of the objects, sorted.
+        """
+        lon_ranges = longitude_ranges(west, east)
+        return sorted(key for key, (lat, lon)
+                      in self.__candidates(south, north, lon_ranges)
+                      if south <= lat <= north and
+                      any(w <= lon <= e for w, e in lon_ranges))
+
+    def near(self, lat, lon, radius=None, limit=None):
+        """
+        Returns the objects nearest to a point.
+
+        Args:
+            lat (float): The latitude of the point in degrees.
+            lon (float): The longitude of the point in degrees.
+            radius (float): The maximum distance in km, none by default.
+            limit (int): The maximum number of objects, none by default.
+
+        Returns:
+            list: The (storage key, distance in km) pairs, nearest first.
+        """
+        if radius is not None or limit is None:
+            if radius is None:
+                radius = MAX_DISTANCE
+            return self.__near(lat, lon, radius)[:limit]
+        radius = self.cell_size * 111.0
+        while True:
+            found = self.__near(lat, lon, radius)
+            if len(found) >= limit or radius >= MAX_DISTANCE:
+                return found[:limit]
+            radius = min(radius * 2, MAX_DISTANCE)
+
+    def __near(self, lat, lon, radius):
+        """Returns the (key, distance) pairs within radius, nearest first"""
+        if radius >= MAX_DISTANCE:
+            candidates = ((key, coords) for points in self.__cells.values()
+                          for key, coords in points.items())
+        else:
+            candidates = self.__candidates(*bounding_box(lat, lon, radius))
+        found = []
+        for key, coords in candidates:
+            km = distance(lat, lon, *coords)
+            if km <= radius:
+                found.append((km, key))
+        found.sort()
+        return [(key, km) for km, key in found]
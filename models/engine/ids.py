@@ -0,0 +1,86 @@
+#!/usr/bin/python3
+"""Ids of the new objects, random or ordered by creation time"""
+
+
+import os
+import threading
+import time
+from uuid import UUID, uuid4
+
+# version of the uuids new_id() makes: 4 for random ones, 7 for ones
+# starting with their creation time in milliseconds, set from the
+# HBNB_ID_VERSION environment variable by models
+version = 4
+_lock = threading.Lock()
+_last = [0, 0]
+
+
+def uuid7(ms=None):
+    """
+    Returns a UUID version 7 (RFC 9562): 48 bits of Unix time in
+    milliseconds, then 12 bits counting the uuids made in the same
+    millisecond, from a random start, then 62 random bits. The uuids
+    made for the current time by a process are thus strictly
+    increasing, and sort as text like their creation times.
+
+    Args:
+        ms (int): The Unix time in milliseconds, such as the creation
+            time of an imported object, now by default.
+
+    Returns:
+        str: The uuid.
+    """
+    rand = int.from_bytes(os.urandom(10), "big")
+    seq = rand >> 69
+    if ms is None:
+        ms = time.time_ns() // 1000000
+        with _lock:
+            last_ms, last_seq = _last
+            if ms <= last_ms:
+                # same millisecond, or the clock went back
+                ms, seq = last_ms, last_seq + 1
+                if seq > 0xfff:
+                    ms, seq = ms + 1, 0
+            _last[:] = ms, seq
+    value = (ms << 80 | 0x7 << 76 | seq << 64 | 0b10 << 62 |
+             rand & (1 << 62) - 1)
+    return str(UUID(int=value))
+
+
+def new_id(created_at=None):
+    """
+    Returns the id of a new object, a uuid of the chosen version.
+
+    Args:
+        created_at (datetime): The creation time of the object, now by
+            default.
+
+    Returns:
+        str: The id.
+    """
+    if version == 7:
+        return uuid7(None if created_at is None
+                     else int(created_at.timestamp() * 1000))
+    return str(uuid4())
+
+
+def id_ms(obj_id):
+    """
+    Returns the creation time held by an id, read from its text as the
+    layouts ask for the one of every stored id.
+
+    Args:
+        obj_id (str): The id of an object.
+
+    Returns:
+        int: The Unix time in milliseconds of a version 7 uuid, None
+        for other ids such as random uuids.
+    """
+    if not isinstance(obj_id, str) or len(obj_id) != 36 or \
+            obj_id[8] != "-" or obj_id[14] != "7" or \
+            obj_id[19] not in "89abAB":
+        return None
+    try:
+        return int(obj_id[:8] + obj_id[9:13], 16)
+    except ValueError:
+        return None
@@ -0,0 +1,111 @@
+#!/usr/bin/python3
+"""Secondary indexes maintained by the storage engines"""
+
+
+class AttributeIndex:
+    """
+    This class maps the values of one attribute, such as a foreign key,
+    to the objects holding them so that they can be found without
+    scanning every object.
+    """
+
+    def __init__(self, attr):
+        """
+        Initializes the index.
+
+        Args:
+            attr (str): The name of the indexed attribute.
+        """
+        self.attr = attr
+        self.__entries = {}
+        self.__values = {}
+        self.__lists = {}
+
+    def add(self, key, obj):
+        """
+        Indexes an object under the current value of the attribute.
+        Objects holding an unhashable value are left out.
+
+        Args:
+            key (str): The storage key of the object.
+            obj: The object to index.
+        """
+        value = getattr(obj, self.attr, None)
+        try:
+            bucket = self.__entries.setdefault(value, {})
+        except TypeError:
+            return
+        bucket[key] = obj
+        self.__values[key] = value
+        self.__lists.pop(value, None)
+
+    def remove(self, key):
+        """
+        Removes an object from the index.
+
+        Args:
+            key (str): The storage key of the object.
+        """
+        if key in self.__values:
+            value = self.__values.pop(key)
+            self.__lists.pop(value, None)
+            bucket = self.__entries[value]
+            del bucket[key]
+            if not bucket:
+                del self.__entries[value]
+
+    def update(self, key, obj):
+        """
+        Moves an object to the bucket of its current value.
+
+        Args:
+            key (str): The storage key of the object.
+            obj: The object to index.
+
+        Returns:
+            tuple: The (old, new) values if the value changed,
+            otherwise None.
+        """
+        old = self.__values.get(key)
+        value = getattr(obj, self.attr, None)
+        if key in self.__values and type(old) is type(value) and \
+                old == value:
+            return None
+        self.remove(key)
+        self.add(key, obj)
+        return (old, value)
+
+    def get(self, value):
+        """
+        Returns the objects holding a value.
+
+        Args:
+            value: The attribute value to look up.
+
+        Returns:
+            dict: The key -> object mapping, which must not be modified.
+        """
+        try:
+            return self.__entries.get(value, {})
+        except TypeError:
+            return {}
+
+    def get_list(self, value):
+        """
+        Returns the objects holding a value as a list, which is cached
+        until an object enters or leaves the bucket of that value.
+
+        Args:
+            value: The attribute value to look up.
+
+        Returns:
+            list: The matching objects, which must not be modified.
+        """
+        try:
+            objs = self.__lists.get(value)
+        except TypeError:
+            return []
+        if objs is None:
+            objs = list(self.get(value).values())
+            self.__lists[value] = objs
+        return objs
@@ -0,0 +1,232 @@
+#!/usr/bin/python3
+"""Append-only journal used by FileStorage"""
+
+
+import json
+import os
+import threading
+import time
+from models.engine.durable import atomic_file, sync_directory
+from models.engine.json_stream import JSONStream
+
+
+class Journal:
+    """
+    This class keeps a write-ahead log of storage mutations next to
+    the JSON snapshot, so that a save only appends what changed.
+
+    Every line of the log is one JSON record, either
+    {"op": "put", "key": <key>, "value": <to_dict()>} or
+    {"op": "del", "key": <key>}.
+
+    Compaction folds the log into a new snapshot in a background
+    thread: the live log is first renamed to a frozen segment, new
+    appends go to a fresh log, and the segment is merged into the
+    snapshot which is then atomically replaced.
+    """
+
+    def __init__(self, path, max_size=4 * 1024 * 1024, max_replay=1.0,
+                 sync=True):
+        """
+        Initializes the journal.
+
+        Args:
+            path (str): The path of the log file.
+            max_size (int): The log size in bytes that triggers
+                compaction.
+            max_replay (float): The replay time in seconds that
+                triggers compaction.
+            sync (bool): Whether appends and compactions are flushed
+                to disk before returning.
+        """
+        self.path = path
+        self.segment_path = path + ".compacting"
+        self.max_size = max_size
+        self.max_replay = max_replay
+        self.sync = sync
+        self.replay_time = 0.0
+        self.__lock = threading.Lock()
+        self.__compactor = None
+
+    def append(self, records):
+        """
+        Appends records to the end of the log in a single write.
+
+        Args:
+            records: An iterable of (op, key, value) tuples where op is
+                "put" or "del" and value is None for deletes.
+
+        Returns:
+            int: The number of records written.
+        """
+        lines = []
+        for op, key, value in records:
+            record = {"op": op, "key": key}
+            if op == "put":
+                record["value"] = value
+            lines.append(json.dumps(record) + "\n")
+        if lines:
+            with self.__lock:
+                with open(self.path, "a+b") as file:
+                    self.__cut_torn_tail(file)
+                    file.write("".join(lines).encode("utf-8"))
+                    if self.sync:
+                        file.flush()
+                        os.fsync(file.fileno())
+        return len(lines)
+
+    @staticmethod
+    def __cut_torn_tail(file):
+        """
+        Truncates the log after its last newline, dropping the partial
+        record a crash during an append may have left, so that the next
+        records start on a line of their own.
+        """
+        end = file.seek(0, os.SEEK_END)
+        pos = end
+        while pos > 0:
+            start = max(0, pos - 65536)
+            file.seek(start)
+            chunk = file.read(pos - start)
+            if pos == end and chunk.endswith(b"\n"):
+                return
+            newline = chunk.rfind(b"\n")
+            if newline >= 0:
+                file.truncate(start + newline + 1)
+                return
+            pos = start
+        if end:
+            file.truncate(0)
+
+    def changes(self):
+        """
+        Returns the outcome of the log for every key it mentions, so
+        that the snapshot can be streamed and patched record by record.
+        A segment left by an interrupted compaction is read first.
+        It does not wait for a running compaction: the segment is read
+        with the log, and applying it again on the snapshot it was
+        folded into changes nothing.
+
+        Returns:
+            dict: The key -> to_dict() mapping of the last put of every
+            key, with None for the keys deleted last.
+        """
+        start = time.perf_counter()
+        changes = {}
+        with self.__lock:
+            # the log is not renamed to the segment between both reads
+            self.__apply(self.segment_path, changes)
+            self.__apply(self.path, changes)
+        self.replay_time = time.perf_counter() - start
+        return changes
+
+    @staticmethod
+    def __apply(path, changes):
+        """
+        Applies the records of one log file to changes, setting deleted
+        keys to None.
+        A truncated last line, left by a crash during an append, is
+        ignored.
+        """
+        try:
+            with open(path, "r") as file:
+                for line in file:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break
+                    changes[record["key"]] = (record["value"]
+                                              if record["op"] == "put"
+                                              else None)
+        except FileNotFoundError:
+            pass
+
+    def size(self):
+        """Returns the size of the log in bytes"""
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def needs_compaction(self):
+        """Returns True once the log is too large or too slow to replay"""
+        return (self.size() > self.max_size or
+                self.replay_time > self.max_replay)
+
+    def compacting(self):
+        """Returns True while a background compaction is running"""
+        return self.__compactor is not None and self.__compactor.is_alive()
+
+    def compact(self, snapshot_path, wait=False):
+        """
+        Folds the log into a new snapshot in a background thread.
+        Appends made while the compaction runs go to a fresh log.
+
+        Args:
+            snapshot_path (str): The JSON snapshot to rewrite.
+            wait (bool): Whether to block until the compaction ends.
+
+        Returns:
+            threading.Thread: The compaction thread, or None if there
+            was nothing to compact.
+        """
+        with self.__lock:
+            if self.compacting():
+                thread = self.__compactor
+            elif (not os.path.exists(self.segment_path) and
+                  not os.path.exists(self.path)):
+                return None
+            else:
+                if not os.path.exists(self.segment_path):
+                    os.replace(self.path, self.segment_path)
+                thread = threading.Thread(target=self.__fold,
+                                          args=(snapshot_path,))
+                self.__compactor = thread
+                thread.start()
+        if wait:
+            thread.join()
+        return thread
+
+    def __fold(self, snapshot_path):
+        """
+        Merges the frozen segment into the snapshot, streaming the old
+        snapshot record by record into the new one.
+        """
+        changes = {}
+        self.__apply(self.segment_path, changes)
+        with atomic_file(snapshot_path, self.sync) as out:
+            sep = "{"
+            try:
+                with open(snapshot_path, "r") as file:
+                    for key, value in JSONStream(file):
+                        if key not in changes:
+                            out.write(sep + json.dumps(key) + ": " +
+                                      json.dumps(value))
+                            sep = ",\n"
+            except FileNotFoundError:
+                pass
+            for key, value in changes.items():
+                if value is not None:
+                    out.write(sep + json.dumps(key) + ": " +
+                              json.dumps(value))
+                    sep = ",\n"
+            out.write("{}" if sep == "{" else "}")
+        os.remove(self.segment_path)
+        if self.sync:
+            sync_directory(os.path.dirname(snapshot_path) or ".")
+        self.replay_time = 0.0
+
+    def wait(self):
+        """Blocks until a running compaction has finished"""
+        thread = self.__compactor
+        if thread is not None:
+            thread.join()
+
+    def clear(self):
+        """Removes the log once its records are part of the snapshot"""
+        self.wait()
+        for path in (self.segment_path, self.path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
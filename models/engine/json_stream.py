@@ -0,0 +1,99 @@
+#!/usr/bin/python3
+"""Incremental reader for the JSON object written by the storage"""
+
+
+import json
+
+
+class JSONStream:
+    """
+    This class reads the members of a top-level JSON object one at a
+    time, so that a large file can be processed without holding its
+    whole text or decoded content in memory.
+    """
+
+    def __init__(self, file, chunk_size=1 << 16):
+        """
+        Initializes the stream.
+
+        Args:
+            file: A file opened in text mode.
+            chunk_size (int): The number of characters read at a time.
+        """
+        self.file = file
+        self.chunk_size = chunk_size
+        self.position = 0
+        self.__decoder = json.JSONDecoder()
+        self.__buf = ""
+        self.__pos = 0
+        self.__eof = False
+
+    def __fill(self):
+        """Reads the next chunk, returns False at the end of the file"""
+        if self.__eof:
+            return False
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            self.__eof = True
+            return False
+        self.__buf = self.__buf[self.__pos:] + chunk
+        self.__pos = 0
+        return True
+
+    def __peek(self):
+        """Returns the next non-whitespace character, or '' at the end"""
+        while True:
+            buf, pos = self.__buf, self.__pos
+            while pos < len(buf) and buf[pos] in " \t\r\n":
+                pos += 1
+            self.position += pos - self.__pos
+            self.__pos = pos
+            if pos < len(buf):
+                return buf[pos]
+            if not self.__fill():
+                return ""
+
+    def __expect(self, chars):
+        """Consumes the next character, which must be one of chars"""
+        char = self.__peek()
+        if char == "" or char not in chars:
+            raise ValueError(
+                f"expected one of {chars!r} at character {self.position}")
+        self.__pos += 1
+        self.position += 1
+        return char
+
+    def __value(self):
+        """Decodes the next JSON value"""
+        self.__peek()
+        while True:
+            try:
+                value, end = self.__decoder.raw_decode(self.__buf, self.__pos)
+            except json.JSONDecodeError:
+                if self.__fill():
+                    continue
+                raise
+            if end == len(self.__buf) and self.__fill():
+                continue
+            self.position += end - self.__pos
+            self.__pos = end
+            return value
+
+    def __iter__(self):
+        """
+        Yields the (key, value) members of the object in file order.
+        An empty file yields nothing.
+        """
+        if self.__peek() == "":
+            return
+        self.__expect("{")
+        if self.__peek() == "}":
+            self.__expect("}")
+            return
+        while True:
+            key = self.__value()
+            self.__expect(":")
+            value = self.__value()
+            yield key, value
+            if self.__expect(",}") == "}":
+                return
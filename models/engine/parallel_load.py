@@ -0,0 +1,96 @@
+#!/usr/bin/python3
+"""Parallel decoding of the JSON files written by the storage"""
+
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+
+def split(path, parts):
+    """
+    Splits a file into byte ranges of about the same size.
+
+    Args:
+        path (str): The file to split.
+        parts (int): The number of ranges wanted.
+
+    Returns:
+        list: The (path, start, end) ranges covering the file.
+    """
+    size = os.path.getsize(path)
+    step = max(1, -(-size // parts))
+    return [(path, start, min(start + step, size))
+            for start in range(0, size, step)]
+
+
+def decode_range(task):
+    """
+    Decodes the records of the lines starting inside a byte range.
+    The storage writes one record per line, so a range only needs to
+    be aligned on the next line start. A file written on a single line
+    is decoded by the range holding its first byte.
+
+    Args:
+        task (tuple): The (path, start, end, names) to decode, names
+            being the class names to keep.
+
+    Returns:
+        list: The (key, attributes) records, with created_at and
+        updated_at already converted to datetime.
+    """
+    path, start, end, names = task
+    records = []
+    with open(path, "rb") as file:
+        if start:
+            file.seek(start - 1)
+            file.readline()
+        while file.tell() < end:
+            line = file.readline()
+            if not line:
+                break
+            text = line.decode("utf-8").strip()
+            if text.startswith("{"):
+                text = text[1:]
+            if text.endswith(","):
+                text = text[:-1]
+            elif text.endswith("}"):
+                text = text[:-1]
+            if not text:
+                continue
+            for key, value in json.loads("{" + text + "}").items():
+                class_name = key.split(".")[0]
+                if class_name not in names:
+                    continue
+                if not isinstance(value, dict) or "id" not in value:
+                    raise ValueError(f"invalid record {key}")
+                for attr in ("created_at", "updated_at"):
+                    if attr in value:
+                        value[attr] = datetime.fromisoformat(value[attr])
+                records.append((key, value))
+    return records
+
+
+def load(paths, workers, names, chunks_per_worker=4):
+    """
+    Decodes files in a pool of worker processes.
+
+    Args:
+        paths (list): The files to decode.
+        workers (int): The number of worker processes.
+        names (set): The class names to keep.
+        chunks_per_worker (int): The number of ranges per worker.
+
+    Yields:
+        tuple: The (records, size) of each range in file order, where
+        size is the number of bytes of the range.
+    """
+    sizes = [os.path.getsize(path) for path in paths]
+    step = max(1, -(-sum(sizes) // (workers * chunks_per_worker)))
+    tasks = [(path, start, end, names)
+             for path, size in zip(paths, sizes)
+             for path, start, end in split(path, max(1, -(-size // step)))]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for task, records in zip(tasks, pool.map(decode_range, tasks)):
+            yield records, task[2] - task[1]
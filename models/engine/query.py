@@ -0,0 +1,390 @@
+#!/usr/bin/python3
+"""Declarative queries over a storage, planned on its indexes"""
+
+
+import heapq
+import operator
+from itertools import islice
+from models.engine.batch import MISSING
+from models.engine.columns import OPERATORS, parse_order
+from models.engine.geo import distance, longitude_ranges, point
+from models.engine.ranges import sort_value
+
+
+def contains(values, wanted):
+    """returns whether the list values holds every wanted value"""
+    try:
+        return all(value in values for value in wanted)
+    except TypeError:
+        return False
+
+
+# comparison suffix of a condition -> test of an attribute value
+TESTS = {
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "lt": operator.lt,
+    "lte": operator.le,
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "contains": contains,
+}
+# cost of comparing one row of a column, visiting an object costing 1
+COLUMN_COST = 0.1
+# estimated share of the rows matching a comparison on a column
+SELECTIVITY = {"eq": 0.1, "ne": 0.9}
+RANGE_SELECTIVITY = 1 / 3
+# comparisons a sorted range field bounds, the strict ones being checked
+# again on the candidates
+LOWER = ("eq", "gt", "gte")
+UPPER = ("eq", "lt", "lte")
+
+
+class Plan:
+    """
+    An access path of a query: the index giving the candidate objects,
+    the conditions it applies, the estimated number of candidates and
+    the estimated cost of finding and checking them.
+    """
+
+    def __init__(self, name, served, rows, cost, fetch):
+        """
+        Initializes the plan.
+
+        Args:
+            name (str): The description of the access path.
+            served (list): The conditions the access path applies.
+            rows (float): The estimated number of candidates.
+            cost (float): The estimated cost, one per object visited.
+            fetch (callable): Returns the candidate objects.
+        """
+        self.name = name
+        self.served = served
+        self.rows = rows
+        self.cost = cost
+        self.fetch = fetch
+        self.ordered = False
+
+    def __str__(self):
+        """returns the access path with its estimates"""
+        return "{} (rows {:.0f}, cost {:.0f})".format(self.name, self.rows,
+                                                      self.cost)
+
+
+class Query:
+    """
+    This class describes the objects of a class to find, and finds them
+    through the index that gives the fewest candidates: the class
+    bucket, a foreign key, the numeric columns, a sorted range field,
+    the geo index or the list bitsets of the storage. The conditions
+    that index does not apply are checked on the candidates. A query
+    sorted by a range field and limited reads it in order and stops
+    once it has enough objects.
+
+        storage.query(Place).where(city_id=city.id,
+                                   price_by_night__lt=100)
+                            .order_by("price_by_night").limit(20).all()
+
+    Queries are immutable: where(), near(), within(), order_by() and
+    limit() return a new query.
+    """
+
+    def __init__(self, storage, cls):
+        """
+        Initializes the query.
+
+        Args:
+            storage: The storage to query.
+            cls: The model class.
+        """
+        self.storage = storage
+        self.cls = cls
+        self.conditions = []
+        self.order = None
+        self.count_limit = None
+
+    def __copy(self, **attrs):
+        """Returns a copy of the query with some attributes replaced"""
+        query = Query(self.storage, self.cls)
+        query.conditions = list(self.conditions)
+        query.order = self.order
+        query.count_limit = self.count_limit
+        for name, value in attrs.items():
+            setattr(query, name, value)
+        return query
+
+    def where(self, **conditions):
+        """
+        Returns the query restricted to the objects matching every
+        condition, named after the attribute with an optional __ne,
+        __lt, __lte, __gt, __gte or __contains suffix, the latter for
+        list attributes holding a value or every value of a list.
+        """
+        added = []
+        for name, value in conditions.items():
+            attr, sep, op = name.rpartition("__")
+            if not sep or op not in TESTS:
+                attr, op = name, "eq"
+            if op == "contains" and isinstance(value, str):
+                value = [value]
+            added.append((attr, op, value))
+        return self.__copy(conditions=self.conditions + added)
+
+    def near(self, latitude, longitude, radius):
+        """
+        Returns the query restricted to the objects within radius km of
+        a point, nearest first unless another order is given.
+        """
+        return self.__copy(conditions=self.conditions + [
+            ("geo", "near", (float(latitude), float(longitude),
+                             float(radius)))])
+
+    def within(self, south, west, north, east):
+        """Returns the query restricted to the objects in a box"""
+        return self.__copy(conditions=self.conditions + [
+            ("geo", "within", (float(south), float(west), float(north),
+                               float(east)))])
+
+    def order_by(self, field):
+        """
+        Returns the query sorted by an attribute, prefixed with "-" for
+        a descending order.
+        """
+        return self.__copy(order=field)
+
+    def limit(self, count):
+        """Returns the query returning at most count objects"""
+        return self.__copy(count_limit=count)
+
+    def plans(self):
+        """
+        Returns the possible access paths of the query, cheapest first.
+
+        Returns:
+            list: The Plan instances.
+        """
+        cls, storage = self.cls, self.storage
+        total = storage.count(cls)
+        plans = []
+        for cond in self.conditions:
+            attr, op, value = cond
+            if op == "eq" and attr in cls.foreign_keys:
+                name = f"foreign key {attr} = {value!r}"
+                fetch = (lambda attr=attr, value=value:
+                         storage.related(cls, attr, value))
+            elif attr == "geo" and cls.geo_fields:
+                if op == "near":
+                    name = "geo near ({}, {}) within {} km".format(*value)
+                    fetch = (lambda value=value: self.__get(
+                        obj_id for obj_id, km in storage.near(cls, *value)))
+                else:
+                    name = "geo within {}".format(value)
+                    fetch = (lambda value=value:
+                             self.__get(storage.within(cls, *value)))
+            elif op == "contains" and attr in cls.list_fields:
+                name = f"bitsets {attr} contains {value!r}"
+                fetch = (lambda attr=attr, value=value: self.__get(
+                    storage.having(cls, **{attr: value})))
+            else:
+                continue
+            # counted on the index, the candidates being fetched only
+            # through the chosen plan
+            rows = storage.estimate(cls, attr, op, value)
+            if rows is None:
+                rows = total * RANGE_SELECTIVITY
+                cost = total * COLUMN_COST + rows
+            else:
+                cost = rows
+            plans.append(Plan(name, [cond], rows, cost, fetch))
+        plans.extend(self.__column_plans(total))
+        plans.extend(self.__range_plans(total))
+        plans.append(Plan("scan", [], total, total,
+                          lambda: storage.all(cls).values()))
+        return sorted(plans, key=lambda plan: plan.cost)
+
+    def __column_plans(self, total):
+        """Returns the access path through the numeric columns, if any"""
+        served = [cond for cond in self.conditions
+                  if cond[0] in self.cls.numeric_fields and
+                  cond[1] in OPERATORS and
+                  isinstance(cond[2], (int, float))]
+        if not served:
+            return []
+        rows = total
+        for attr, op, value in served:
+            rows *= SELECTIVITY.get(op, RANGE_SELECTIVITY)
+        kwargs = {}
+        for attr, op, value in served:
+            kwargs.setdefault(f"{attr}__{op}", []).append(value)
+        if any(len(values) > 1 for values in kwargs.values()):
+            return []
+        kwargs = {name: values[0] for name, values in kwargs.items()}
+        order, limit = None, None
+        ordered = (len(served) == len(self.conditions) and
+                   self.order is not None and
+                   parse_order(self.order)[0] in self.cls.numeric_fields)
+        if ordered:
+            order, limit = self.order, self.count_limit
+        plan = Plan("columns " + ", ".join(
+                    f"{attr} {op} {value!r}" for attr, op, value in served),
+                    served, rows, total * COLUMN_COST + rows,
+                    lambda: self.__get(self.storage.select(
+                        self.cls, order, limit, **kwargs)))
+        plan.ordered = ordered
+        return [plan]
+
+    def __range_plans(self, total):
+        """Returns the access paths through the sorted range_fields"""
+        plans = []
+        attr_order, descending = parse_order(self.order) \
+            if self.order is not None else (None, False)
+        for attr in self.cls.range_fields:
+            bounds = [cond for cond in self.conditions
+                      if cond[0] == attr and cond[1] in LOWER + UPPER and
+                      sort_value(cond[2]) is not None]
+            ordered = attr == attr_order
+            if not bounds and not ordered:
+                continue
+            low, high, rows, rest = None, None, total, 1.0
+            for cond in self.conditions:
+                selectivity = SELECTIVITY.get(cond[1], RANGE_SELECTIVITY)
+                if cond not in bounds:
+                    rest *= selectivity
+                    continue
+                rows *= selectivity
+                value = sort_value(cond[2])
+                if cond[1] in LOWER and (low is None or
+                                         value > sort_value(low)):
+                    low = cond[2]
+                if cond[1] in UPPER and (high is None or
+                                         value < sort_value(high)):
+                    high = cond[2]
+            cost = rows
+            if ordered and self.count_limit is not None:
+                cost = min(rows, self.count_limit / rest)
+            plan = Plan(f"range {attr} from {low!r} to {high!r}" +
+                        (" in order" if ordered else ""),
+                        [cond for cond in bounds
+                         if cond[1] in ("eq", "gte", "lte")], rows, cost,
+                        lambda attr=attr, low=low, high=high,
+                        reverse=ordered and descending:
+                        self.__get(self.storage.between(
+                            self.cls, attr, low, high, reverse)))
+            plan.ordered = ordered
+            plans.append(plan)
+        return plans
+
+    def __get(self, ids):
+        """Yields the objects of some ids"""
+        for obj_id in ids:
+            obj = self.storage.get(self.cls, obj_id)
+            if obj is not None:
+                yield obj
+
+    def plan(self):
+        """Returns the cheapest access path"""
+        return self.plans()[0]
+
+    def explain(self):
+        """
+        Returns the chosen plan, the conditions checked on its
+        candidates and the other access paths, with their estimates.
+
+        Returns:
+            str: One line per step.
+        """
+        plans = self.plans()
+        lines = [f"{self.cls.__name__}: {plans[0]}"]
+        for attr, op, value in self.conditions:
+            if (attr, op, value) not in plans[0].served:
+                lines.append(f"  filter {attr} {op} {value!r}")
+        if self.order is not None and not plans[0].ordered:
+            lines.append(f"  sort by {self.order}")
+        if self.count_limit is not None:
+            lines.append(f"  limit {self.count_limit}")
+        for plan in plans[1:]:
+            lines.append(f"  rejected {plan}")
+        return "\n".join(lines)
+
+    @staticmethod
+    def matches(obj, cond):
+        """
+        Returns whether an object matches a condition.
+
+        Args:
+            obj: The object.
+            cond (tuple): The (attribute, comparison, value) triple.
+
+        Returns:
+            bool: Whether the object matches.
+        """
+        attr, op, value = cond
+        if attr == "geo":
+            coords = point(*(getattr(obj, name, None)
+                             for name in obj.geo_fields))
+            if coords is None:
+                return False
+            if op == "near":
+                return distance(value[0], value[1], *coords) <= value[2]
+            south, west, north, east = value
+            return south <= coords[0] <= north and \
+                any(w <= coords[1] <= e
+                    for w, e in longitude_ranges(west, east))
+        found = getattr(obj, attr, MISSING)
+        if found is MISSING:
+            return op == "ne"
+        try:
+            return bool(TESTS[op](found, value))
+        except TypeError:
+            return False
+
+    def all(self):
+        """
+        Returns the matching objects.
+
+        Returns:
+            list: The objects, sorted and limited as asked.
+        """
+        plan = self.plan()
+        rest = [cond for cond in self.conditions if cond not in plan.served]
+        objs = (obj for obj in plan.fetch()
+                if all(self.matches(obj, cond) for cond in rest))
+        if plan.ordered and self.count_limit is not None:
+            return list(islice(objs, self.count_limit))
+        objs = list(objs)
+        near = [value for attr, op, value in rest if op == "near"]
+        if self.order is None and near:
+            lat, lon = near[0][:2]
+            objs.sort(key=lambda obj: distance(lat, lon, *point(
+                *(getattr(obj, name) for name in obj.geo_fields))))
+        elif self.order is not None and not plan.ordered:
+            attr, descending = parse_order(self.order)
+
+            def key(obj):
+                """returns the sort key of an object"""
+                return getattr(obj, attr, None)
+
+            if self.count_limit is not None:
+                pick = heapq.nlargest if descending else heapq.nsmallest
+                return pick(self.count_limit, objs, key=key)
+            objs.sort(key=key, reverse=descending)
+        if self.count_limit is not None:
+            return objs[:self.count_limit]
+        return objs
+
+    def __iter__(self):
+        """iterates over the matching objects"""
+        return iter(self.all())
+
+    def ids(self):
+        """Returns the ids of the matching objects"""
+        return [obj.id for obj in self.all()]
+
+    def count(self):
+        """Returns the number of matching objects"""
+        return len(self.all())
+
+    def first(self):
+        """Returns the first matching object, None if there is none"""
+        objs = self.limit(1).all()
+        return objs[0] if objs else None
@@ -0,0 +1,314 @@
+#!/usr/bin/python3
+"""Sorted indexes of the dates and numeric attributes of the objects"""
+
+
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from models.base_model import EPOCH, MICROSECOND, Stamp
+
+
+def sort_value(value):
+    """
+    Returns the value an attribute is sorted by.
+
+    Args:
+        value: The value of the attribute.
+
+    Returns:
+        The number, or the microseconds since EPOCH of a naive date,
+        None for other values, which are not indexed.
+    """
+    if type(value) is datetime:
+        if value.tzinfo is not None:
+            return None
+        return (value - EPOCH) // MICROSECOND
+    if isinstance(value, (int, float)) and not isinstance(value, bool) \
+            and value == value:
+        return value
+    return None
+
+
+class SortedPairs:
+    """
+    This class keeps (value, key) pairs sorted by value, then by key,
+    in blocks of at most 2 * load pairs, so that a pair is inserted or
+    removed by moving the pairs of its block only. The values and keys
+    of a block are kept in two lists, and the last pair of every block
+    in maxes, which is bisected to find the block of a pair, its value
+    also in tops.
+    """
+
+    load = 512
+
+    def __init__(self, pairs=()):
+        """
+        Initializes the list.
+
+        Args:
+            pairs (iterable): The (value, key) pairs, sorted at once.
+        """
+        pairs = sorted(pairs)
+        step = self.load
+        self.__values = [[value for value, key in pairs[i:i + step]]
+                         for i in range(0, len(pairs), step)]
+        self.__keys = [[key for value, key in pairs[i:i + step]]
+                       for i in range(0, len(pairs), step)]
+        self.__maxes = [(values[-1], keys[-1])
+                        for values, keys in zip(self.__values, self.__keys)]
+        self.__tops = [values[-1] for values in self.__values]
+        self.__len = len(pairs)
+
+    def __len__(self):
+        """returns the number of pairs"""
+        return self.__len
+
+    @staticmethod
+    def __index(values, keys, value, key, right=False):
+        """Returns the index of (value, key) in a block, bisect-style"""
+        lo = bisect_left(values, value)
+        hi = bisect_right(values, value, lo)
+        return (bisect_right if right else bisect_left)(keys, key, lo, hi)
+
+    def __position(self, pair, right=False):
+        """Returns the (block, index) of the first pair >= or > pair"""
+        block = (bisect_right if right else bisect_left)(self.__maxes, pair)
+        if block == len(self.__maxes):
+            return block, 0
+        return block, self.__index(self.__values[block], self.__keys[block],
+                                   *pair, right)
+
+    def __bound(self, value, right=False):
+        """Returns the (block, index) of the first value >= or > value"""
+        bisect = bisect_right if right else bisect_left
+        block = bisect(self.__tops, value)
+        if block == len(self.__maxes):
+            return block, 0
+        return block, bisect(self.__values[block], value)
+
+    def add(self, value, key):
+        """
+        Inserts a pair.
+
+        Args:
+            value: The sort value.
+            key (str): The key.
+        """
+        self.__len += 1
+        if not self.__maxes:
+            self.__values.append([value])
+            self.__keys.append([key])
+            self.__maxes.append((value, key))
+            self.__tops.append(value)
+            return
+        block = bisect_left(self.__maxes, (value, key))
+        if block == len(self.__maxes):
+            block -= 1
+        values, keys = self.__values[block], self.__keys[block]
+        index = self.__index(values, keys, value, key)
+        values.insert(index, value)
+        keys.insert(index, key)
+        if index == len(values) - 1:
+            self.__maxes[block] = (value, key)
+            self.__tops[block] = value
+        if len(values) > 2 * self.load:
+            half = len(values) // 2
+            self.__values.insert(block + 1, values[half:])
+            self.__keys.insert(block + 1, keys[half:])
+            del values[half:], keys[half:]
+            self.__maxes.insert(block, (values[-1], keys[-1]))
+            self.__tops.insert(block, values[-1])
+
+    def remove(self, value, key):
+        """
+        Removes a pair, if it is there.
+
+        Args:
+            value: The sort value.
+            key (str): The key.
+        """
+        block, index = self.__position((value, key))
+        if block == len(self.__maxes):
+            return
+        values, keys = self.__values[block], self.__keys[block]
+        if values[index] != value or keys[index] != key:
+            return
+        self.__len -= 1
+        del values[index], keys[index]
+        if not values:
+            del self.__values[block], self.__keys[block]
+            del self.__maxes[block], self.__tops[block]
+        elif index == len(values):
+            self.__maxes[block] = (values[-1], keys[-1])
+            self.__tops[block] = values[-1]
+
+    def irange(self, low=None, high=None, reverse=False, after=None):
+        """
+        Yields the keys of the pairs whose value is within [low, high],
+        in order. The position is found again after every block, so
+        that pairs may be added and removed between two keys.
+
+        Args:
+            low: The lowest value, none by default.
+            high: The highest value, none by default.
+            reverse (bool): Whether to go from the highest value down.
+            after (tuple): The (value, key) pair to resume after, in
+                the order of the scan.
+
+        Yields:
+            str: The keys.
+        """
+        cursor = after
+        while True:
+            if reverse:
+                end = (len(self.__maxes), 0) if high is None \
+                    else self.__bound(high, True)
+                if cursor is not None:
+                    end = min(end, self.__position(cursor))
+                block, index = end
+                if index == 0:
+                    block -= 1
+                    if block < 0:
+                        return
+                    index = len(self.__values[block])
+                values = self.__values[block]
+                start = 0 if low is None else \
+                    bisect_left(values, low, 0, index)
+                if start == index:
+                    return
+                yield from reversed(self.__keys[block][start:index])
+                if start > 0:
+                    return
+                cursor = (values[0], self.__keys[block][0])
+            else:
+                start = (0, 0) if low is None else self.__bound(low)
+                if cursor is not None:
+                    start = max(start, self.__position(cursor, True))
+                block, index = start
+                if block == len(self.__maxes):
+                    return
+                values = self.__values[block]
+                end = len(values) if high is None else \
+                    bisect_right(values, high, index)
+                if end == index:
+                    return
+                yield from self.__keys[block][index:end]
+                if end < len(values):
+                    return
+                cursor = (values[-1], self.__keys[block][-1])
+
+
+class RangeIndex:
+    """
+    This class keeps the objects sorted by each of some attributes,
+    such as their dates, so that the objects in a range of values are
+    found by bisection and listed in order without sorting them. Values
+    that are neither numbers nor naive dates are left out.
+    """
+
+    def __init__(self, attrs, objs=None):
+        """
+        Initializes the index.
+
+        Args:
+            attrs (iterable): The names of the indexed attributes.
+            objs (dict): The key -> object dictionary of the objects to
+                index, sorted at once instead of added one by one.
+        """
+        self.attrs = tuple(attrs)
+        self.__getters = {}
+        self.__values = {key: self.__sort_values(obj)
+                         for key, obj in (objs or {}).items()}
+        self.__sorted = {
+            attr: SortedPairs((values[i], key)
+                              for key, values in self.__values.items()
+                              if values[i] is not None)
+            for i, attr in enumerate(self.attrs)}
+
+    def __sort_values(self, obj):
+        """Returns the sort values of the attributes of an object"""
+        getters = self.__getters.get(type(obj))
+        if getters is None:
+            getters = self.__getters[type(obj)] = [
+                field.micros if isinstance(field, Stamp)
+                else self.__getter(attr)
+                for field, attr in ((getattr(type(obj), "_fields", {})
+                                     .get(attr), attr)
+                                    for attr in self.attrs)]
+        return tuple(getter(obj) for getter in getters)
+
+    @staticmethod
+    def __getter(attr):
+        """Returns the function giving the sort value of an attribute"""
+        def getter(obj):
+            """returns the sort value of the attribute of obj"""
+            return sort_value(getattr(obj, attr, None))
+        return getter
+
+    def __len__(self):
+        """returns the number of indexed objects"""
+        return len(self.__values)
+
+    def add(self, key, obj):
+        """
+        Indexes an object under the current values of its attributes,
+        moving it where they changed.
+
+        Args:
+            key (str): The storage key of the object.
+            obj: The object to index.
+        """
+        values = self.__sort_values(obj)
+        old = self.__values.get(key)
+        if old == values:
+            return
+        self.__values[key] = values
+        for i, attr in enumerate(self.attrs):
+            if old is not None and old[i] != values[i] and \
+                    old[i] is not None:
+                self.__sorted[attr].remove(old[i], key)
+            if (old is None or old[i] != values[i]) and \
+                    values[i] is not None:
+                self.__sorted[attr].add(values[i], key)
+
+    update = add
+
+    def remove(self, key):
+        """
+        Removes an object from the index.
+
+        Args:
+            key (str): The storage key of the object.
+        """
+        values = self.__values.pop(key, None)
+        if values is None:
+            return
+        for attr, value in zip(self.attrs, values):
+            if value is not None:
+                self.__sorted[attr].remove(value, key)
+
+    def scan(self, attr, low=None, high=None, reverse=False, after=None):
+        """
+        Returns an iterator over the objects whose attribute is within
+        [low, high], sorted by the attribute, then by key.
+
+        Args:
+            attr (str): The indexed attribute.
+            low: The lowest number or date, none by default.
+            high: The highest number or date, none by default.
+            reverse (bool): Whether to start from the highest value.
+            after (tuple): The (value, key) of the object to resume
+                after, such as the last one of a page.
+
+        Returns:
+            iterator: The storage keys of the objects.
+        """
+        if attr not in self.__sorted:
+            raise KeyError(f"{attr} is not indexed")
+        bounds = []
+        for value in (low, high) + ((after[0],) if after else ()):
+            if value is not None and sort_value(value) is None:
+                raise ValueError(f"{value!r} is not a number or a date")
+            bounds.append(None if value is None else sort_value(value))
+        return self.__sorted[attr].irange(
+            bounds[0], bounds[1], reverse,
+            (bounds[2], after[1]) if after else None)
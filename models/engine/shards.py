@@ -0,0 +1,146 @@
+#!/usr/bin/python3
+"""File layouts of FileStorage"""
+
+
+import os
+import re
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from models.engine.ids import id_ms
+
+MONTH = re.compile(r"\d{4}-\d{2}")
+
+
+class ShardLayout:
+    """
+    This class maps storage keys to the files holding them.
+
+    The "single" layout keeps every object in the JSON file. The
+    "class" layout keeps one file per class and the "bucket" layout one
+    file per class and hash bucket of the id, both in a directory named
+    after the JSON file with a ".d" suffix. The "month" layout keeps
+    one file per class and UTC month of the time-ordered ids, so that
+    the objects created together share a file, and the other ids in
+    hash buckets.
+    """
+
+    layouts = ("single", "class", "bucket", "month")
+
+    def __init__(self, file_path, layout="single", buckets=16):
+        """
+        Initializes the layout.
+
+        Args:
+            file_path (str): The JSON file of the storage.
+            layout (str): One of "single", "class", "bucket" or
+                "month".
+            buckets (int): The number of files per class in the
+                "bucket" layout, and for the ids without a time in the
+                "month" layout.
+        """
+        if layout not in self.layouts:
+            raise ValueError(f"unknown layout {layout}")
+        self.file_path = file_path
+        self.layout = layout
+        self.buckets = buckets
+        self.directory = file_path + ".d"
+        # day since the epoch -> its "YYYY-MM" month
+        self.__months = {}
+
+    @property
+    def sharded(self):
+        """True if objects are spread over several files"""
+        return self.layout != "single"
+
+    def shard(self, key):
+        """
+        Returns the name of the shard holding a key.
+
+        Args:
+            key (str): A storage key, <class name>.<id>.
+
+        Returns:
+            str: The shard name, "" in the single layout.
+        """
+        if self.layout == "single":
+            return ""
+        class_name, obj_id = key.split(".", 1)
+        if self.layout == "class":
+            return class_name
+        if self.layout == "month":
+            ms = id_ms(obj_id)
+            if ms is not None:
+                day = ms // 86400000
+                month = self.__months.get(day)
+                if month is None:
+                    month = self.__months[day] = datetime.fromtimestamp(
+                        day * 86400, timezone.utc).strftime("%Y-%m")
+                return f"{class_name}.{month}"
+        bucket = zlib.crc32(obj_id.encode("utf-8")) % self.buckets
+        return f"{class_name}.{bucket}"
+
+    def path(self, shard):
+        """Returns the path of the file of a shard"""
+        if self.layout == "single":
+            return self.file_path
+        return os.path.join(self.directory, shard + ".json")
+
+    def paths(self, names):
+        """
+        Returns the existing files that hold objects of some classes.
+        Files of the directory another layout would write are left out.
+
+        Args:
+            names (set): The class names.
+
+        Returns:
+            list: The file paths, sorted by name.
+        """
+        if self.layout == "single":
+            return [self.file_path] if os.path.exists(self.file_path) else []
+        try:
+            files = sorted(os.listdir(self.directory))
+        except FileNotFoundError:
+            return []
+        return [os.path.join(self.directory, name) for name in files
+                if name.endswith(".json") and self.__owns(name[:-5], names)]
+
+    def __owns(self, shard, names):
+        """True if shard is a shard name of this layout for the classes"""
+        class_name, _, suffix = shard.partition(".")
+        if class_name not in names:
+            return False
+        if self.layout == "class":
+            return shard == class_name
+        if suffix.isdigit() and int(suffix) < self.buckets and \
+                str(int(suffix)) == suffix:
+            return True
+        return self.layout == "month" and MONTH.fullmatch(suffix) is not None
+
+    def write(self, contents, writer):
+        """
+        Writes several shards in parallel threads. A shard without
+        content has its file removed.
+
+        Args:
+            contents (dict): The shard name -> JSON text mapping, None
+                for empty shards.
+            writer: A callable taking a path and a text that writes it.
+        """
+        if self.sharded:
+            os.makedirs(self.directory, exist_ok=True)
+
+        def write_shard(item):
+            shard, text = item
+            path = self.path(shard)
+            if text is not None:
+                writer(path, text)
+            elif os.path.exists(path):
+                os.remove(path)
+
+        if len(contents) == 1:
+            write_shard(next(iter(contents.items())))
+            return
+        with ThreadPoolExecutor(max_workers=min(8, len(contents))) as pool:
+            list(pool.map(write_shard, contents.items()))
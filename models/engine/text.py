@@ -0,0 +1,147 @@
+#!/usr/bin/python3
+"""Full-text index of the text attributes of the objects"""
+
+
+import heapq
+import math
+import re
+
+WORD = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """
+    Splits a text into lowercase words.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        list: The words of the text.
+    """
+    return WORD.findall(text.lower())
+
+
+def document(values):
+    """
+    Returns the text indexed for an object.
+
+    Args:
+        values (iterable): The values of its text attributes, the ones
+            that are not strings being left out.
+
+    Returns:
+        str: The values joined by spaces.
+    """
+    return " ".join(value for value in values if isinstance(value, str))
+
+
+class TextIndex:
+    """
+    This class maps the words of the text attributes of the objects to
+    the objects holding them, with their number of occurrences, and
+    ranks the objects matching a query with BM25.
+
+    An object matches when it holds any word of the query; the words
+    found in few objects and often in short texts weigh the most.
+    """
+
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self, attrs):
+        """
+        Initializes the index.
+
+        Args:
+            attrs (iterable): The names of the indexed attributes.
+        """
+        self.attrs = tuple(attrs)
+        self.__postings = {}
+        self.__docs = {}
+        self.__total = 0
+
+    def __len__(self):
+        """returns the number of indexed objects"""
+        return len(self.__docs)
+
+    def add(self, key, obj):
+        """
+        Indexes the words of an object, replacing the words it was
+        indexed under before.
+
+        Args:
+            key (str): The storage key of the object.
+            obj: The object to index.
+        """
+        self.remove(key)
+        words = tokenize(document(getattr(obj, attr, None)
+                                  for attr in self.attrs))
+        if not words:
+            return
+        counts = {}
+        for word in words:
+            counts[word] = counts.get(word, 0) + 1
+        postings = self.__postings
+        for word, count in counts.items():
+            keys = postings.get(word)
+            if keys is None:
+                keys = postings[word] = {}
+            keys[key] = count
+        self.__docs[key] = (len(words), tuple(counts))
+        self.__total += len(words)
+
+    update = add
+
+    def remove(self, key):
+        """
+        Removes an object from the index.
+
+        Args:
+            key (str): The storage key of the object.
+        """
+        doc = self.__docs.pop(key, None)
+        if doc is None:
+            return
+        length, words = doc
+        self.__total -= length
+        for word in words:
+            postings = self.__postings[word]
+            del postings[key]
+            if not postings:
+                del self.__postings[word]
+
+    def search(self, query, limit=None):
+        """
+        Returns the objects matching a query, best first.
+
+        Args:
+            query (str): The words to look for.
+            limit (int): The maximum number of objects.
+
+        Returns:
+            list: The (storage key, score) pairs.
+        """
+        count = len(self.__docs)
+        if not count:
+            return []
+        average = self.__total / count
+        scores = {}
+        for word in set(tokenize(query)):
+            postings = self.__postings.get(word)
+            if not postings:
+                continue
+            idf = math.log(1 + (count - len(postings) + 0.5) /
+                           (len(postings) + 0.5))
+            for key, freq in postings.items():
+                norm = 1 - self.b + self.b * self.__docs[key][0] / average
+                scores[key] = scores.get(key, 0.0) + idf * freq * \
+                    (self.k1 + 1) / (freq + self.k1 * norm)
+        if limit is not None:
+            return heapq.nsmallest(limit, scores.items(), key=self.__rank)
+        return sorted(scores.items(), key=self.__rank)
+
+    @staticmethod
+    def __rank(item):
+        """Returns the sort key of a (key, score) pair, best first"""
+        return -item[1], item[0]
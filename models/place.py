@@ -1,7 +1,10 @@
 #!/usr/bin/python3
 """Defines the place class"""
 
+import models
+from models.amenity import Amenity
 from models.base_model import BaseModel
+from models.review import Review
 
 
 class Place(BaseModel):
@@ -18,3 +21,22 @@ class Place(BaseModel):
     latitude = 0.0
     longitude = 0.0
     amenity_ids = []
+    foreign_keys = {"city_id": "City", "user_id": "User"}
+    numeric_fields = ("number_rooms", "number_bathrooms", "max_guest",
+                      "price_by_night", "latitude", "longitude")
+    geo_fields = ("latitude", "longitude")
+    text_fields = ("name", "description")
+    list_fields = ("amenity_ids",)
+    range_fields = BaseModel.range_fields + ("price_by_night",)
+
+    @property
+    def reviews(self):
+        """returns the list of Review instances of this place"""
+        return models.storage.related(Review, "place_id", self.id)
+
+    @property
+    def amenities(self):
+        """returns the list of Amenity instances listed in amenity_ids"""
+        amenities = (models.storage.get(Amenity, amenity_id)
+                     for amenity_id in self.amenity_ids)
+        return [amenity for amenity in amenities if amenity is not None]
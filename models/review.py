@@ -13,3 +13,5 @@ class Review(BaseModel):
     place_id = ""
     user_id = ""
     text = ""
+    foreign_keys = {"place_id": "Place", "user_id": "User"}
+    text_fields = ("text",)
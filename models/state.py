@@ -1,7 +1,9 @@
 #!/usr/bin/python3
 """Defines the state class"""
 
+import models
 from models.base_model import BaseModel
+from models.city import City
 
 
 class State(BaseModel):
@@ -10,3 +12,9 @@ class State(BaseModel):
     represents a state, takes one atrr - name of the state
     """
     name = ""
+    text_fields = ("name",)
+
+    @property
+    def cities(self):
+        """returns the list of City instances of this state"""
+        return models.storage.related(City, "state_id", self.id)
@@ -1,7 +1,9 @@
 #!/usr/bin/python3
 """Defines the user class"""
 
+import models
 from models.base_model import BaseModel
+from models.place import Place
 
 
 class User(BaseModel):
@@ -10,3 +12,8 @@ class User(BaseModel):
     password = ""
     first_name = ""
     last_name = ""
+
+    @property
+    def places(self):
+        """returns the list of Place instances owned by this user"""
+        return models.storage.related(Place, "user_id", self.id)
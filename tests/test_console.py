@@ -26,6 +26,7 @@ class Test_01_Basic(unittest.TestCase):
         self.out = StringIO()
         sys.stdout = self.out
         self.c = self.create()
+        models.storage.reload()
         models.storage._FileStorage__objects.clear()
 
     def teardown(self):
@@ -311,6 +312,67 @@ class Test_01_Basic(unittest.TestCase):
         self.assertFalse(usid in self.out.getvalue())
         self.clearIO()
 
+    def test_17_all_pages(self):
+        """test all cmd by pages and streamed"""
+        for i in range(5):
+            self.assertFalse(self.c.onecmd('create BaseModel'))
+        self.assertFalse(self.c.onecmd('create User'))
+        self.clearIO()
+        pages, cursor = [], ''
+        while cursor is not None:
+            self.assertFalse(self.c.onecmd('all BaseModel 2 ' + cursor))
+            lines = self.out.getvalue().splitlines()
+            self.clearIO()
+            pages.append(json.loads(lines[0]))
+            cursor = lines[1] if len(lines) > 1 else None
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        objs = sorted(models.storage.all(BaseModel).values(),
+                      key=lambda o: (o.created_at, o.id))
+        self.assertEqual([e for page in pages for e in page],
+                         [str(o) for o in objs])
+        self.assertFalse(self.c.onecmd('all 5'))
+        lines = self.out.getvalue().splitlines()
+        self.clearIO()
+        self.assertEqual(len(json.loads(lines[0])), 5)
+        self.assertFalse(self.c.onecmd('all 5 ' + lines[1]))
+        self.assertTrue(self.checkObjStrType(
+            json.loads(self.out.getvalue())[0], 'User'))
+        self.clearIO()
+        self.assertFalse(self.c.onecmd('all BaseModel stream'))
+        lines = self.out.getvalue().splitlines()
+        self.clearIO()
+        self.assertEqual(len(lines), 5)
+        for e in lines:
+            self.assertTrue(self.checkObjStrType(e, 'BaseModel'))
+        self.assertFalse(self.c.onecmd('all BaseModel 0'))
+        self.assertEqual('** invalid page size **\n', self.out.getvalue())
+        self.clearIO()
+        self.assertFalse(self.c.onecmd('all BaseModel 2 User.x@2020'))
+        self.assertEqual('** invalid cursor **\n', self.out.getvalue())
+        self.clearIO()
+
+    def test_18_update_class_attr(self):
+        """test update cmd on class settings and properties"""
+        self.c.onecmd('create Place')
+        objid = self.out.getvalue()[:-1]
+        self.clearIO()
+        for name in ('numeric_fields', 'foreign_keys', 'reviews',
+                     'amenities', 'save', '_extra'):
+            self.assertFalse(
+                self.c.onecmd('update Place ' + objid + ' ' + name + ' 3'))
+            self.assertEqual("** attribute can't be updated **\n",
+                             self.out.getvalue())
+            self.clearIO()
+        self.assertFalse(
+            self.c.onecmd('Place.update("' + objid + '", '
+                          '{"reviews": "x", "name": "Home"})'))
+        self.assertEqual("** attribute can't be updated **\n",
+                         self.out.getvalue())
+        self.clearIO()
+        obj = models.storage.get('Place', objid)
+        self.assertEqual(obj.name, 'Home')
+        self.assertEqual(obj.numeric_fields, type(obj).numeric_fields)
+
     def test_51_method_fail_simple(self):
         '''test call method fail'''
         self.assertFalse(self.c.onecmd('create User'))
@@ -591,6 +653,23 @@ class Test_01_Basic(unittest.TestCase):
                          self.out.getvalue())
         self.clearIO()
 
+    def test_64_method_all_pages(self):
+        """test call method all by pages"""
+        for i in range(3):
+            self.assertFalse(self.c.onecmd('create Amenity'))
+        self.clearIO()
+        self.assertFalse(self.c.onecmd('Amenity.all(2)'))
+        lines = self.out.getvalue().splitlines()
+        self.clearIO()
+        self.assertEqual(len(json.loads(lines[0])), 2)
+        self.assertFalse(self.c.onecmd(
+            'Amenity.all(2, "{}")'.format(lines[1])))
+        self.assertEqual(len(json.loads(self.out.getvalue())), 1)
+        self.clearIO()
+        self.assertFalse(self.c.onecmd('Amenity.all("stream")'))
+        self.assertEqual(len(self.out.getvalue().splitlines()), 3)
+        self.clearIO()
+
     @staticmethod
     def checkObjStrType(e, t):
         """check if e is a string representation of type 't'"""
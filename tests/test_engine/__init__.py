@@ -0,0 +1,48 @@
+#!/usr/bin/python3
+"""Defines the base test cases of the storage engine tests."""
+import os
+import models
+import tempfile
+import unittest
+from models.engine.db_storage import DBStorage
+from models.engine.file_storage import FileStorage
+
+
+class FileStorageTestCase(unittest.TestCase):
+    """
+    Runs every test on a FileStorage of its own, in a temporary
+    directory, put in place of models.storage.
+    """
+
+    # keyword arguments of the FileStorage
+    options = {}
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "file.json")
+        self.storage = models.storage
+        models.storage = FileStorage(path=self.path, **self.options)
+        FileStorage._FileStorage__objects.clear()
+
+    def tearDown(self):
+        models.storage = self.storage
+        FileStorage._FileStorage__objects.clear()
+        self.tmpdir.cleanup()
+
+
+class DBStorageTestCase(unittest.TestCase):
+    """
+    Runs every test on a DBStorage of its own, in a temporary
+    directory, put in place of models.storage.
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "file.db")
+        self.storage = models.storage
+        models.storage = DBStorage(path=self.path)
+
+    def tearDown(self):
+        models.storage.close()
+        models.storage = self.storage
+        self.tmpdir.cleanup()
@@ -0,0 +1,142 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/batch.py."""
+import json
+import os
+import threading
+import models
+import unittest
+from unittest.mock import patch
+from console import HBNBCommand
+from models.engine import file_storage
+from models.engine.db_storage import DBStorage
+from models.place import Place
+from models.user import User
+from tests.test_engine import DBStorageTestCase, FileStorageTestCase
+
+
+class TestFileStorage_batch(FileStorageTestCase):
+    """Unittests for the batches of FileStorage."""
+
+    def test_saves_once(self):
+        with patch.object(file_storage, "write_atomic",
+                          wraps=file_storage.write_atomic) as write:
+            with models.storage.batch():
+                users = [User() for i in range(3)]
+                for user in users:
+                    user.first_name = "Betty"
+                    user.save()
+                self.assertFalse(os.path.exists(self.path))
+            self.assertEqual(write.call_count, 1)
+        with open(self.path) as f:
+            self.assertEqual(len(json.load(f)), 3)
+
+    def test_saves_changes_without_save(self):
+        with models.storage.batch():
+            User()
+        self.assertTrue(os.path.exists(self.path))
+
+    def test_rollback(self):
+        user = User()
+        user.first_name = "Betty"
+        other = User()
+        models.storage.save()
+        with self.assertRaises(ValueError):
+            with models.storage.batch():
+                user.first_name = "Holberton"
+                user.last_name = "School"
+                user.first_name = "Bob"
+                new = User()
+                models.storage.delete(other)
+                user.save()
+                raise ValueError
+        self.assertEqual(user.first_name, "Betty")
+        self.assertNotIn("last_name", user.to_dict())
+        self.assertIsNone(models.storage.get(User, new.id))
+        self.assertIs(models.storage.get(User, other.id), other)
+        with open(self.path) as f:
+            self.assertNotIn("User." + new.id, json.load(f))
+
+    def test_other_thread(self):
+        models.storage = file_storage.FileStorage(path=self.path,
+                                                  commit_window=0.01)
+        other = []
+
+        def create():
+            other.append(User())
+            other[0].save()
+            with open(self.path) as f:
+                other.append(list(json.load(f)))
+
+        with self.assertRaises(ValueError):
+            with models.storage.batch():
+                user = User()
+                thread = threading.Thread(target=create)
+                thread.start()
+                thread.join()
+                raise ValueError
+        self.assertIn("User." + other[0].id, other[1])
+        self.assertIs(models.storage.get(User, other[0].id), other[0])
+        self.assertIsNone(models.storage.get(User, user.id))
+        models.storage.save()
+        with open(self.path) as f:
+            self.assertEqual(list(json.load(f)), ["User." + other[0].id])
+
+    def test_rollback_updates_indexes(self):
+        place = Place()
+        place.city_id = "c1"
+        with self.assertRaises(ValueError):
+            with models.storage.batch():
+                place.city_id = "c2"
+                raise ValueError
+        self.assertEqual(models.storage.related(Place, "city_id", "c1"),
+                         [place])
+        self.assertEqual(models.storage.related(Place, "city_id", "c2"), [])
+
+    def test_nested(self):
+        user = User()
+        with models.storage.batch():
+            user.first_name = "Betty"
+            try:
+                with models.storage.batch():
+                    user.last_name = "Holberton"
+                    raise ValueError
+            except ValueError:
+                pass
+            self.assertFalse(os.path.exists(self.path))
+        self.assertEqual(user.first_name, "Betty")
+        self.assertNotIn("last_name", user.to_dict())
+        self.assertTrue(os.path.exists(self.path))
+
+    def test_console_dict_update(self):
+        user = User()
+        models.storage.save()
+        with patch.object(file_storage, "write_atomic",
+                          wraps=file_storage.write_atomic) as write:
+            HBNBCommand().onecmd('User.update("{}", {{"first_name": "Betty",'
+                                 ' "age": 89, "email": "b@hbtn.io"}})'
+                                 .format(user.id))
+            self.assertEqual(write.call_count, 1)
+        self.assertEqual(user.first_name, "Betty")
+        self.assertEqual(user.age, 89)
+
+
+class TestDBStorage_batch(DBStorageTestCase):
+    """Unittests for the batches of DBStorage."""
+
+    def test_commit_and_rollback(self):
+        with models.storage.batch():
+            user = User()
+            user.save()
+        with self.assertRaises(ValueError):
+            with models.storage.batch():
+                user.first_name = "Betty"
+                User()
+                raise ValueError
+        self.assertNotIn("first_name", user.to_dict())
+        models.storage.close()
+        models.storage = DBStorage(path=self.path)
+        self.assertEqual(list(models.storage.all(User)), ["User." + user.id])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/bitsets.py."""
+import models
+import random
+import unittest
+from models.engine.bitsets import BitsetIndex
+from models.engine.file_storage import FileStorage
+from models.amenity import Amenity
+from models.place import Place
+from tests.test_engine import DBStorageTestCase, FileStorageTestCase
+
+
+class TestBitsetIndex(unittest.TestCase):
+    """Unittests for testing the BitsetIndex class."""
+
+    def setUp(self):
+        self.index = BitsetIndex(("amenity_ids",))
+        for key, ids in [("a", ["wifi", "tv"]), ("b", ["wifi"]),
+                         ("c", ["tv", "pets", "wifi"]), ("d", [])]:
+            self.index.add(key, Place(amenity_ids=ids))
+
+    def test_having(self):
+        self.assertEqual(self.index.having({"amenity_ids": ["wifi"]}),
+                         ["a", "b", "c"])
+        self.assertEqual(self.index.having({"amenity_ids": ["wifi", "tv"]}),
+                         ["a", "c"])
+        self.assertEqual(self.index.having({"amenity_ids": ["pool"]}), [])
+        self.assertEqual(self.index.having({}), ["a", "b", "c", "d"])
+        with self.assertRaises(KeyError):
+            self.index.having({"city_id": ["c1"]})
+
+    def test_estimate(self):
+        self.assertEqual(self.index.estimate({"amenity_ids": ["wifi"]}), 3)
+        self.assertEqual(
+            self.index.estimate({"amenity_ids": ["wifi", "pets"]}), 1)
+        self.assertEqual(self.index.estimate({}), 4)
+
+    def test_update_and_remove(self):
+        self.index.update("a", Place(amenity_ids=["pets"]))
+        self.index.remove("c")
+        self.index.remove("z")
+        self.assertEqual(len(self.index), 3)
+        self.assertEqual(self.index.having({"amenity_ids": ["tv"]}), [])
+        self.assertEqual(self.index.having({"amenity_ids": ["pets"]}),
+                         ["a"])
+        self.index.add("e", Place(amenity_ids=["tv", "tv", ["bad"]]))
+        self.index.add("f", Place(amenity_ids=["tv"]))
+        self.assertEqual(self.index.having({"amenity_ids": ["tv"]}), ["f"])
+
+    def test_matches_linear_scan(self):
+        rand = random.Random(0)
+        places = {str(i): rand.sample(range(12), rand.randint(0, 8))
+                  for i in range(3000)}
+        index = BitsetIndex(("amenity_ids",))
+        for key, ids in places.items():
+            index.add(key, Place(amenity_ids=ids))
+        for key in list(places)[::7]:
+            index.remove(key)
+            del places[key]
+        for wanted in ([1], [2, 5], [0, 3, 7]):
+            self.assertEqual(
+                sorted(index.having({"amenity_ids": wanted})),
+                sorted(key for key, ids in places.items()
+                       if all(i in ids for i in wanted)))
+
+
+class TestFileStorage_having(FileStorageTestCase):
+    """Unittests for the having() method of FileStorage."""
+
+    def test_having(self):
+        wifi, tv = Amenity(), Amenity()
+        both, one = Place(), Place()
+        both.amenity_ids = [wifi.id, tv.id]
+        one.amenity_ids = [wifi.id]
+        self.assertEqual(models.storage.having(Place, amenity_ids=wifi.id),
+                         [both.id, one.id])
+        self.assertEqual(models.storage.having(
+            "Place", amenity_ids=[wifi.id, tv.id]), [both.id])
+        one.amenity_ids = one.amenity_ids + [tv.id]
+        models.storage.delete(both)
+        models.storage.save()
+        FileStorage._FileStorage__objects.clear()
+        models.storage.reload()
+        self.assertEqual(models.storage.having(
+            Place, amenity_ids=[wifi.id, tv.id]), [one.id])
+        with self.assertRaises(KeyError):
+            models.storage.having(Amenity, amenity_ids=[wifi.id])
+
+
+class TestDBStorage_having(DBStorageTestCase):
+    """Unittests for the having() method of DBStorage."""
+
+    def test_having(self):
+        both, one = Place(), Place()
+        both.amenity_ids = ["wifi", "tv"]
+        one.amenity_ids = ["wifi"]
+        self.assertEqual(models.storage.having(Place, amenity_ids="wifi"),
+                         [both.id, one.id])
+        self.assertEqual(models.storage.having(
+            Place, amenity_ids=["tv", "wifi"]), [both.id])
+        with self.assertRaises(KeyError):
+            models.storage.having(Place, city_id=["c1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
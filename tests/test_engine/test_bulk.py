@@ -0,0 +1,212 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/bulk.py."""
+import json
+import os
+import models
+import unittest
+from io import StringIO
+from unittest.mock import patch
+from console import HBNBCommand
+from models.engine import file_storage
+from models.engine.bulk import columns, export_file, export_rows
+from models.engine.bulk import import_file, import_rows, read_rows
+from models.engine.file_storage import FileStorage
+from models.city import City
+from models.place import Place
+from models.state import State
+from tests.test_engine import FileStorageTestCase
+
+
+class TestBulkImport(FileStorageTestCase):
+    """Unittests for testing the bulk import."""
+
+    def write(self, name, text):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def test_csv_types(self):
+        city = City()
+        path = self.write("places.csv",
+                          "name,city_id,number_rooms,latitude,amenity_ids\n"
+                          'Loft,{},3,1.5,"[""a1""]"\n'
+                          "Flat,{},,2,\n".format(city.id, city.id))
+        self.assertEqual(import_file(path, Place), 2)
+        places = sorted(models.storage.all(Place).values(),
+                        key=lambda p: p.name)
+        self.assertEqual(places[1].number_rooms, 3)
+        self.assertEqual(places[1].latitude, 1.5)
+        self.assertEqual(places[1].amenity_ids, ["a1"])
+        self.assertEqual(places[0].number_rooms, 0)
+        self.assertEqual(places[0].latitude, 2.0)
+        self.assertCountEqual(city.places, places)
+        with open(self.path) as f:
+            self.assertEqual(len(json.load(f)), 3)
+
+    def test_jsonl(self):
+        state = State()
+        rows = [{"__class__": "City", "id": "c1", "state_id": state.id},
+                {"__class__": "Place", "city_id": "c1",
+                 "created_at": "2017-09-28T21:03:54.052298"}]
+        path = self.write("data.jsonl",
+                          "\n".join(json.dumps(r) for r in rows) + "\n")
+        self.assertEqual(import_file(path), 2)
+        self.assertEqual([c.id for c in state.cities], ["c1"])
+        place = list(models.storage.all(Place).values())[0]
+        self.assertEqual(place.created_at.year, 2017)
+        self.assertEqual(place.updated_at, place.created_at)
+
+    def test_saves_once_per_batch(self):
+        rows = ((i, {"name": str(i)}) for i in range(25))
+        with patch.object(file_storage, "write_atomic",
+                          wraps=file_storage.write_atomic) as write:
+            self.assertEqual(import_rows(rows, State, batch_size=10), 25)
+            self.assertEqual(write.call_count, 3)
+
+    def test_batches_grow(self):
+        rows = ((i, {"name": str(i)}) for i in range(100))
+        with patch.object(file_storage, "write_atomic",
+                          wraps=file_storage.write_atomic) as write:
+            self.assertEqual(import_rows(rows, State, batch_size=10), 100)
+            self.assertEqual(write.call_count, 5)
+        self.assertEqual(models.storage.count(State), 100)
+
+    def test_indexes_built_after_import(self):
+        place = Place()
+        place.name = "old lake house"
+        place.price_by_night = 10
+        models.storage.select(Place, price_by_night__lt=50)
+        rows = ((i, {"name": "lake view {}".format(i),
+                     "price_by_night": str(i * 10),
+                     "latitude": "-1.2", "longitude": "36.8"})
+                for i in range(12))
+        self.assertEqual(import_rows(rows, Place, batch_size=5), 12)
+        self.assertEqual(len(models.storage.select(
+            Place, price_by_night__lt=50)), 6)
+        self.assertEqual(len(models.storage.search(Place, "lake")), 13)
+        self.assertEqual(len(models.storage.within(
+            Place, -1.3, 36.7, -1.1, 36.9)), 12)
+        place.price_by_night = 500
+        self.assertEqual(len(models.storage.select(
+            Place, price_by_night__gt=100)), 2)
+
+    def test_missing_foreign_key(self):
+        rows = [(1, {"name": "a"}), (2, {"name": "b"}),
+                (3, {"name": "c", "state_id": "1234"})]
+        with self.assertRaisesRegex(ValueError, "line 3: no State"):
+            import_rows(rows, City, batch_size=2)
+        self.assertEqual(models.storage.count(City), 2)
+        self.assertEqual(import_rows(rows, City, check_foreign_keys=False),
+                         3)
+
+    def test_invalid_rows(self):
+        with self.assertRaisesRegex(ValueError, "line 1"):
+            import_rows([(1, {"__class__": "Country"})])
+        with self.assertRaisesRegex(ValueError, "line 1"):
+            import_rows([(1, {"__class__": "City"})], State)
+        with self.assertRaisesRegex(ValueError, "line 2"):
+            list(read_rows(StringIO('{"a": 1}\n[1]\n'), "jsonl"))
+        with self.assertRaises(ValueError):
+            import_file(self.write("s.csv", "name\na\n"))
+
+    def test_console(self):
+        path = self.write("states.csv", "name\nKenya\nTexas\n")
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("import State " + path)
+            self.assertEqual(output.getvalue(), "2\n")
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("import Country " + path)
+            self.assertEqual(output.getvalue(), "** class doesn't exist **\n")
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("import")
+            self.assertEqual(output.getvalue(), "** file name missing **\n")
+
+
+class TestBulkExport(FileStorageTestCase):
+    """Unittests for testing the bulk export."""
+
+    def setUp(self):
+        super().setUp()
+        self.state = State()
+        self.state.name = "Kenya"
+        self.cities = []
+        for name in ("Nairobi", "Mombasa"):
+            city = City()
+            city.name = name
+            city.state_id = self.state.id
+            self.cities.append(city)
+        self.place = Place()
+        self.place.number_rooms = 3
+        self.place.amenity_ids = ["a1", "a2"]
+
+    def test_export_rows(self):
+        self.assertEqual(len(list(export_rows())), 4)
+        rows = list(export_rows(City, {"name": "Mombasa"}, ["id", "name"]))
+        self.assertEqual(rows, [{"id": self.cities[1].id,
+                                 "name": "Mombasa"}])
+        self.assertEqual(len(list(export_rows(Place,
+                                              {"number_rooms": "3"}))), 1)
+        self.assertEqual(list(export_rows(Place, {"number_rooms": "2"})),
+                         [])
+
+    def test_export_undeclared_attribute(self):
+        HBNBCommand().onecmd('update Place {} rating "4.5"'.format(
+            self.place.id))
+        HBNBCommand().onecmd('update City {} code 020'.format(
+            self.cities[0].id))
+        self.cities[1].code = "041"
+        self.assertEqual([row["id"] for row in
+                          export_rows(Place, {"rating": "4.5"})],
+                         [self.place.id])
+        self.assertEqual([row["id"] for row in
+                          export_rows(City, {"code": "020"})],
+                         [self.cities[0].id])
+        self.assertEqual([row["id"] for row in
+                          export_rows(City, {"code": "041"})],
+                         [self.cities[1].id])
+        self.assertEqual(list(export_rows(Place, {"rating": "4"})), [])
+
+    def test_jsonl_round_trip(self):
+        path = os.path.join(self.tmpdir.name, "out.jsonl")
+        self.assertEqual(export_file(path), 4)
+        FileStorage._FileStorage__objects.clear()
+        models.storage = FileStorage(path=self.path)
+        self.assertEqual(import_file(path), 4)
+        self.assertEqual(models.storage.get(Place, self.place.id).to_dict(),
+                         self.place.to_dict())
+
+    def test_csv_round_trip(self):
+        path = os.path.join(self.tmpdir.name, "places.csv")
+        self.assertEqual(export_file(path, Place), 1)
+        with open(path) as f:
+            self.assertEqual(f.readline().strip(), ",".join(columns(Place)))
+        FileStorage._FileStorage__objects.clear()
+        models.storage = FileStorage(path=self.path)
+        import_file(path, Place, check_foreign_keys=False)
+        self.assertEqual(models.storage.get(Place, self.place.id).to_dict(),
+                         self.place.to_dict())
+
+    def test_csv_needs_class(self):
+        with self.assertRaises(ValueError):
+            export_file(os.path.join(self.tmpdir.name, "all.csv"))
+
+    def test_console(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd('export City name=Nairobi fields=id,name')
+            self.assertEqual(json.loads(output.getvalue()),
+                             {"id": self.cities[0].id, "name": "Nairobi"})
+        path = os.path.join(self.tmpdir.name, "cities.csv")
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd('export City ' + path)
+            self.assertEqual(output.getvalue(), "2\n")
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd('export all format=csv')
+            self.assertIn("needed", output.getvalue())
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd('export')
+            self.assertEqual(output.getvalue(), "** class name missing **\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
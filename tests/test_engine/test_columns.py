@@ -0,0 +1,126 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/columns.py."""
+import models
+import unittest
+from console import HBNBCommand
+from models.engine import columns
+from models.engine.columns import ColumnStore, parse_condition
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.user import User
+from tests.test_engine import FileStorageTestCase
+
+
+class TestColumnStore(unittest.TestCase):
+    """Unittests for testing the ColumnStore class."""
+
+    vectorize = False
+
+    def setUp(self):
+        self.store = ColumnStore(("price_by_night", "number_rooms"))
+        self.store.vectorize = self.vectorize
+        for i, (price, rooms) in enumerate([(120, 3), (80, 1), (95, 4),
+                                            (80, 3), (200, 5)]):
+            self.store.add(str(i), Place(id=str(i), price_by_night=price,
+                                         number_rooms=rooms))
+
+    def test_parse_condition(self):
+        self.assertEqual(parse_condition("price_by_night__lt"),
+                         ("price_by_night", "lt"))
+        self.assertEqual(parse_condition("max_guest"), ("max_guest", "eq"))
+        self.assertEqual(parse_condition("a__b"), ("a__b", "eq"))
+
+    def test_select(self):
+        self.assertEqual(self.store.select(), ["0", "1", "2", "3", "4"])
+        self.assertEqual(self.store.select([("price_by_night", "lt", 100),
+                                            ("number_rooms", "gte", 3)]),
+                         ["2", "3"])
+        self.assertEqual(self.store.select([("number_rooms", "eq", 3)]),
+                         ["0", "3"])
+        self.assertEqual(self.store.select([("number_rooms", "ne", 3)]),
+                         ["1", "2", "4"])
+
+    def test_order_and_limit(self):
+        self.assertEqual(self.store.select(order_by="price_by_night"),
+                         ["1", "3", "2", "0", "4"])
+        self.assertEqual(self.store.select(order_by="-price_by_night",
+                                           limit=2), ["4", "0"])
+        self.assertEqual(self.store.select([("number_rooms", "gt", 1)],
+                                           "price_by_night", 2), ["3", "2"])
+        self.assertEqual(self.store.select(limit=0), [])
+
+    def test_update_and_remove(self):
+        place = Place(id="1", price_by_night=300)
+        self.store.update("1", place)
+        self.store.remove("0")
+        self.store.remove("9")
+        self.assertEqual(len(self.store), 4)
+        self.assertEqual(self.store.select([("price_by_night", "gte", 120)]),
+                         ["4", "1"])
+        for key in ["1", "2", "3", "4"]:
+            self.store.remove(key)
+        self.assertEqual(self.store.select([("number_rooms", "gt", 0)]), [])
+
+    def test_not_a_number(self):
+        self.store.update("1", Place(id="1", price_by_night="cheap"))
+        self.assertEqual(self.store.select([("price_by_night", "lt", 100)]),
+                         ["2", "3"])
+        self.assertEqual(self.store.select(order_by="price_by_night",
+                                           limit=1), ["3"])
+
+    def test_not_indexed(self):
+        with self.assertRaises(KeyError):
+            self.store.select([("max_guest", "eq", 1)])
+        with self.assertRaises(KeyError):
+            self.store.select(order_by="name")
+
+
+@unittest.skipIf(columns.numpy is None, "NumPy is not installed")
+class TestColumnStore_numpy(TestColumnStore):
+    """Unittests for the NumPy filters of the ColumnStore class."""
+
+    vectorize = True
+
+
+class TestFileStorage_select(FileStorageTestCase):
+    """Unittests for the select() method of FileStorage."""
+
+    def test_select_new_and_updated(self):
+        cheap = Place()
+        cheap.price_by_night = 50
+        dear = Place()
+        dear.price_by_night = 150
+        Place()
+        self.assertEqual(models.storage.select(Place, "-price_by_night",
+                                               price_by_night__gt=0),
+                         [dear.id, cheap.id])
+        dear.price_by_night = 20
+        self.assertEqual(models.storage.select("Place", "price_by_night", 1,
+                                               price_by_night__gt=0),
+                         [dear.id])
+
+    def test_select_after_delete_and_reload(self):
+        place = Place()
+        place.number_rooms = 3
+        gone = Place()
+        gone.number_rooms = 4
+        models.storage.delete(gone)
+        models.storage.save()
+        FileStorage._FileStorage__objects.clear()
+        models.storage.reload()
+        self.assertEqual(models.storage.select(Place, number_rooms__gte=3),
+                         [place.id])
+
+    def test_select_after_console_update(self):
+        place = Place()
+        HBNBCommand().onecmd('update Place {} max_guest 6'.format(place.id))
+        self.assertEqual(models.storage.select(Place, max_guest=6),
+                         [place.id])
+
+    def test_select_not_indexed(self):
+        with self.assertRaises(KeyError):
+            models.storage.select(User, age=3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/db_storage.py."""
+import gc
+import models
+import sqlite3
+import unittest
+from console import HBNBCommand
+from models.engine.db_storage import DBStorage
+from models.city import City
+from models.place import Place
+from models.state import State
+from models.user import User
+from tests.test_engine import DBStorageTestCase
+
+
+class TestDBStorage(DBStorageTestCase):
+    """Unittests for testing the DBStorage class."""
+
+    def reopen(self):
+        """closes the database and opens it in a new storage"""
+        models.storage.close()
+        models.storage = DBStorage(path=self.path)
+
+    def test_wal_mode(self):
+        db = sqlite3.connect(self.path)
+        self.assertEqual(db.execute("PRAGMA journal_mode").fetchone()[0],
+                         "wal")
+        db.close()
+
+    def test_foreign_key_indexes(self):
+        db = sqlite3.connect(self.path)
+        names = [row[0] for row in db.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index'")]
+        db.close()
+        self.assertIn("City_state_id", names)
+        self.assertIn("Review_place_id", names)
+
+    def test_save_and_get(self):
+        user = User()
+        user.first_name = "Betty"
+        models.storage.save()
+        self.reopen()
+        loaded = models.storage.get(User, user.id)
+        self.assertIsNot(loaded, user)
+        self.assertEqual(loaded.first_name, "Betty")
+        self.assertEqual(loaded.created_at, user.created_at)
+        self.assertIs(models.storage.get("User", user.id), loaded)
+        self.assertIsNone(models.storage.get(User, "1234"))
+
+    def test_all_and_count(self):
+        User()
+        User()
+        state = State()
+        self.assertEqual(models.storage.count(), 3)
+        self.assertEqual(models.storage.count(User), 2)
+        self.assertEqual(models.storage.all(State),
+                         {"State." + state.id: state})
+        self.assertEqual(len(models.storage.all()), 3)
+
+    def test_update(self):
+        user = User()
+        models.storage.save()
+        user.first_name = "Betty"
+        models.storage.save()
+        self.reopen()
+        self.assertEqual(models.storage.get(User, user.id).first_name,
+                         "Betty")
+
+    def test_delete(self):
+        user = User()
+        models.storage.save()
+        models.storage.delete(user)
+        self.assertIsNone(models.storage.get(User, user.id))
+        models.storage.save()
+        self.reopen()
+        self.assertEqual(models.storage.count(User), 0)
+
+    def test_lookup(self):
+        state = State()
+        city = City()
+        city.state_id = state.id
+        models.storage.save()
+        self.reopen()
+        cities = models.storage.get(State, state.id).cities
+        self.assertEqual([c.id for c in cities], [city.id])
+        with self.assertRaises(KeyError):
+            models.storage.lookup(City, "name", "")
+
+    def test_lookup_after_update(self):
+        place = Place()
+        place.city_id = "c1"
+        self.assertIn("Place." + place.id,
+                      models.storage.lookup(Place, "city_id", "c1"))
+        place.city_id = "c2"
+        self.assertEqual(models.storage.lookup(Place, "city_id", "c1"), {})
+
+    def test_select(self):
+        cheap = Place()
+        cheap.price_by_night = 50
+        dear = Place()
+        dear.price_by_night = 150
+        free = Place()
+        models.storage.save()
+        self.reopen()
+        self.assertEqual(models.storage.select(Place, "-price_by_night",
+                                               price_by_night__gt=0),
+                         [dear.id, cheap.id])
+        self.assertEqual(models.storage.select(Place, "price_by_night", 2),
+                         [free.id, cheap.id])
+        models.storage.get(Place, dear.id).price_by_night = 20
+        self.assertEqual(models.storage.select(Place, price_by_night__lt=30,
+                                               price_by_night__ne=0),
+                         [dear.id])
+        with self.assertRaises(KeyError):
+            models.storage.select(Place, name="")
+
+    def test_identity_map_is_weak(self):
+        state = State()
+        state.name = "Kenya"
+        state_id = state.id
+        models.storage.save()
+        self.assertIs(models.storage.get(State, state_id), state)
+        del state
+        gc.collect()
+        objects = models.storage._DBStorage__objects
+        self.assertNotIn("State." + state_id, objects)
+        self.assertEqual(models.storage.get(State, state_id).name, "Kenya")
+        models.storage.all()
+        gc.collect()
+        self.assertEqual(len(objects), 0)
+        city = City()
+        city_id = city.id
+        del city
+        gc.collect()
+        self.assertIsNotNone(models.storage.get(City, city_id))
+
+    def test_reload_drops_unsaved(self):
+        User()
+        models.storage.reload()
+        self.assertEqual(models.storage.count(User), 0)
+
+    def test_console(self):
+        console = HBNBCommand()
+        console.onecmd("create State")
+        self.assertEqual(models.storage.count(State), 1)
+        state = list(models.storage.all(State).values())[0]
+        console.onecmd('update State {} name "Kenya"'.format(state.id))
+        console.onecmd("destroy State " + state.id)
+        self.reopen()
+        self.assertEqual(models.storage.count(State), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,202 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/durable.py."""
+import json
+import os
+import models
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+from models.engine.durable import GroupCommit, write_atomic
+from models.engine.file_storage import FileStorage
+from models.user import User
+from tests.test_engine import FileStorageTestCase
+
+
+class TestWriteAtomic(unittest.TestCase):
+    """Unittests for testing the write_atomic function."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "file.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_write(self):
+        write_atomic(self.path, "{}")
+        write_atomic(self.path, '{"a": 1}', sync=False)
+        with open(self.path) as f:
+            self.assertEqual(f.read(), '{"a": 1}')
+        self.assertEqual(os.listdir(self.tmpdir.name), ["file.json"])
+
+    def test_keeps_permissions(self):
+        other = os.path.join(self.tmpdir.name, "other.json")
+        open(other, "w").close()
+        write_atomic(self.path, "{}")
+        self.assertEqual(os.stat(self.path).st_mode & 0o777,
+                         os.stat(other).st_mode & 0o777)
+        os.remove(other)
+        os.chmod(self.path, 0o644)
+        write_atomic(self.path, "[]")
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o644)
+
+    def test_new_file_follows_umask(self):
+        umask = os.umask(0o077)
+        try:
+            write_atomic(self.path, "{}")
+        finally:
+            os.umask(umask)
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o600)
+
+    def test_failed_write_keeps_file(self):
+        write_atomic(self.path, "{}")
+        with self.assertRaises(TypeError):
+            write_atomic(self.path, 1234)
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "{}")
+        self.assertEqual(os.listdir(self.tmpdir.name), ["file.json"])
+
+
+class TestGroupCommit(unittest.TestCase):
+    """Unittests for testing the GroupCommit class."""
+
+    def run_threads(self, target, count=8):
+        threads = [threading.Thread(target=target) for i in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def test_merges_requests(self):
+        group = GroupCommit(lambda: None, 0.05)
+        self.run_threads(group.request)
+        self.assertGreaterEqual(group.commits, 1)
+        self.assertLess(group.commits, 8)
+
+    def test_commit_follows_request(self):
+        state = {"value": 0, "committed": 0}
+
+        def commit():
+            state["committed"] = state["value"]
+
+        group = GroupCommit(commit, 0.01)
+        errors = []
+
+        def request():
+            state["value"] += 1
+            seen = state["value"]
+            group.request()
+            if state["committed"] < seen:
+                errors.append(seen)
+
+        self.run_threads(request)
+        self.assertEqual(errors, [])
+
+    def test_error_is_raised(self):
+        def commit():
+            raise OSError("disk full")
+
+        group = GroupCommit(commit, 0)
+        with self.assertRaises(OSError):
+            group.request()
+        self.assertEqual(group.commits, 0)
+
+
+class TestFileStorage_durable(FileStorageTestCase):
+    """Unittests for the crash-safe saves of FileStorage."""
+
+    def test_failed_save_keeps_file_and_changes(self):
+        models.storage = FileStorage(path=self.path)
+        user = User()
+        models.storage.save()
+        user.first_name = "Betty"
+        with patch("os.replace", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                models.storage.save()
+        with open(self.path) as f:
+            self.assertNotIn("first_name", f.read())
+        models.storage.save()
+        with open(self.path) as f:
+            self.assertEqual(json.load(f)["User." + user.id]["first_name"],
+                             "Betty")
+
+    def test_group_commit(self):
+        models.storage = FileStorage(path=self.path, commit_window=0.05)
+
+        def create():
+            User()
+            models.storage.save()
+
+        threads = [threading.Thread(target=create) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertLess(models.storage.group_commit.commits, 8)
+        with open(self.path) as f:
+            self.assertEqual(len(json.load(f)), 8)
+
+
+class TestFileStorage_background(FileStorageTestCase):
+    """Unittests for the background writer of FileStorage."""
+
+    options = {"background": True}
+
+    def keys(self):
+        with open(self.path) as f:
+            return set(json.load(f))
+
+    def test_save_does_not_block(self):
+        release = threading.Event()
+
+        def slow_write(path, text, sync=True):
+            release.wait(5)
+            write_atomic(path, text, sync)
+
+        with patch("models.engine.file_storage.write_atomic", slow_write):
+            users = [User() for i in range(5)]
+            for user in users:
+                user.save()
+            self.assertFalse(os.path.exists(self.path))
+            release.set()
+            models.storage.flush()
+        self.assertEqual(self.keys(), {"User." + u.id for u in users})
+        self.assertLess(models.storage.writer.writes, 5)
+
+    def test_changes_after_save_stay_pending(self):
+        user = User()
+        user.first_name = "Betty"
+        models.storage.save()
+        user.first_name = "Holberton"
+        models.storage.wait()
+        with open(self.path) as f:
+            self.assertEqual(json.load(f)["User." + user.id]["first_name"],
+                             "Betty")
+        models.storage.flush()
+        with open(self.path) as f:
+            self.assertEqual(json.load(f)["User." + user.id]["first_name"],
+                             "Holberton")
+
+    def test_failed_write_is_retried(self):
+        user = User()
+        with patch("os.replace", side_effect=OSError("disk full")):
+            models.storage.save()
+            with self.assertRaises(OSError):
+                models.storage.wait()
+        models.storage.flush()
+        self.assertEqual(self.keys(), {"User." + user.id})
+
+    def test_journal(self):
+        models.storage = FileStorage(path=self.path, journal=True,
+                                     background=True)
+        user = User()
+        models.storage.save()
+        models.storage.flush()
+        FileStorage._FileStorage__objects.clear()
+        models.storage.reload()
+        self.assertIsNotNone(models.storage.get(User, user.id))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,6 +4,7 @@ import os
 import json
 import models
 import unittest
+from unittest.mock import patch
 from datetime import datetime
 from models.base_model import BaseModel
 from models.engine.file_storage import FileStorage
@@ -13,6 +14,7 @@ from models.place import Place
 from models.city import City
 from models.amenity import Amenity
 from models.review import Review
+from tests.test_engine import FileStorageTestCase
 
 
 class TestFileStorage(unittest.TestCase):
@@ -60,9 +62,8 @@ class TestFileStorage_methods(unittest.TestCase):
     def test_all(self):
         self.assertEqual(dict, type(models.storage.all()))
 
-    def test_all_with_arg(self):
-        with self.assertRaises(TypeError):
-            models.storage.all(None)
+    def test_all_with_None(self):
+        self.assertIs(models.storage.all(None), models.storage.all())
 
     def test_new(self):
         basemodel = BaseModel()
@@ -164,5 +165,172 @@ class TestFileStorage_methods(unittest.TestCase):
             models.storage.reload(None)
 
 
+class TestFileStorage_dirty(FileStorageTestCase):
+    """Unittests for the dirty object tracking of FileStorage."""
+
+    def read_file(self):
+        with open(self.path, "r") as f:
+            return json.load(f)
+
+    def test_save_encodes_only_changed(self):
+        users = [User() for i in range(5)]
+        models.storage.save()
+        with patch.object(User, "to_dict", autospec=True,
+                          side_effect=BaseModel.to_dict) as to_dict:
+            users[2].first_name = "Betty"
+            models.storage.save()
+            self.assertEqual(to_dict.call_count, 1)
+        saved = self.read_file()
+        self.assertEqual(len(saved), 5)
+        self.assertEqual(saved["User." + users[2].id]["first_name"], "Betty")
+
+    def test_setattr_marks_dirty(self):
+        user = User()
+        models.storage.save()
+        user.email = "a@b.c"
+        models.storage.save()
+        self.assertEqual(self.read_file()["User." + user.id]["email"],
+                         "a@b.c")
+
+    def test_delattr_marks_dirty(self):
+        city = City()
+        city.state_id = "s1"
+        city.rating = 4
+        models.storage.save()
+        del city.state_id
+        del city.rating
+        models.storage.save()
+        saved = self.read_file()["City." + city.id]
+        self.assertNotIn("state_id", saved)
+        self.assertNotIn("rating", saved)
+        self.assertEqual(models.storage.lookup(City, "state_id", "s1"), {})
+        with models.storage.batch():
+            city.name = "Nairobi"
+        with self.assertRaises(ValueError):
+            with models.storage.batch():
+                del city.name
+                raise ValueError
+        self.assertEqual(city.name, "Nairobi")
+
+    def test_touch_after_inplace_change(self):
+        place = Place()
+        place.amenity_ids = []
+        models.storage.save()
+        place.amenity_ids.append("1234")
+        models.storage.touch(place)
+        models.storage.save()
+        self.assertEqual(
+            self.read_file()["Place." + place.id]["amenity_ids"], ["1234"])
+
+    def test_delete_drops_fragment(self):
+        user = User()
+        state = State()
+        models.storage.save()
+        models.storage.delete(user)
+        models.storage.save()
+        saved = self.read_file()
+        self.assertNotIn("User." + user.id, saved)
+        self.assertIn("State." + state.id, saved)
+
+    def test_out_of_band_removal(self):
+        user = User()
+        models.storage.save()
+        FileStorage._FileStorage__objects.clear()
+        models.storage.save()
+        self.assertEqual(self.read_file(), {})
+
+
+class TestFileStorage_index(FileStorageTestCase):
+    """Unittests for the class index and lookups of FileStorage."""
+
+    def test_all_with_class(self):
+        user = User()
+        state = State()
+        self.assertEqual(models.storage.all(User), {"User." + user.id: user})
+        self.assertEqual(models.storage.all("State"),
+                         {"State." + state.id: state})
+        self.assertEqual(models.storage.all(Review), {})
+
+    def test_count(self):
+        User()
+        User()
+        State()
+        self.assertEqual(models.storage.count(), 3)
+        self.assertEqual(models.storage.count(User), 2)
+        self.assertEqual(models.storage.count("State"), 1)
+        self.assertEqual(models.storage.count(City), 0)
+
+    def test_delete(self):
+        user = User()
+        models.storage.delete(user)
+        self.assertNotIn("User." + user.id, models.storage.all())
+        self.assertEqual(models.storage.count(User), 0)
+        self.assertEqual(models.storage.all(User), {})
+
+    def test_class_index_after_clear(self):
+        User()
+        FileStorage._FileStorage__objects.clear()
+        self.assertEqual(models.storage.count(User), 0)
+        user = User()
+        self.assertEqual(models.storage.all(User), {"User." + user.id: user})
+
+    def test_class_index_after_reload(self):
+        user = User()
+        models.storage.save()
+        models.storage.reload()
+        reloaded = models.storage.all(User)["User." + user.id]
+        self.assertIsNot(reloaded, user)
+        self.assertEqual(reloaded.id, user.id)
+
+
+class TestFileStorage_lazy(FileStorageTestCase):
+    """Unittests for the lazy loading of FileStorage."""
+
+    def setUp(self):
+        super().setUp()
+        self.user = User()
+        self.state = State()
+        models.storage.save()
+        FileStorage._FileStorage__objects.clear()
+        models.storage = FileStorage(path=self.path)
+
+    def test_nothing_loaded_before_access(self):
+        self.assertEqual(FileStorage._FileStorage__objects, {})
+
+    def test_load_one_class(self):
+        self.assertIn("User." + self.user.id, models.storage.all(User))
+        self.assertNotIn("State." + self.state.id,
+                         FileStorage._FileStorage__objects)
+        self.assertEqual(models.storage.count(State), 1)
+        self.assertIn("State." + self.state.id,
+                      FileStorage._FileStorage__objects)
+
+    def test_get_loads_class(self):
+        self.assertEqual(models.storage.get(User, self.user.id).id,
+                         self.user.id)
+
+    def test_new_object_kept(self):
+        user = User(id=self.user.id, created_at=self.user.created_at
+                    .isoformat(), updated_at=self.user.updated_at
+                    .isoformat(), first_name="Betty")
+        models.storage.new(user)
+        self.assertIs(models.storage.get(User, self.user.id), user)
+
+    def test_deleted_object_not_loaded(self):
+        models.storage.delete(User(**self.user.to_dict()))
+        self.assertEqual(models.storage.all(User), {})
+
+    def test_save_keeps_unloaded_classes(self):
+        models.storage.all(User)
+        models.storage.save()
+        with open(self.path, "r") as f:
+            self.assertIn("State." + self.state.id, json.load(f))
+
+    def test_reload_classes(self):
+        models.storage.reload(classes=[State])
+        self.assertEqual(list(FileStorage._FileStorage__objects),
+                         ["State." + self.state.id])
+
+
 if __name__ == "__main__":
     unittest.main()
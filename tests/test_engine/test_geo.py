@@ -0,0 +1,167 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/geo.py."""
+import models
+import random
+import unittest
+from io import StringIO
+from unittest.mock import patch
+from console import HBNBCommand
+from models.engine.file_storage import FileStorage
+from models.engine.geo import GeoIndex, bounding_box, distance
+from models.place import Place
+from models.user import User
+from tests.test_engine import DBStorageTestCase, FileStorageTestCase
+
+# Nairobi, Mombasa, Kisumu and Fiji, across the antimeridian
+POINTS = {"nbo": (-1.2864, 36.8172), "mba": (-4.0435, 39.6682),
+          "ksm": (-0.0917, 34.7680), "fji": (-17.7134, 178.0650)}
+
+
+class TestGeoIndex(unittest.TestCase):
+    """Unittests for testing the GeoIndex class."""
+
+    def setUp(self):
+        self.index = GeoIndex()
+        for key, (lat, lon) in POINTS.items():
+            self.index.add(key, Place(id=key, latitude=lat, longitude=lon))
+
+    def test_distance(self):
+        self.assertAlmostEqual(distance(*POINTS["nbo"], *POINTS["mba"]),
+                               441, delta=2)
+        self.assertEqual(distance(10, 20, 10, 20), 0)
+
+    def test_bounding_box(self):
+        south, north, lons = bounding_box(0, 179.9, 50)
+        self.assertEqual(len(lons), 2)
+        self.assertEqual(bounding_box(89.9, 0, 50)[2], [(-180.0, 180.0)])
+
+    def test_near(self):
+        found = self.index.near(*POINTS["nbo"], radius=500)
+        self.assertEqual([key for key, km in found], ["nbo", "ksm", "mba"])
+        self.assertEqual(found[0][1], 0)
+        self.assertEqual([key for key, km in
+                          self.index.near(*POINTS["nbo"], limit=2)],
+                         ["nbo", "ksm"])
+        self.assertEqual(self.index.near(0, -60, radius=100), [])
+        self.assertEqual(self.index.near(*POINTS["nbo"], radius=0),
+                         [("nbo", 0)])
+        self.assertEqual(len(self.index.near(0, -60)), 4)
+
+    def test_near_across_antimeridian(self):
+        found = self.index.near(-17.7, -179.9, radius=300)
+        self.assertEqual([key for key, km in found], ["fji"])
+        self.assertEqual(self.index.near(-17.7, -179.9, limit=1)[0][0],
+                         "fji")
+
+    def test_within(self):
+        self.assertEqual(self.index.within(-5, 34, 0, 40),
+                         ["ksm", "mba", "nbo"])
+        self.assertEqual(self.index.within(-20, 170, -10, -170), ["fji"])
+        self.assertEqual(self.index.within(10, 0, 20, 10), [])
+
+    def test_estimate(self):
+        self.assertEqual(self.index.estimate_near(*POINTS["nbo"], 500), 3)
+        self.assertEqual(self.index.estimate_near(0, -60, 100), 0)
+        self.assertEqual(self.index.estimate_near(0, -60), 4)
+        self.assertEqual(self.index.estimate_within(-20, 170, -10, -170), 1)
+
+    def test_update_and_remove(self):
+        self.index.update("ksm", Place(latitude=-17.8, longitude=178.1))
+        self.index.remove("fji")
+        self.index.remove("xyz")
+        self.index.add("bad", Place(latitude="north", longitude=0))
+        self.assertEqual(len(self.index), 3)
+        self.assertEqual(self.index.within(-20, 170, -10, 180), ["ksm"])
+
+    def test_matches_linear_scan(self):
+        index = GeoIndex(cell_size=1.0)
+        rand = random.Random(0)
+        points = {str(i): (rand.uniform(-60, 60), rand.uniform(-180, 180))
+                  for i in range(500)}
+        for key, (lat, lon) in points.items():
+            index.add(key, Place(latitude=lat, longitude=lon))
+        scan = sorted((distance(10, 20, *p), key)
+                      for key, p in points.items())
+        self.assertEqual([key for key, km in index.near(10, 20, 2000)],
+                         [key for km, key in scan if km <= 2000])
+        self.assertEqual([key for key, km in index.near(10, 20, limit=7)],
+                         [key for km, key in scan[:7]])
+
+
+class TestFileStorage_geo(FileStorageTestCase):
+    """Unittests for the spatial queries of FileStorage."""
+
+    def setUp(self):
+        super().setUp()
+        self.places = {}
+        for name, (lat, lon) in POINTS.items():
+            place = Place()
+            place.latitude = lat
+            place.longitude = lon
+            self.places[name] = place
+
+    def test_near_and_within(self):
+        nbo, mba = self.places["nbo"], self.places["mba"]
+        self.assertEqual(models.storage.near(Place, *POINTS["mba"],
+                                             limit=1), [(mba.id, 0.0)])
+        self.assertEqual(models.storage.within("Place", -2, 36, -1, 37),
+                         [nbo.id])
+
+    def test_updated_deleted_and_reloaded(self):
+        nbo = self.places["nbo"]
+        nbo.latitude = 40.0
+        models.storage.delete(self.places["ksm"])
+        models.storage.save()
+        FileStorage._FileStorage__objects.clear()
+        models.storage.reload()
+        self.assertEqual(models.storage.within(Place, 39, 36, 41, 37),
+                         [nbo.id])
+        self.assertEqual(len(models.storage.near(Place, 0, 36, 1000)), 1)
+
+    def test_not_indexed(self):
+        with self.assertRaises(KeyError):
+            models.storage.near(User, 0, 0)
+
+    def test_console(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("near Place -1.2864 36.8172 400")
+        self.assertEqual(output.getvalue().split(),
+                         [self.places["nbo"].id, "0.000",
+                          self.places["ksm"].id, "263.740"])
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("within Place -20 170 -10 -170")
+        self.assertEqual(output.getvalue(), self.places["fji"].id + "\n")
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("near Place 1")
+            HBNBCommand().onecmd("near User 1 2")
+            HBNBCommand().onecmd("within Place a b c d")
+        self.assertEqual(output.getvalue().splitlines(),
+                         ["** coordinates missing **",
+                          "** User has no geo index **",
+                          "** could not convert string to float: 'a' **"])
+
+
+class TestDBStorage_geo(DBStorageTestCase):
+    """Unittests for the spatial queries of DBStorage."""
+
+    def test_near_and_within(self):
+        places = {}
+        for name, (lat, lon) in POINTS.items():
+            places[name] = Place()
+            places[name].latitude = lat
+            places[name].longitude = lon
+        models.storage.save()
+        found = models.storage.near(Place, *POINTS["nbo"], radius=500)
+        self.assertEqual([obj_id for obj_id, km in found],
+                         [places[name].id for name in ("nbo", "ksm", "mba")])
+        self.assertEqual(models.storage.near(Place, 0, -179, limit=1)[0][0],
+                         places["fji"].id)
+        self.assertEqual(models.storage.near(Place, 0, 0, radius=0), [])
+        self.assertEqual(models.storage.within(Place, -20, 170, -10, -170),
+                         [places["fji"].id])
+        with self.assertRaises(KeyError):
+            models.storage.within(User, 0, 0, 1, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/ids.py."""
+import os
+import models
+import unittest
+from datetime import datetime
+from uuid import UUID, uuid4
+from models.engine import ids
+from models.engine.bulk import build
+from models.engine.file_storage import FileStorage
+from models.engine.shards import ShardLayout
+from models.place import Place
+from models.user import User
+from tests.test_engine import FileStorageTestCase
+
+
+class TestIds(unittest.TestCase):
+    """Unittests for testing the ids module."""
+
+    def tearDown(self):
+        ids.version = 4
+
+    def test_uuid7(self):
+        made = [ids.uuid7() for _ in range(2000)]
+        self.assertEqual(made, sorted(made))
+        self.assertEqual(len(set(made)), len(made))
+        uuid = UUID(made[0])
+        self.assertEqual(uuid.version, 7)
+        self.assertEqual(uuid.variant, "specified in RFC 4122")
+
+    def test_uuid7_of_time(self):
+        ms = 1790000000123
+        self.assertEqual(ids.id_ms(ids.uuid7(ms)), ms)
+        self.assertLess(ids.uuid7(ms), ids.uuid7(ms + 1))
+
+    def test_other_ids(self):
+        for obj_id in (str(uuid4()), "1", None, "x" * 36):
+            self.assertIsNone(ids.id_ms(obj_id))
+
+    def test_new_id(self):
+        self.assertEqual(UUID(ids.new_id()).version, 4)
+        ids.version = 7
+        self.assertEqual(UUID(ids.new_id()).version, 7)
+        created_at = datetime(2026, 3, 1, 12, 30)
+        self.assertEqual(ids.id_ms(ids.new_id(created_at)),
+                         created_at.timestamp() * 1000)
+        self.assertEqual(UUID(User().id).version, 7)
+
+    def test_build_from_created_at(self):
+        ids.version = 7
+        place = build(Place, {"name": "Loft",
+                              "created_at": "2025-07-04T08:00:00"})
+        self.assertEqual(ids.id_ms(place.id),
+                         datetime(2025, 7, 4, 8).timestamp() * 1000)
+
+
+class TestFileStorage_months(FileStorageTestCase):
+    """Unittests for the month layout of FileStorage."""
+
+    options = {"layout": "month", "buckets": 2}
+
+    def tearDown(self):
+        ids.version = 4
+        super().tearDown()
+
+    def test_shard(self):
+        layout = ShardLayout("f.json", "month")
+        ms = int(datetime(2026, 2, 14, 12).timestamp() * 1000)
+        self.assertEqual(layout.shard("User." + ids.uuid7(ms)),
+                         "User.2026-02")
+        self.assertRegex(layout.shard("User." + str(uuid4())),
+                         r"^User\.\d+$")
+
+    def test_save_and_reload(self):
+        ids.version = 7
+        old = build(User, {"created_at": "2025-01-10T00:00:00"})
+        new = build(User, {"created_at": "2025-02-10T00:00:00"})
+        ids.version = 4
+        for obj in (old, new, build(User, {"id": "plain"})):
+            models.storage.new(obj)
+        models.storage.save()
+        files = sorted(os.listdir(self.path + ".d"))
+        self.assertIn("User.2025-01.json", files)
+        self.assertIn("User.2025-02.json", files)
+        self.assertEqual(len(files), 3)
+        FileStorage._FileStorage__objects.clear()
+        models.storage = FileStorage(path=self.path, layout="month",
+                                     buckets=2)
+        self.assertEqual(sorted(models.storage.all(User)),
+                         sorted(["User." + old.id, "User." + new.id,
+                                 "User.plain"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
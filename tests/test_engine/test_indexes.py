@@ -0,0 +1,114 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/indexes.py."""
+import models
+import unittest
+from console import HBNBCommand
+from models.engine.file_storage import FileStorage
+from models.engine.indexes import AttributeIndex
+from models.city import City
+from models.place import Place
+from models.review import Review
+from models.state import State
+from tests.test_engine import FileStorageTestCase
+
+
+class TestAttributeIndex(unittest.TestCase):
+    """Unittests for testing the AttributeIndex class."""
+
+    def setUp(self):
+        self.index = AttributeIndex("state_id")
+
+    def test_add_and_get(self):
+        city = City(id="1", state_id="s1")
+        self.index.add("City.1", city)
+        self.assertEqual(self.index.get("s1"), {"City.1": city})
+        self.assertEqual(self.index.get("s2"), {})
+
+    def test_remove(self):
+        self.index.add("City.1", City(id="1", state_id="s1"))
+        self.index.remove("City.1")
+        self.index.remove("City.2")
+        self.assertEqual(self.index.get("s1"), {})
+
+    def test_update(self):
+        city = City(id="1", state_id="s1")
+        self.index.add("City.1", city)
+        self.assertIsNone(self.index.update("City.1", city))
+        city.state_id = "s2"
+        self.assertEqual(self.index.update("City.1", city), ("s1", "s2"))
+        self.assertEqual(self.index.get("s1"), {})
+        self.assertEqual(self.index.get("s2"), {"City.1": city})
+
+    def test_unhashable_value(self):
+        city = City(id="1", state_id=["s1"])
+        self.index.add("City.1", city)
+        self.assertEqual(self.index.get(["s1"]), {})
+        self.index.remove("City.1")
+
+
+class TestFileStorage_lookup(FileStorageTestCase):
+    """Unittests for the foreign key lookups of FileStorage."""
+
+    def test_lookup_new(self):
+        state = State()
+        city = City()
+        city.state_id = state.id
+        City()
+        self.assertEqual(models.storage.lookup(City, "state_id", state.id),
+                         {"City." + city.id: city})
+
+    def test_lookup_not_indexed(self):
+        with self.assertRaises(KeyError):
+            models.storage.lookup(City, "name", "Nairobi")
+
+    def test_lookup_after_update(self):
+        place = Place()
+        place.user_id = "u1"
+        place.user_id = "u2"
+        self.assertEqual(models.storage.lookup(Place, "user_id", "u1"), {})
+        self.assertIn("Place." + place.id,
+                      models.storage.lookup("Place", "user_id", "u2"))
+
+    def test_lookup_after_delete(self):
+        review = Review()
+        review.place_id = "p1"
+        models.storage.delete(review)
+        self.assertEqual(models.storage.lookup(Review, "place_id", "p1"), {})
+
+    def test_lookup_after_reload(self):
+        review = Review()
+        review.user_id = "u1"
+        models.storage.save()
+        FileStorage._FileStorage__objects.clear()
+        models.storage.reload()
+        self.assertIn("Review." + review.id,
+                      models.storage.lookup(Review, "user_id", "u1"))
+
+    def test_lazy_load_extends_indexes(self):
+        review = Review()
+        review.user_id = "u1"
+        place = Place()
+        place.user_id = "u1"
+        models.storage.save()
+        FileStorage._FileStorage__objects.clear()
+        models.storage = FileStorage(path=self.path)
+        self.assertIn("Review." + review.id,
+                      models.storage.lookup(Review, "user_id", "u1"))
+        index = models.storage._FileStorage__attr_indexes["Review"]
+        self.assertEqual(models.storage.lookup(Place, "user_id", "u1"),
+                         {"Place." + place.id: models.storage.get(
+                             Place, place.id)})
+        self.assertIs(models.storage._FileStorage__attr_indexes["Review"],
+                      index)
+
+    def test_lookup_after_console_update(self):
+        city = City()
+        HBNBCommand().onecmd('City.update("{}", {{"state_id": "s1"}})'
+                             .format(city.id))
+        self.assertIn("City." + city.id,
+                      models.storage.lookup(City, "state_id", "s1"))
+        self.assertEqual(models.storage.lookup(City, "state_id", ""), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
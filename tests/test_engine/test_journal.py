@@ -0,0 +1,211 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/journal.py."""
+import os
+import json
+import models
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+from models.base_model import BaseModel
+from models.engine.file_storage import FileStorage
+from models.engine.journal import Journal
+from models.user import User
+from tests.test_engine import FileStorageTestCase
+
+
+class TestJournal(unittest.TestCase):
+    """Unittests for testing the Journal class."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.journal = Journal(os.path.join(self.tmpdir.name, "file.log"))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_append_and_changes(self):
+        self.journal.append([("put", "User.1", {"id": "1"}),
+                             ("put", "User.2", {"id": "2"}),
+                             ("del", "User.1", None)])
+        self.assertEqual(self.journal.changes(),
+                         {"User.1": None, "User.2": {"id": "2"}})
+
+    def test_changes_keep_last_put(self):
+        self.journal.append([("put", "User.1", {"id": "1"})])
+        self.journal.append([("put", "User.1", {"id": "1", "age": 2})])
+        self.assertEqual(self.journal.changes(),
+                         {"User.1": {"id": "1", "age": 2}})
+
+    def test_changes_missing_log(self):
+        self.assertEqual(self.journal.changes(), {})
+
+    def test_changes_ignore_truncated_line(self):
+        self.journal.append([("put", "User.1", {"id": "1"})])
+        with open(self.journal.path, "a") as f:
+            f.write('{"op": "put", "key": "User.2", "val')
+        self.assertEqual(list(self.journal.changes()), ["User.1"])
+
+    def test_append_after_truncated_line(self):
+        self.journal.append([("put", "User.1", {"id": "1"})])
+        with open(self.journal.path, "a") as f:
+            f.write('{"op": "put", "key": "User.2", "val')
+        self.journal.append([("put", "User.3", {"id": "3"})])
+        self.journal.append([("put", "User.4", {"id": "4"})])
+        self.assertEqual(list(self.journal.changes()),
+                         ["User.1", "User.3", "User.4"])
+        with open(self.journal.path, "w") as f:
+            f.write('{"op": "del", "ke')
+        self.journal.append([("put", "User.5", {"id": "5"})])
+        self.assertEqual(list(self.journal.changes()), ["User.5"])
+
+    def test_compact_folds_log_into_snapshot(self):
+        snapshot = os.path.join(self.tmpdir.name, "file.json")
+        with open(snapshot, "w") as f:
+            json.dump({"User.1": {"id": "1"}, "User.2": {"id": "2"}}, f)
+        self.journal.append([("put", "User.3", {"id": "3"}),
+                             ("del", "User.1", None)])
+        self.journal.compact(snapshot, wait=True)
+        with open(snapshot, "r") as f:
+            self.assertEqual(json.load(f), {"User.2": {"id": "2"},
+                                            "User.3": {"id": "3"}})
+        self.assertFalse(os.path.exists(self.journal.path))
+        self.assertFalse(os.path.exists(self.journal.segment_path))
+
+    def test_compact_keeps_permissions(self):
+        snapshot = os.path.join(self.tmpdir.name, "file.json")
+        with open(snapshot, "w") as f:
+            json.dump({"User.1": {"id": "1"}}, f)
+        os.chmod(snapshot, 0o600)
+        self.journal.append([("put", "User.2", {"id": "2"})])
+        self.journal.compact(snapshot, wait=True)
+        self.assertEqual(os.stat(snapshot).st_mode & 0o777, 0o600)
+        self.assertEqual(os.listdir(self.tmpdir.name), ["file.json"])
+
+    def test_compact_nothing_to_do(self):
+        snapshot = os.path.join(self.tmpdir.name, "file.json")
+        self.assertIsNone(self.journal.compact(snapshot))
+
+    def test_changes_after_interrupted_compaction(self):
+        self.journal.append([("put", "User.1", {"id": "1"})])
+        os.replace(self.journal.path, self.journal.segment_path)
+        self.journal.append([("put", "User.2", {"id": "2"})])
+        self.assertEqual(list(self.journal.changes()), ["User.1", "User.2"])
+
+    def test_needs_compaction(self):
+        self.journal.max_size = 10
+        self.assertFalse(self.journal.needs_compaction())
+        self.journal.append([("put", "User.1", {"id": "1"})])
+        self.assertTrue(self.journal.needs_compaction())
+
+    def test_size_and_clear(self):
+        self.assertEqual(self.journal.size(), 0)
+        self.journal.append([("del", "User.1", None)])
+        self.assertGreater(self.journal.size(), 0)
+        self.journal.clear()
+        self.assertFalse(os.path.exists(self.journal.path))
+
+
+class TestFileStorage_journal(FileStorageTestCase):
+    """Unittests for FileStorage in journal mode."""
+
+    options = {"journal": True}
+
+    def read_log(self):
+        with open(self.path + ".log", "r") as f:
+            return [json.loads(line) for line in f]
+
+    def test_save_appends_only_changes(self):
+        user = User()
+        models.storage.save()
+        BaseModel()
+        models.storage.save()
+        records = self.read_log()
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[0]["key"], "User." + user.id)
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_save_touched_object(self):
+        user = User()
+        models.storage.save()
+        user.first_name = "Betty"
+        user.save()
+        records = self.read_log()
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[1]["value"]["first_name"], "Betty")
+
+    def test_delete_is_journaled(self):
+        user = User()
+        models.storage.save()
+        models.storage.delete(user)
+        models.storage.save()
+        records = self.read_log()
+        self.assertEqual(records[-1], {"op": "del", "key": "User." + user.id})
+
+    def test_reload_replays_log(self):
+        user = User()
+        bm = BaseModel()
+        models.storage.save()
+        models.storage.delete(bm)
+        user.first_name = "Betty"
+        user.save()
+        FileStorage._FileStorage__objects.clear()
+        models.storage.reload()
+        objs = models.storage.all()
+        self.assertNotIn("BaseModel." + bm.id, objs)
+        self.assertEqual(objs["User." + user.id].first_name, "Betty")
+
+    def test_save_triggers_compaction(self):
+        models.storage.journal.max_size = 1
+        user = User()
+        models.storage.save()
+        models.storage.journal.wait()
+        self.assertFalse(os.path.exists(self.path + ".log"))
+        with open(self.path, "r") as f:
+            self.assertIn("User." + user.id, json.load(f))
+
+    def test_reload_after_compaction(self):
+        user = User()
+        models.storage.save()
+        models.storage.compact(wait=True)
+        user.first_name = "Betty"
+        user.save()
+        FileStorage._FileStorage__objects.clear()
+        models.storage.reload()
+        objs = models.storage.all()
+        self.assertEqual(objs["User." + user.id].first_name, "Betty")
+
+    def test_load_during_compaction(self):
+        user = User()
+        models.storage.save()
+        FileStorage._FileStorage__objects.clear()
+        models.storage = FileStorage(path=self.path, journal=True)
+        journal = models.storage.journal
+        release = threading.Event()
+        fold = journal._Journal__fold
+
+        def slow_fold(snapshot_path):
+            release.wait(5)
+            fold(snapshot_path)
+
+        with patch.object(journal, "_Journal__fold", slow_fold):
+            models.storage.compact()
+        try:
+            self.assertEqual(models.storage.count(User), 1)
+            self.assertTrue(journal.compacting())
+        finally:
+            release.set()
+            journal.wait()
+        self.assertIsNotNone(models.storage.get(User, user.id))
+
+    def test_snapshot_save_clears_log(self):
+        User()
+        models.storage.save()
+        models.storage.journal_mode = False
+        models.storage.save()
+        self.assertFalse(os.path.exists(self.path + ".log"))
+        self.assertTrue(os.path.exists(self.path))
+
+
+if __name__ == "__main__":
+    unittest.main()
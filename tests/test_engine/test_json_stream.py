@@ -0,0 +1,86 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/json_stream.py."""
+import io
+import json
+import os
+import models
+import unittest
+from models.engine.file_storage import FileStorage
+from models.engine.json_stream import JSONStream
+from models.user import User
+from tests.test_engine import FileStorageTestCase
+
+
+class TestJSONStream(unittest.TestCase):
+    """Unittests for testing the JSONStream class."""
+
+    data = {"User.1": {"id": "1", "name": 'a "quoted" {name}'},
+            "User.2": {"id": "2", "age": 12345, "tags": [1, 2.5, None]},
+            "n": 1234567890}
+
+    def items(self, text, chunk_size=1 << 16):
+        return list(JSONStream(io.StringIO(text), chunk_size))
+
+    def test_items(self):
+        self.assertEqual(self.items(json.dumps(self.data)),
+                         list(self.data.items()))
+
+    def test_small_chunks(self):
+        text = json.dumps(self.data, indent=2)
+        for chunk_size in (1, 2, 3, 7):
+            self.assertEqual(self.items(text, chunk_size),
+                             list(self.data.items()))
+
+    def test_empty(self):
+        self.assertEqual(self.items(""), [])
+        self.assertEqual(self.items(" {} "), [])
+        self.assertEqual(self.items("{ }", 1), [])
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            self.items("[1, 2]")
+        with self.assertRaises(ValueError):
+            self.items('{"a": 1', 2)
+        with self.assertRaises(ValueError):
+            self.items('{"a": {"b": 1}')
+
+    def test_position(self):
+        text = json.dumps(self.data)
+        stream = JSONStream(io.StringIO(text), 4)
+        list(stream)
+        self.assertEqual(stream.position, len(text))
+
+
+class TestFileStorage_stream(FileStorageTestCase):
+    """Unittests for the streaming reload of FileStorage."""
+
+    def test_reload_progress(self):
+        users = [User() for i in range(5)]
+        models.storage.save()
+        models.storage.progress_every = 2
+        calls = []
+        models.storage.reload(progress=lambda *args: calls.append(args))
+        size = os.path.getsize(self.path)
+        self.assertEqual([c[0] for c in calls], [2, 4, 5])
+        self.assertEqual(calls[-1], (5, size, size))
+        self.assertTrue(all(c[1] <= size for c in calls))
+        self.assertEqual(len(models.storage.all(User)), len(users))
+
+    def test_reload_with_journal(self):
+        models.storage.journal_mode = True
+        user = User()
+        other = User()
+        models.storage.save()
+        models.storage.compact(wait=True)
+        user.first_name = "Betty"
+        models.storage.delete(other)
+        models.storage.save()
+        FileStorage._FileStorage__objects.clear()
+        models.storage.reload()
+        self.assertEqual(list(models.storage.all()), ["User." + user.id])
+        self.assertEqual(models.storage.get(User, user.id).first_name,
+                         "Betty")
+
+
+if __name__ == "__main__":
+    unittest.main()
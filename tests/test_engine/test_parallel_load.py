@@ -0,0 +1,116 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/parallel_load.py."""
+import json
+import os
+import models
+import tempfile
+import unittest
+from datetime import datetime
+from models.engine import parallel_load
+from models.engine.file_storage import FileStorage
+from models.state import State
+from models.user import User
+from tests.test_engine import FileStorageTestCase
+
+
+class TestParallelLoad(unittest.TestCase):
+    """Unittests for testing the parallel_load functions."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "file.json")
+        date = "2023-01-01T00:00:00"
+        self.data = {
+            f"{name}.{i}": {"id": str(i), "created_at": date,
+                            "updated_at": date, "__class__": name}
+            for i in range(20) for name in ("User", "State")}
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, sep):
+        with open(self.path, "w") as f:
+            f.write("{" + sep.join(json.dumps(k) + ": " + json.dumps(v)
+                                   for k, v in self.data.items()) + "}")
+
+    def decode(self, parts, names=("User", "State")):
+        records = []
+        for task in parallel_load.split(self.path, parts):
+            records += parallel_load.decode_range(task + (set(names),))
+        return records
+
+    def test_split(self):
+        self.write(",\n")
+        ranges = parallel_load.split(self.path, 7)
+        self.assertEqual(ranges[0][1], 0)
+        self.assertEqual(ranges[-1][2], os.path.getsize(self.path))
+        for previous, current in zip(ranges, ranges[1:]):
+            self.assertEqual(previous[2], current[1])
+
+    def test_decode_lines(self):
+        self.write(",\n")
+        for parts in (1, 3, 16, 1000):
+            records = self.decode(parts)
+            self.assertEqual([k for k, v in records], list(self.data))
+
+    def test_decode_single_line(self):
+        self.write(", ")
+        records = self.decode(5)
+        self.assertEqual([k for k, v in records], list(self.data))
+
+    def test_decode_datetimes(self):
+        self.write(",\n")
+        key, value = self.decode(2)[0]
+        self.assertEqual(value["created_at"], datetime(2023, 1, 1))
+
+    def test_decode_names(self):
+        self.write(",\n")
+        records = self.decode(3, ["State"])
+        self.assertEqual(len(records), 20)
+        self.assertTrue(all(k.startswith("State.") for k, v in records))
+
+    def test_decode_empty(self):
+        with open(self.path, "w") as f:
+            f.write("{}")
+        self.assertEqual(self.decode(2), [])
+
+    def test_decode_invalid(self):
+        with open(self.path, "w") as f:
+            f.write('{"User.1": [1, 2]}')
+        with self.assertRaises(ValueError):
+            self.decode(1)
+
+
+class TestFileStorage_parallel(FileStorageTestCase):
+    """Unittests for the parallel reload of FileStorage."""
+
+    options = {"workers": 2}
+
+    def setUp(self):
+        super().setUp()
+        models.storage.parallel_min_size = 0
+
+    def test_reload(self):
+        users = [User() for i in range(10)]
+        users[3].first_name = "Betty"
+        State()
+        models.storage.save()
+        FileStorage._FileStorage__objects.clear()
+        models.storage.reload(classes=[User])
+        loaded = models.storage.all(User)
+        self.assertEqual(list(loaded), ["User." + u.id for u in users])
+        self.assertEqual(loaded["User." + users[3].id].first_name, "Betty")
+        self.assertEqual(loaded["User." + users[0].id].created_at,
+                         users[0].created_at)
+        self.assertEqual(len(FileStorage._FileStorage__objects), 10)
+
+    def test_save_writes_one_record_per_line(self):
+        User()
+        User()
+        models.storage.save()
+        with open(self.path, "r") as f:
+            self.assertEqual(len(f.readlines()), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/query.py."""
+import models
+import random
+import unittest
+from unittest.mock import patch
+from models.engine.geo import distance
+from models.place import Place
+from models.review import Review
+from tests.test_engine import DBStorageTestCase, FileStorageTestCase
+
+
+def make_places(count, seed=0):
+    """Creates places spread over a few cities, prices and points"""
+    rand = random.Random(seed)
+    places = []
+    for i in range(count):
+        place = Place()
+        place.city_id = "c{}".format(rand.randrange(20))
+        place.price_by_night = rand.randrange(10, 300)
+        place.latitude = rand.uniform(-1.5, -1.0)
+        place.longitude = rand.uniform(36.6, 37.1)
+        place.amenity_ids = rand.sample(["wifi", "tv", "pool"],
+                                        rand.randint(0, 3))
+        places.append(place)
+    return places
+
+
+class TestFileStorage_query(FileStorageTestCase):
+    """Unittests for the query() method of FileStorage."""
+
+    def setUp(self):
+        super().setUp()
+        self.places = make_places(600)
+
+    def test_where_order_limit(self):
+        query = models.storage.query(Place).where(
+            city_id="c3", price_by_night__lt=100).order_by(
+            "price_by_night").limit(5)
+        expected = sorted((p for p in self.places
+                           if p.city_id == "c3" and p.price_by_night < 100),
+                          key=lambda p: p.price_by_night)[:5]
+        self.assertEqual([p.price_by_night for p in query],
+                         [p.price_by_night for p in expected])
+        self.assertTrue(query.explain().startswith(
+            "Place: foreign key city_id = 'c3'"))
+        self.assertIn("filter price_by_night lt 100", query.explain())
+        self.assertIn("rejected scan (rows 600, cost 600)", query.explain())
+
+    def test_queries_are_immutable(self):
+        query = models.storage.query("Place")
+        cheap = query.where(price_by_night__lte=50)
+        self.assertEqual(query.count(), 600)
+        self.assertEqual(sorted(cheap.ids()),
+                         sorted(p.id for p in self.places
+                                if p.price_by_night <= 50))
+        self.assertIsNone(cheap.where(price_by_night__gt=50).first())
+        with self.assertRaises(KeyError):
+            models.storage.query("Nothing")
+
+    def test_columns_plan(self):
+        query = models.storage.query(Place).where(
+            latitude__gte=-1.1).order_by("-latitude").limit(3)
+        self.assertTrue(query.explain().startswith(
+            "Place: columns latitude gte -1.1"))
+        self.assertNotIn("sort by", query.explain())
+        self.assertEqual(
+            [p.latitude for p in query],
+            sorted((p.latitude for p in self.places), reverse=True)[:3])
+
+    def test_geo_and_bitsets(self):
+        near = models.storage.query(Place).near(-1.25, 36.85, 5).where(
+            amenity_ids__contains=["wifi", "tv"])
+        expected = [p for p in self.places
+                    if distance(-1.25, 36.85, p.latitude,
+                                p.longitude) <= 5 and
+                    "wifi" in p.amenity_ids and "tv" in p.amenity_ids]
+        found = near.all()
+        self.assertEqual(sorted(p.id for p in found),
+                         sorted(p.id for p in expected))
+        kms = [distance(-1.25, 36.85, p.latitude, p.longitude)
+               for p in found]
+        self.assertEqual(kms, sorted(kms))
+        self.assertIn("geo near (-1.25, 36.85) within 5.0 km",
+                      near.explain())
+        box = models.storage.query(Place).within(-1.3, 36.8, -1.2, 36.9)
+        self.assertEqual(sorted(box.ids()), sorted(
+            p.id for p in self.places
+            if -1.3 <= p.latitude <= -1.2 and 36.8 <= p.longitude <= 36.9))
+
+    def test_rejected_plans_are_not_fetched(self):
+        query = models.storage.query(Place).where(city_id="c3").near(
+            -1.25, 36.85, 3000).where(amenity_ids__contains="wifi")
+        with patch.object(models.storage, "near",
+                          side_effect=AssertionError), \
+                patch.object(models.storage, "having",
+                             side_effect=AssertionError):
+            self.assertIn("rejected geo near", query.explain())
+            self.assertEqual(sorted(query.ids()), sorted(
+                p.id for p in self.places
+                if p.city_id == "c3" and "wifi" in p.amenity_ids))
+        plan = models.storage.query(Place).where(
+            amenity_ids__contains=["wifi", "tv"]).plan()
+        self.assertGreaterEqual(plan.rows, len([
+            p for p in self.places
+            if "wifi" in p.amenity_ids and "tv" in p.amenity_ids]))
+
+    def test_filters_follow_changes(self):
+        place = self.places[0]
+        place.city_id = "moved"
+        place.price_by_night = 1
+        query = models.storage.query(Place).where(city_id="moved")
+        self.assertEqual(query.ids(), [place.id])
+        self.assertEqual(query.where(price_by_night__ne=1).count(), 0)
+        self.assertEqual(models.storage.query(Review).where(
+            text="missing").all(), [])
+
+
+class TestDBStorage_query(DBStorageTestCase):
+    """Unittests for the query() method of DBStorage."""
+
+    def setUp(self):
+        super().setUp()
+        self.places = make_places(100)
+        models.storage.save()
+
+    def test_query(self):
+        query = models.storage.query(Place).where(
+            city_id="c3", price_by_night__lt=200).order_by(
+            "-price_by_night")
+        expected = sorted((p for p in self.places
+                           if p.city_id == "c3" and p.price_by_night < 200),
+                          key=lambda p: p.price_by_night, reverse=True)
+        self.assertEqual(query.ids(), [p.id for p in expected])
+        self.assertEqual(
+            sorted(models.storage.query(Place).where(
+                amenity_ids__contains="pool").ids()),
+            sorted(p.id for p in self.places if "pool" in p.amenity_ids))
+
+
+if __name__ == "__main__":
+    unittest.main()
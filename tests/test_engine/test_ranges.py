@@ -0,0 +1,190 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/ranges.py."""
+import io
+import json
+import models
+import random
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from console import HBNBCommand
+from models.engine.ranges import RangeIndex, SortedPairs, sort_value
+from models.place import Place
+from models.state import State
+from tests.test_engine import DBStorageTestCase, FileStorageTestCase
+
+
+class TestSortedPairs(unittest.TestCase):
+    """Unittests for testing the SortedPairs class."""
+
+    def test_matches_sorted_list(self):
+        rand = random.Random(0)
+        pairs = SortedPairs()
+        pairs.load = 4
+        expected = set()
+        for step in range(3000):
+            if expected and rand.random() < 0.4:
+                pair = rand.choice(sorted(expected))
+                expected.discard(pair)
+                pairs.remove(*pair)
+                pairs.remove(*pair)
+            else:
+                pair = (rand.randrange(30), str(rand.randrange(10 ** 6)))
+                if pair not in expected:
+                    expected.add(pair)
+                    pairs.add(*pair)
+            if step % 300:
+                continue
+            ordered = sorted(expected)
+            middle = ordered[len(ordered) // 2]
+            self.assertEqual(len(pairs), len(ordered))
+            for low, high in [(None, None), (5, 12), (None, 3), (25, None),
+                              (7, 7), (12, 5)]:
+                keys = [key for value, key in ordered
+                        if (low is None or value >= low) and
+                        (high is None or value <= high)]
+                self.assertEqual(list(pairs.irange(low, high)), keys)
+                self.assertEqual(list(pairs.irange(low, high, True)),
+                                 keys[::-1])
+                self.assertEqual(
+                    list(pairs.irange(low, high, after=middle)),
+                    [key for value, key in ordered if (value, key) > middle
+                     and key in keys])
+                self.assertEqual(
+                    list(pairs.irange(low, high, True, middle)),
+                    [key for value, key in ordered if (value, key) < middle
+                     and key in keys][::-1])
+
+    def test_sorted_at_once(self):
+        pairs = SortedPairs([(2, "b"), (1, "z"), (2, "a")])
+        pairs.add(0, "c")
+        self.assertEqual(list(pairs.irange()), ["c", "z", "a", "b"])
+        self.assertEqual(list(SortedPairs().irange(reverse=True)), [])
+
+
+class TestRangeIndex(unittest.TestCase):
+    """Unittests for testing the RangeIndex class."""
+
+    def test_sort_value(self):
+        self.assertEqual(sort_value(2.5), 2.5)
+        self.assertEqual(sort_value(datetime.min + timedelta(seconds=1)),
+                         1000000)
+        for value in (None, "3", True, float("nan"), [1]):
+            self.assertIsNone(sort_value(value))
+
+    def test_add_update_remove(self):
+        index = RangeIndex(("price_by_night", "created_at"), {
+            "a": Place(price_by_night=30), "b": Place(price_by_night=10)})
+        index.add("c", Place(price_by_night="free"))
+        index.update("a", Place(price_by_night=5))
+        self.assertEqual(list(index.scan("price_by_night")), ["a", "b"])
+        self.assertEqual(list(index.scan("price_by_night", 6, 10)), ["b"])
+        index.remove("b")
+        index.remove("z")
+        self.assertEqual(len(index), 2)
+        self.assertEqual(list(index.scan("price_by_night", after=(5, "a"))),
+                         [])
+        with self.assertRaises(KeyError):
+            index.scan("name")
+        with self.assertRaises(ValueError):
+            index.scan("price_by_night", "cheap")
+
+
+class TestFileStorage_between(FileStorageTestCase):
+    """Unittests for the between() method of FileStorage."""
+
+    def setUp(self):
+        super().setUp()
+        self.start = datetime(2026, 1, 1)
+        self.places = []
+        for i in range(50):
+            place = Place()
+            place.price_by_night = i % 10
+            place.updated_at = self.start + timedelta(hours=i)
+            self.places.append(place)
+
+    def test_time_window(self):
+        window = models.storage.between(
+            Place, "updated_at", self.start + timedelta(hours=10),
+            self.start + timedelta(hours=12))
+        self.assertEqual(list(window),
+                         [p.id for p in self.places[10:13]])
+        self.places[11].updated_at = self.start - timedelta(days=1)
+        self.assertEqual(list(models.storage.between(
+            "Place", "updated_at", high=self.start)),
+            [self.places[11].id, self.places[0].id])
+        models.storage.delete(self.places[10])
+        self.assertEqual(list(models.storage.between(
+            Place, "updated_at", self.start + timedelta(hours=10),
+            self.start + timedelta(hours=12))), [self.places[12].id])
+        with self.assertRaises(KeyError):
+            models.storage.between(State, "name")
+
+    def test_pages(self):
+        cheap = [p for p in self.places if p.price_by_night <= 2]
+        cheap.sort(key=lambda p: (p.price_by_night, p.id))
+        pages, after = [], None
+        while True:
+            page = []
+            for obj_id in models.storage.between(Place, "price_by_night",
+                                                 high=2, after=after):
+                page.append(models.storage.get(Place, obj_id))
+                if len(page) == 4:
+                    break
+            if not page:
+                break
+            pages.append(page)
+            after = (page[-1].price_by_night, page[-1].id)
+        self.assertEqual([p for page in pages for p in page], cheap)
+        self.assertEqual(list(models.storage.between(
+            Place, "price_by_night", 8, reverse=True)),
+            [p.id for p in sorted(
+                (p for p in self.places if p.price_by_night >= 8),
+                key=lambda p: (p.price_by_night, p.id), reverse=True)])
+
+    def test_query_reads_range_in_order(self):
+        query = models.storage.query(Place).where(
+            price_by_night__gte=3).order_by("-updated_at").limit(2)
+        self.assertIn("range updated_at from None to None in order",
+                      query.explain())
+        self.assertEqual(query.all(), [self.places[49], self.places[48]])
+
+    def test_export_since(self):
+        models.storage.save()
+        with patch("sys.stdout", new=io.StringIO()) as output:
+            HBNBCommand().onecmd(
+                "export Place since=2026-01-02T22:00:00")
+        rows = [json.loads(line) for line in
+                output.getvalue().splitlines()]
+        self.assertEqual([row["id"] for row in rows],
+                         [p.id for p in self.places[46:]])
+
+
+class TestDBStorage_between(DBStorageTestCase):
+    """Unittests for the between() method of DBStorage."""
+
+    def test_between(self):
+        start = datetime(2026, 1, 1)
+        places = []
+        for i in range(10):
+            place = Place()
+            place.price_by_night = i % 3
+            place.updated_at = start + timedelta(minutes=i)
+            places.append(place)
+        self.assertEqual(list(models.storage.between(
+            Place, "updated_at", start + timedelta(minutes=8))),
+            [p.id for p in places[8:]])
+        ordered = sorted(places, key=lambda p: (p.price_by_night, p.id))
+        self.assertEqual(list(models.storage.between(
+            Place, "price_by_night", 1, 2, after=(
+                ordered[4].price_by_night, ordered[4].id))),
+            [p.id for p in ordered[5:]])
+        self.assertEqual(list(models.storage.between(
+            Place, "price_by_night", reverse=True)),
+            [p.id for p in ordered[::-1]])
+        with self.assertRaises(KeyError):
+            models.storage.between(Place, "name")
+
+
+if __name__ == "__main__":
+    unittest.main()
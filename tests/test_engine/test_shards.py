@@ -0,0 +1,163 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/shards.py."""
+import json
+import os
+import models
+import unittest
+from unittest.mock import patch
+from models.engine.file_storage import FileStorage
+from models.engine.shards import ShardLayout
+from models.state import State
+from models.user import User
+from tests.test_engine import FileStorageTestCase
+
+
+class TestShardLayout(unittest.TestCase):
+    """Unittests for testing the ShardLayout class."""
+
+    def test_shard(self):
+        self.assertEqual(ShardLayout("f.json").shard("User.1"), "")
+        self.assertEqual(ShardLayout("f.json", "class").shard("User.1"),
+                         "User")
+        layout = ShardLayout("f.json", "bucket", 4)
+        shard = layout.shard("User.1")
+        self.assertRegex(shard, r"^User\.[0-3]$")
+        self.assertEqual(layout.shard("User.1"), shard)
+
+    def test_path(self):
+        self.assertEqual(ShardLayout("f.json").path(""), "f.json")
+        self.assertEqual(ShardLayout("f.json", "class").path("User"),
+                         os.path.join("f.json.d", "User.json"))
+
+    def test_unknown_layout(self):
+        with self.assertRaises(ValueError):
+            ShardLayout("f.json", "table")
+
+
+class TestFileStorage_shards(FileStorageTestCase):
+    """Unittests for the sharded layouts of FileStorage."""
+
+    options = {"layout": "class"}
+
+    def files(self):
+        return sorted(os.listdir(self.path + ".d"))
+
+    def test_save_per_class(self):
+        user = User()
+        state = State()
+        models.storage.save()
+        self.assertEqual(self.files(), ["State.json", "User.json"])
+        self.assertFalse(os.path.exists(self.path))
+        with open(os.path.join(self.path + ".d", "User.json")) as f:
+            self.assertEqual(list(json.load(f)), ["User." + user.id])
+
+    def test_save_only_changed_shards(self):
+        user = User()
+        state = State()
+        models.storage.save()
+        state_file = os.path.join(self.path + ".d", "State.json")
+        os.utime(state_file, (0, 0))
+        user.first_name = "Betty"
+        models.storage.save()
+        self.assertEqual(os.stat(state_file).st_mtime, 0)
+
+    def test_delete_removes_empty_shard(self):
+        user = User()
+        State()
+        models.storage.save()
+        models.storage.delete(user)
+        models.storage.save()
+        self.assertEqual(self.files(), ["State.json"])
+
+    def test_reload_selected_classes(self):
+        user = User()
+        State()
+        models.storage.save()
+        FileStorage._FileStorage__objects.clear()
+        models.storage.reload(classes=[User])
+        self.assertEqual(list(FileStorage._FileStorage__objects),
+                         ["User." + user.id])
+
+    def test_bucket_layout(self):
+        models.storage = FileStorage(path=self.path, layout="bucket",
+                                     buckets=4)
+        users = [User() for i in range(20)]
+        models.storage.save()
+        self.assertTrue(1 < len(self.files()) <= 4)
+        users[0].first_name = "Betty"
+        models.storage.save()
+        FileStorage._FileStorage__objects.clear()
+        models.storage.reload()
+        self.assertEqual(models.storage.count(User), 20)
+        self.assertEqual(models.storage.get(User, users[0].id).first_name,
+                         "Betty")
+
+    def test_save_skips_other_shards(self):
+        models.storage = FileStorage(path=self.path, layout="bucket",
+                                     buckets=4)
+        users = [User() for i in range(20)]
+        models.storage.save()
+        layout = models.storage.layout
+        with patch.object(layout, "shard", wraps=layout.shard) as shard:
+            users[0].first_name = "Betty"
+            models.storage.save()
+        self.assertEqual(shard.call_count, 1)
+        FileStorage._FileStorage__objects.clear()
+        models.storage.reload()
+        self.assertEqual(models.storage.count(User), 20)
+
+    def test_migrate(self):
+        models.storage = FileStorage(path=self.path)
+        user = User()
+        state = State()
+        models.storage.save()
+        models.storage.migrate("bucket", 2)
+        self.assertFalse(os.path.exists(self.path))
+        FileStorage._FileStorage__objects.clear()
+        models.storage = FileStorage(path=self.path, layout="bucket",
+                                     buckets=2)
+        self.assertEqual(models.storage.count(), 2)
+        models.storage.migrate("single")
+        self.assertFalse(os.path.exists(self.path + ".d"))
+        with open(self.path) as f:
+            self.assertEqual(set(json.load(f)),
+                             {"User." + user.id, "State." + state.id})
+
+    def test_migrate_between_sharded_layouts(self):
+        users = [User() for i in range(4)]
+        State()
+        models.storage.save()
+        for layout in ("bucket", "month", "class"):
+            models.storage.migrate(layout, 2)
+            user = users.pop()
+            models.storage.delete(user)
+            models.storage.save()
+            FileStorage._FileStorage__objects.clear()
+            models.storage = FileStorage(path=self.path, layout=layout,
+                                         buckets=2)
+            self.assertIsNone(models.storage.get(User, user.id))
+            self.assertEqual(models.storage.count(User), len(users))
+        self.assertEqual(self.files(), ["State.json", "User.json"])
+
+    def test_paths_of_layout(self):
+        os.makedirs(self.path + ".d")
+        for name in ("User.json", "User.1.json", "User.7.json",
+                     "User.2024-05.json", "State.json"):
+            open(os.path.join(self.path + ".d", name), "w").close()
+
+        def names(layout):
+            return [os.path.basename(path) for path in
+                    ShardLayout(self.path, layout, 2).paths({"User"})]
+
+        self.assertEqual(names("class"), ["User.json"])
+        self.assertEqual(names("bucket"), ["User.1.json"])
+        self.assertEqual(names("month"),
+                         ["User.1.json", "User.2024-05.json"])
+
+    def test_journal_needs_single_layout(self):
+        with self.assertRaises(ValueError):
+            FileStorage(path=self.path, journal=True, layout="class")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/text.py."""
+import models
+import sqlite3
+import unittest
+from io import StringIO
+from unittest.mock import patch
+from console import HBNBCommand
+from models.engine.db_storage import DBStorage
+from models.engine.file_storage import FileStorage
+from models.engine.text import TextIndex, tokenize
+from models.place import Place
+from models.review import Review
+from models.user import User
+from tests.test_engine import DBStorageTestCase, FileStorageTestCase
+
+TEXTS = ["Quiet flat, very clean and quiet street",
+         "Clean rooms but a noisy street",
+         "Great view of the lake",
+         ""]
+
+
+class TestTextIndex(unittest.TestCase):
+    """Unittests for testing the TextIndex class."""
+
+    def setUp(self):
+        self.index = TextIndex(("name", "description"))
+        for i, text in enumerate(TEXTS):
+            self.index.add(str(i), Place(name="Flat " + str(i),
+                                         description=text))
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize("Très calme, 3 rooms!"),
+                         ["très", "calme", "3", "rooms"])
+
+    def test_search(self):
+        found = self.index.search("quiet")
+        self.assertEqual([key for key, score in found], ["0"])
+        found = self.index.search("clean STREET")
+        self.assertEqual(sorted(key for key, score in found), ["0", "1"])
+        self.assertGreater(found[0][1], 0)
+        self.assertEqual(self.index.search("quiet clean", limit=1)[0][0],
+                         "0")
+        self.assertEqual(self.index.search("pool"), [])
+        self.assertEqual(self.index.search(""), [])
+
+    def test_rare_words_rank_higher(self):
+        found = dict(self.index.search("flat lake"))
+        self.assertGreater(found["2"], found["3"])
+
+    def test_update_and_remove(self):
+        self.index.update("2", Place(description="quiet lake"))
+        self.index.remove("0")
+        self.index.remove("9")
+        self.assertEqual(len(self.index), 3)
+        self.assertEqual([key for key, score in self.index.search("quiet")],
+                         ["2"])
+        self.assertEqual(self.index.search("view"), [])
+        for key in ["1", "2", "3"]:
+            self.index.remove(key)
+        self.assertEqual(self.index.search("flat"), [])
+
+
+class TestFileStorage_search(FileStorageTestCase):
+    """Unittests for the search() method of FileStorage."""
+
+    def setUp(self):
+        super().setUp()
+        self.reviews = []
+        for text in TEXTS:
+            review = Review()
+            review.text = text
+            self.reviews.append(review)
+
+    def test_search(self):
+        found = models.storage.search(Review, "noisy street")
+        self.assertEqual([obj_id for obj_id, score in found],
+                         [self.reviews[1].id, self.reviews[0].id])
+
+    def test_search_after_update_delete_and_reload(self):
+        self.reviews[2].text = "noisy lake"
+        models.storage.delete(self.reviews[1])
+        models.storage.save()
+        FileStorage._FileStorage__objects.clear()
+        models.storage.reload()
+        self.assertEqual([obj_id for obj_id, score in
+                          models.storage.search("Review", "noisy")],
+                         [self.reviews[2].id])
+
+    def test_not_indexed(self):
+        with self.assertRaises(KeyError):
+            models.storage.search(User, "Betty")
+
+    def test_console(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd('Review.search("lake view")')
+        obj_id, score = output.getvalue().split()
+        self.assertEqual(obj_id, self.reviews[2].id)
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd('search Review "quiet street" 1')
+        self.assertEqual(output.getvalue().split()[0], self.reviews[0].id)
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd('Review.search("clean", 1)')
+            HBNBCommand().onecmd('search Review')
+            HBNBCommand().onecmd('search User "x"')
+        lines = output.getvalue().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(lines[1:], ["** words missing **",
+                                     "** User has no text index **"])
+
+
+class TestDBStorage_search(DBStorageTestCase):
+    """Unittests for the search() method of DBStorage."""
+
+    def test_search(self):
+        reviews = []
+        for text in TEXTS:
+            reviews.append(Review())
+            reviews[-1].text = text
+        self.assertEqual([obj_id for obj_id, score in
+                          models.storage.search(Review, "noisy street")],
+                         [reviews[1].id, reviews[0].id])
+        reviews[1].text = "lake"
+        models.storage.delete(reviews[0])
+        self.assertEqual(models.storage.search(Review, "street"), [])
+        self.assertEqual(len(models.storage.search(Review, "lake")), 2)
+        with self.assertRaises(KeyError):
+            models.storage.search(User, "Betty")
+
+    def test_existing_rows_indexed(self):
+        place = Place()
+        place.name = "Lake house"
+        models.storage.save()
+        models.storage.close()
+        db = sqlite3.connect(self.path)
+        db.execute('DROP TABLE "Place_text"')
+        db.commit()
+        db.close()
+        models.storage = DBStorage(path=self.path)
+        self.assertEqual([obj_id for obj_id, score in
+                          models.storage.search(Place, "house")],
+                         [place.id])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -51,7 +51,7 @@ class Test_Amenity(unittest.TestCase):
     def test_args(self):
         """Testing args which was unused"""
         am = Amenity(None)
-        self.assertNotIn(None, am.__dict__.values())
+        self.assertNotIn(None, am.to_dict().values())
 
     def test_with_kwargs(self):
         """Testing with kwargs"""
@@ -4,6 +4,7 @@
 import unittest
 import models
 from models.base_model import BaseModel
+from models.place import Place
 from datetime import datetime
 from time import sleep
 import os
@@ -51,7 +52,7 @@ class Test_BaseModel(unittest.TestCase):
     def test_args(self):
         """Testing args which was unused"""
         bm = BaseModel(None)
-        self.assertNotIn(None, bm.__dict__.values())
+        self.assertNotIn(None, bm.to_dict().values())
 
     def test_with_kwargs(self):
         """Testing with kwargs"""
@@ -189,5 +190,45 @@ class Test_BaseModel(unittest.TestCase):
         self.assertEqual(updated_at, self.base_model.updated_at.isoformat())
 
 
+class Test_BaseModel_slots(unittest.TestCase):
+    """Test cases for the slots of the models"""
+
+    def test_no_instance_dict(self):
+        """declared attributes are kept in slots"""
+        pl = Place()
+        pl.name = "Loft"
+        self.assertFalse(hasattr(pl, "__dict__"))
+        self.assertEqual(pl.name, "Loft")
+
+    def test_defaults(self):
+        """unset declared attributes read as the class attribute"""
+        pl = Place()
+        self.assertEqual(Place.name, "")
+        self.assertEqual(pl.name, "")
+        self.assertEqual(pl.amenity_ids, [])
+        self.assertNotIn("name", pl.to_dict())
+
+    def test_extra_attributes(self):
+        """attributes the class does not declare are kept too"""
+        pl = Place()
+        pl.rating = 4.5
+        self.assertEqual(pl.rating, 4.5)
+        self.assertEqual(pl.to_dict()["rating"], 4.5)
+        self.assertIn("'rating': 4.5", str(pl))
+        del pl.rating
+        self.assertFalse(hasattr(pl, "rating"))
+
+    def test_dates_round_trip(self):
+        """dates are kept exactly"""
+        date = datetime(2023, 1, 1, 12, 30, 15, 123456)
+        pl = Place(id="1", created_at=date.isoformat(),
+                   updated_at=date, rating=3)
+        self.assertEqual(pl.created_at, date)
+        self.assertIs(type(pl.updated_at), datetime)
+        self.assertEqual(Place(**pl.to_dict()).to_dict(), pl.to_dict())
+        self.assertIn("datetime.datetime(2023, 1, 1, 12, 30, 15, 123456)",
+                      str(pl))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -4,6 +4,7 @@
 import unittest
 import models
 from models.city import City
+from models.place import Place
 from datetime import datetime
 from time import sleep
 import os
@@ -51,7 +52,7 @@ class Test_City(unittest.TestCase):
     def test_args(self):
         """Testing args which was unused"""
         cty = City(None)
-        self.assertNotIn(None, cty.__dict__.values())
+        self.assertNotIn(None, cty.to_dict().values())
 
     def test_with_kwargs(self):
         """Testing with kwargs"""
@@ -211,6 +212,15 @@ class Test_City(unittest.TestCase):
         updated_at = cty["updated_at"]
         self.assertEqual(updated_at, self.city.updated_at.isoformat())
 
+    def test_places(self):
+        """tests the places relationship"""
+        city = City()
+        place = Place()
+        place.city_id = city.id
+        self.assertEqual(city.places, [place])
+        models.storage.delete(place)
+        self.assertEqual(city.places, [])
+
 
 if __name__ == "__main__":
     unittest.main()
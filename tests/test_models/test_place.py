@@ -4,9 +4,12 @@
 import unittest
 import models
 from models.place import Place
+from models.amenity import Amenity
+from models.review import Review
 from datetime import datetime
 from time import sleep
 import os
+from unittest.mock import patch
 
 
 class Test_Review(unittest.TestCase):
@@ -51,7 +54,7 @@ class Test_Review(unittest.TestCase):
     def test_args(self):
         """Testing args which was unused"""
         pl = Place(None)
-        self.assertNotIn(None, pl.__dict__.values())
+        self.assertNotIn(None, pl.to_dict().values())
 
     def test_with_kwargs(self):
         """Testing with kwargs"""
@@ -220,6 +223,28 @@ class Test_Review(unittest.TestCase):
         updated_at = pl["updated_at"]
         self.assertEqual(updated_at, self.place.updated_at.isoformat())
 
+    def test_reviews(self):
+        """tests the reviews relationship"""
+        review = Review()
+        review.place_id = self.place.id
+        self.assertEqual(self.place.reviews, [review])
+        review.place_id = ""
+        self.assertEqual(self.place.reviews, [])
+
+    def test_amenities(self):
+        """tests the amenities relationship"""
+        wifi = Amenity()
+        self.place.amenity_ids = [wifi.id, "1234"]
+        self.assertEqual(self.place.amenities, [wifi])
+
+    def test_amenities_by_id(self):
+        """the amenities are fetched by id, not from every object"""
+        wifi = Amenity()
+        self.place.amenity_ids = [wifi.id]
+        with patch.object(models.storage, "all",
+                          side_effect=AssertionError):
+            self.assertEqual(self.place.amenities, [wifi])
+
 
 if __name__ == "__main__":
     unittest.main()
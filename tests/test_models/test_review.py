@@ -51,7 +51,7 @@ class Test_Review(unittest.TestCase):
     def test_args(self):
         """Testing args which was unused"""
         rv = Review(None)
-        self.assertNotIn(None, rv.__dict__.values())
+        self.assertNotIn(None, rv.to_dict().values())
 
     def test_with_kwargs(self):
         """Testing with kwargs"""
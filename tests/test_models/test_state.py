@@ -4,6 +4,7 @@
 import unittest
 import models
 from models.state import State
+from models.city import City
 from datetime import datetime
 from time import sleep
 import os
@@ -51,7 +52,7 @@ class Test_State(unittest.TestCase):
     def test_args(self):
         """Testing args which was unused"""
         st = State(None)
-        self.assertNotIn(None, st.__dict__.values())
+        self.assertNotIn(None, st.to_dict().values())
 
     def test_with_kwargs(self):
         """Testing with kwargs"""
@@ -210,6 +211,16 @@ class Test_State(unittest.TestCase):
         updated_at = st["updated_at"]
         self.assertEqual(updated_at, self.state.updated_at.isoformat())
 
+    def test_cities(self):
+        """tests the cities relationship"""
+        state = State()
+        city = City()
+        city.state_id = state.id
+        City()
+        self.assertEqual(state.cities, [city])
+        city.state_id = "other"
+        self.assertEqual(state.cities, [])
+
 
 if __name__ == "__main__":
     unittest.main()
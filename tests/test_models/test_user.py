@@ -4,6 +4,7 @@
 import unittest
 import models
 from models.user import User
+from models.place import Place
 from datetime import datetime
 from time import sleep
 import os
@@ -55,7 +56,7 @@ class Test_User(unittest.TestCase):
     def test_args(self):
         """Testing args which was unused"""
         usr = User(None)
-        self.assertNotIn(None, usr.__dict__.values())
+        self.assertNotIn(None, usr.to_dict().values())
 
     def test_with_kwargs(self):
         """Testing with kwargs"""
@@ -133,7 +134,9 @@ class Test_User(unittest.TestCase):
     def test__str__(self):
         """tests the string representation"""
         user_str = str(self.user)
-        expec_str = "[User] ({}) {}".format(self.user.id, self.user.__dict__)
+        attrs = {"id": self.user.id, "created_at": self.user.created_at,
+                 "updated_at": self.user.updated_at}
+        expec_str = "[User] ({}) {}".format(self.user.id, attrs)
         self.assertEqual(user_str, expec_str)
 
     def test_save(self):
@@ -215,6 +218,13 @@ class Test_User(unittest.TestCase):
         self.assertTrue('created_at' in user_dict)
         self.assertTrue('updated_at' in user_dict)
 
+    def test_places(self):
+        """tests the places relationship"""
+        place = Place()
+        self.assertEqual(self.user.places, [])
+        place.user_id = self.user.id
+        self.assertEqual(self.user.places, [place])
+
 
 if __name__ == "__main__":
     unittest.main()